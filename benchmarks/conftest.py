@@ -0,0 +1,87 @@
+from pathlib import Path
+from typing import Callable, Dict
+
+import pytest
+
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._business_logic import (
+    GraphData,
+)
+
+from .data_generation import create_graph_data, write_npy_graph_directory
+
+######################################################################
+#
+# Benchmark suite for the hot path of BestPracticePlugin
+#
+# Benchmarks are parametrized by series size (`num_points`) and size
+# of graph set (`num_graphs`). Use `--quick` to only run the smaller
+# sizes, e.g. as smoke test in CI.
+#
+# Results are stored in machine-readable form with pytest-benchmark,
+# e.g. `--benchmark-autosave` and `--benchmark-compare`.
+#
+######################################################################
+
+SERIES_SIZES = [10**3, 10**4, 10**5, 10**6, 10**7]
+GRAPH_SET_SIZES = [10, 100, 1000, 10**4, 10**5]
+
+QUICK_MAX_SERIES_SIZE = 10**5
+QUICK_MAX_GRAPH_SET_SIZE = 1000
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--quick",
+        action="store_true",
+        default=False,
+        help="Only run benchmarks for smaller series and graph set sizes",
+    )
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    quick = metafunc.config.getoption("--quick")
+    if "num_points" in metafunc.fixturenames:
+        sizes = [
+            size for size in SERIES_SIZES if not quick or size <= QUICK_MAX_SERIES_SIZE
+        ]
+        metafunc.parametrize("num_points", sizes, ids=[f"{s:.0e}" for s in sizes])
+    if "num_graphs" in metafunc.fixturenames:
+        sizes = [
+            size
+            for size in GRAPH_SET_SIZES
+            if not quick or size <= QUICK_MAX_GRAPH_SET_SIZE
+        ]
+        metafunc.parametrize("num_graphs", sizes, ids=[f"{s}graphs" for s in sizes])
+
+
+@pytest.fixture(scope="session")
+def graph_data_factory() -> Callable[[int], GraphData]:
+    """Factory of graph data, cached per number of points"""
+    cache: Dict[int, GraphData] = {}
+
+    def _factory(num_points: int) -> GraphData:
+        if num_points not in cache:
+            cache[num_points] = create_graph_data(num_points)
+        return cache[num_points]
+
+    return _factory
+
+
+@pytest.fixture(scope="session")
+def npy_graph_directory_factory(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Callable[[int, int], Path]:
+    """Factory of graph data directories, cached per graph set and series size"""
+    cache: Dict[tuple, Path] = {}
+
+    def _factory(num_graphs: int, num_points: int) -> Path:
+        key = (num_graphs, num_points)
+        if key not in cache:
+            cache[key] = write_npy_graph_directory(
+                tmp_path_factory.mktemp(f"graphs_{num_graphs}_{num_points}"),
+                num_graphs,
+                num_points,
+            )
+        return cache[key]
+
+    return _factory
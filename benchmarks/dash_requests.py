@@ -0,0 +1,115 @@
+import json
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+
+######################################################################
+#
+# Helpers for building requests to the Dash callback endpoint
+# (`/_dash-update-component`), as sent by the Dash renderer in the
+# browser.
+#
+######################################################################
+
+ComponentId = Union[str, Dict[str, Any]]
+
+UPDATE_COMPONENT_URL = "/_dash-update-component"
+
+
+# Keys of dict IDs matched by `MATCH` in the pattern-matching callbacks
+MATCH_KEYS = ("instance",)
+
+
+def stringify_id(component_id: ComponentId, match_keys: Sequence[str] = ()) -> str:
+    """
+    Stringify component ID as done by the Dash renderer, where the values of
+    `match_keys` are replaced by the `MATCH` wildcard
+    """
+    if isinstance(component_id, dict):
+        component_id = {
+            key: ["MATCH"] if key in match_keys else value
+            for key, value in component_id.items()
+        }
+        return json.dumps(component_id, sort_keys=True, separators=(",", ":"))
+    return component_id
+
+
+def update_component_payload(
+    outputs: Sequence[Tuple[ComponentId, str]],
+    inputs: Sequence[Tuple[ComponentId, str, Any]],
+    state: Optional[Sequence[Tuple[ComponentId, str, Any]]] = None,
+    changed: Optional[Sequence[Tuple[ComponentId, str]]] = None,
+) -> Dict[str, Any]:
+    """
+    Create payload for a callback request
+
+    `changed` are the (component ID, property) pairs triggering the callback, by
+    default the first input. The callback is identified by its outputs, with the
+    `MATCH_KEYS` of dict IDs as wildcards.
+    """
+    output_list = [{"id": elm[0], "property": elm[1]} for elm in outputs]
+    if len(outputs) == 1:
+        output_str = f"{stringify_id(outputs[0][0], MATCH_KEYS)}.{outputs[0][1]}"
+    else:
+        output_str = (
+            ".."
+            + "...".join(
+                f"{stringify_id(elm[0], MATCH_KEYS)}.{elm[1]}" for elm in outputs
+            )
+            + ".."
+        )
+
+    changed = changed if changed is not None else [inputs[0][:2]]
+    payload: Dict[str, Any] = {
+        "output": output_str,
+        "outputs": output_list[0] if len(outputs) == 1 else output_list,
+        "inputs": [
+            {"id": elm[0], "property": elm[1], "value": elm[2]} for elm in inputs
+        ],
+        "changedPropIds": [f"{stringify_id(elm[0])}.{elm[1]}" for elm in changed],
+    }
+    if state:
+        payload["state"] = [
+            {"id": elm[0], "property": elm[1], "value": elm[2]} for elm in state
+        ]
+    return payload
+
+
+def best_practice_graph_payload(
+    get_uuid: Callable[[str], ComponentId],
+    graph_name: str,
+    graph_type: str,
+    graph_data_visualization: str,
+    *,
+    relayout_data: Optional[dict] = None,
+    changed_element: str = "graph_selection_dropdown",
+    session_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Payload for the graph update callback of BestPracticePlugin, where requests
+    without session ID are never cancelled as stale
+    """
+    graph_id = get_uuid("graph")
+    changed_property = "relayoutData" if changed_element == "graph" else "value"
+    return update_component_payload(
+        outputs=[(graph_id, "figure"), (graph_id, "relayoutData")],
+        inputs=[
+            (get_uuid("graph_selection_dropdown"), "value", graph_name),
+            (get_uuid("graph_type_radio_items"), "value", graph_type),
+            (
+                get_uuid("graph_data_visualization_radio_items"),
+                "value",
+                graph_data_visualization,
+            ),
+            (graph_id, "relayoutData", relayout_data),
+        ],
+        state=[(get_uuid("session_store"), "data", session_id)],
+        changed=[(get_uuid(changed_element), changed_property)],
+    )
+
+
+def some_other_custom_plugin_payload(
+    button_id: ComponentId, div_id: ComponentId, n_clicks: int
+) -> Dict[str, Any]:
+    """Payload for the button callback of SomeOtherCustomPlugin"""
+    return update_component_payload(
+        outputs=[(div_id, "children")], inputs=[(button_id, "n_clicks", n_clicks)]
+    )
@@ -0,0 +1,27 @@
+from pathlib import Path
+
+import numpy as np
+
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._business_logic import (
+    GraphData,
+)
+
+# Number of points per graph in graph set benchmarks
+GRAPH_SET_SERIES_SIZE = 100
+
+
+def create_graph_data(num_points: int, seed: int = 0) -> GraphData:
+    rng = np.random.default_rng(seed)
+    return GraphData(np.arange(num_points), rng.standard_normal(num_points).cumsum())
+
+
+def write_npy_graph_directory(
+    directory: Path, num_graphs: int, num_points: int
+) -> Path:
+    """Write graph data directory readable by NpyGraphDataSource"""
+    directory.mkdir(parents=True, exist_ok=True)
+    graph_data = create_graph_data(num_points)
+    array = np.vstack([graph_data.x_data(), graph_data.y_data()])
+    for index in range(num_graphs):
+        np.save(directory / f"Graph {index}.npy", array)
+    return directory
@@ -0,0 +1,499 @@
+import argparse
+import base64
+import http.client
+import json
+import logging
+import multiprocessing
+import os
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import dash
+import numpy as np
+from werkzeug.serving import make_server
+
+from webviz_plugin_boilerplate.plugins import (
+    BestPracticePlugin,
+    SomeCustomPlugin,
+    SomeOtherCustomPlugin,
+)
+
+from .dash_requests import (
+    UPDATE_COMPONENT_URL,
+    ComponentId,
+    best_practice_graph_payload,
+    some_other_custom_plugin_payload,
+)
+
+######################################################################
+#
+# Concurrent load test of the plugin callbacks
+#
+# Starts worker processes, each serving a Dash app with the plugins
+# of `examples/boilerplate_example.yaml` by a threaded HTTP server.
+# The callback endpoint is driven by concurrent virtual users, where
+# each user sends a randomized sequence of interactions (graph
+# selection, visualization, zoom, button clicks etc.), waiting for the
+# response and an optional think time between the requests.
+#
+# Reports the latency distribution per interaction, the throughput
+# and the memory (RSS) of each worker process, e.g.
+#
+#   python -m benchmarks.load_test --users 32 --workers 2 --duration-s 30
+#   python -m benchmarks.load_test --data-path ./graphs --json results.json
+#   python -m benchmarks.load_test --option figure_cache_size_mb=0
+#
+# NOTE: The interactions assume the default layout of
+# BestPracticePlugin, i.e. options changing the layout (e.g.
+# `multi_select` or `clientside_transforms`) are not supported.
+#
+######################################################################
+
+# Relative frequency of the interactions of a virtual user
+ACTION_WEIGHTS = {
+    "select_graph": 30,
+    "change_visualization": 15,
+    "change_graph_type": 10,
+    "zoom": 15,
+    "reset_zoom": 5,
+    "click_button": 25,
+}
+
+WORKER_START_TIMEOUT_S = 300
+
+
+def trace_x_extent(trace: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """
+    Minimum and maximum x value of a figure trace, with x data as JSON list or plotly
+    typed array (base64 encoded array data and dtype). None without finite x values.
+    """
+    x_data = trace.get("x")
+    if isinstance(x_data, dict) and "bdata" in x_data:
+        x_array = np.frombuffer(
+            base64.b64decode(x_data["bdata"]), dtype=np.dtype(f"<{x_data['dtype']}")
+        )
+    elif isinstance(x_data, list):
+        x_array = np.array(
+            [value for value in x_data if isinstance(value, (int, float))], dtype=float
+        )
+    else:
+        return None
+    x_array = x_array[np.isfinite(x_array)]
+    if not x_array.size:
+        return None
+    return float(x_array.min()), float(x_array.max())
+
+
+@dataclass(frozen=True)
+class WorkerInfo:
+    """
+    Worker process serving the app, with IDs and option values of the layout
+    elements keyed by plugin and element name
+    """
+
+    pid: int
+    port: int
+    element_ids: Dict[Tuple[str, str], ComponentId]
+    element_options: Dict[Tuple[str, str], List[Any]]
+
+
+@dataclass(frozen=True)
+class Sample:
+    action: str
+    worker_index: int
+    latency_s: float
+    status: Optional[int]
+
+
+def create_app(best_practice_options: Dict[str, Any]) -> dash.Dash:
+    """App with the plugins of the example configuration"""
+    app = dash.Dash(__name__)
+    plugins = [
+        SomeCustomPlugin(),
+        SomeOtherCustomPlugin(),
+        BestPracticePlugin(**best_practice_options),
+    ]
+    app.layout = dash.html.Div([plugin.layout for plugin in plugins])
+    return app
+
+
+def _layout_elements(
+    layout: Any,
+) -> Tuple[Dict[Tuple[str, str], ComponentId], Dict[Tuple[str, str], List[Any]]]:
+    """IDs and option values of the first plugin instance, by plugin and element"""
+    element_ids: Dict[Tuple[str, str], ComponentId] = {}
+    element_options: Dict[Tuple[str, str], List[Any]] = {}
+    # pylint: disable=protected-access
+    for component in layout._traverse():
+        component_id = getattr(component, "id", None)
+        if not isinstance(component_id, dict) or "plugin" not in component_id:
+            continue
+        key = (component_id["plugin"], component_id["element"])
+        element_ids.setdefault(key, component_id)
+        options = getattr(component, "options", None)
+        if options:
+            element_options.setdefault(
+                key,
+                [elm["value"] if isinstance(elm, dict) else elm for elm in options],
+            )
+    return element_ids, element_options
+
+
+def _serve(best_practice_options: Dict[str, Any], info_queue: Any) -> None:
+    """Serve app in worker process until terminated"""
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    app = create_app(best_practice_options)
+    server = make_server("127.0.0.1", 0, app.server, threaded=True)
+    element_ids, element_options = _layout_elements(app.layout)
+    info_queue.put(
+        WorkerInfo(os.getpid(), server.server_port, element_ids, element_options)
+    )
+    server.serve_forever()
+
+
+def process_memory_mb(pid: int) -> Dict[str, Optional[float]]:
+    """Resident set size and its peak of process in MB, from /proc (Linux only)"""
+    values: Dict[str, float] = {}
+    try:
+        status = Path(f"/proc/{pid}/status").read_text(encoding="utf-8")
+    except OSError:
+        status = ""
+    for line in status.splitlines():
+        name, _, value = line.partition(":")
+        if name in ("VmRSS", "VmHWM"):
+            values[name] = int(value.split()[0]) / 1024
+    return {"rss_mb": values.get("VmRSS"), "peak_rss_mb": values.get("VmHWM")}
+
+
+class VirtualUser:
+    """
+    User of the app served by a worker, sending a randomized sequence of
+    interactions within one browser session
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, worker: WorkerInfo, seed: int) -> None:
+        self._worker = worker
+        self._rng = random.Random(seed)
+        self._session_id = uuid.UUID(int=self._rng.getrandbits(128)).hex
+        self._graph_name = self._options("graph_selection_dropdown")[0]
+        self._graph_type = self._options("graph_type_radio_items")[0]
+        self._visualization = self._options("graph_data_visualization_radio_items")[0]
+        self._relayout_data: Optional[dict] = None
+        self._x_range = (0.0, 1.0)
+        self._n_clicks = 0
+
+    def rng(self) -> random.Random:
+        return self._rng
+
+    def next_request(self) -> Tuple[str, Dict[str, Any]]:
+        """Next interaction, and the payload of its callback request"""
+        action = self._rng.choices(
+            list(ACTION_WEIGHTS), weights=list(ACTION_WEIGHTS.values())
+        )[0]
+        if action == "click_button":
+            self._n_clicks += 1
+            return action, some_other_custom_plugin_payload(
+                self._worker.element_ids[("SomeOtherCustomPlugin", "submit-button")],
+                self._worker.element_ids[("SomeOtherCustomPlugin", "output-state")],
+                self._n_clicks,
+            )
+
+        changed_element = "graph"
+        if action == "select_graph":
+            changed_element = "graph_selection_dropdown"
+            self._graph_name = self._rng.choice(self._options(changed_element))
+        elif action == "change_visualization":
+            changed_element = "graph_data_visualization_radio_items"
+            self._visualization = self._rng.choice(self._options(changed_element))
+        elif action == "change_graph_type":
+            changed_element = "graph_type_radio_items"
+            self._graph_type = self._rng.choice(self._options(changed_element))
+        elif action == "zoom":
+            start, end = sorted(self._rng.uniform(*self._x_range) for _ in range(2))
+            self._relayout_data = {"xaxis.range[0]": start, "xaxis.range[1]": end}
+        else:
+            self._relayout_data = {"xaxis.autorange": True}
+
+        return action, best_practice_graph_payload(
+            self._best_practice_id,
+            self._graph_name,
+            self._graph_type,
+            self._visualization,
+            relayout_data=self._relayout_data,
+            changed_element=changed_element,
+            session_id=self._session_id,
+        )
+
+    def record_response(self, response: Dict[str, Any]) -> None:
+        """Update state of the browser from the callback response"""
+        for properties in response.get("response", {}).values():
+            if "relayoutData" in properties:
+                self._relayout_data = properties["relayoutData"]
+            figure = properties.get("figure")
+            if not self._relayout_data and figure:
+                # Zoom within the x range of the unzoomed figure
+                x_extents = [
+                    extent
+                    for trace in figure.get("data", [])
+                    for extent in [trace_x_extent(trace)]
+                    if extent is not None
+                ]
+                if x_extents:
+                    self._x_range = (
+                        min(extent[0] for extent in x_extents),
+                        max(extent[1] for extent in x_extents),
+                    )
+
+    def x_range(self) -> Tuple[float, float]:
+        """X range of the unzoomed figure, within which the user zooms"""
+        return self._x_range
+
+    def _best_practice_id(self, element: str) -> ComponentId:
+        return self._worker.element_ids[("BestPracticePlugin", element)]
+
+    def _options(self, element: str) -> List[Any]:
+        return self._worker.element_options[("BestPracticePlugin", element)]
+
+
+def _run_user(
+    user: VirtualUser,
+    worker: WorkerInfo,
+    worker_index: int,
+    deadline: float,
+    think_time_s: float,
+    samples: List[Sample],
+) -> None:
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    connection = http.client.HTTPConnection("127.0.0.1", worker.port, timeout=120)
+    while time.perf_counter() < deadline:
+        action, payload = user.next_request()
+        body = json.dumps(payload).encode()
+        status: Optional[int] = None
+        start = time.perf_counter()
+        try:
+            connection.request(
+                "POST",
+                UPDATE_COMPONENT_URL,
+                body,
+                {"Content-Type": "application/json"},
+            )
+            response = connection.getresponse()
+            content = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            connection.close()
+        samples.append(
+            Sample(action, worker_index, time.perf_counter() - start, status)
+        )
+        if status == 200:
+            user.record_response(json.loads(content))
+        if think_time_s > 0:
+            time.sleep(user.rng().expovariate(1 / think_time_s))
+    connection.close()
+
+
+def latency_summary(samples: Sequence[Sample]) -> Dict[str, Any]:
+    """Latency percentiles in milliseconds, and counts of errors and no updates"""
+    latencies_ms = np.array([sample.latency_s for sample in samples]) * 1000
+    p50, p90, p99 = (
+        np.percentile(latencies_ms, [50, 90, 99]) if len(samples) else (np.nan,) * 3
+    )
+    return {
+        "count": len(samples),
+        "errors": sum(
+            sample.status is None or sample.status >= 400 for sample in samples
+        ),
+        "no_update": sum(sample.status == 204 for sample in samples),
+        "p50_ms": float(p50),
+        "p90_ms": float(p90),
+        "p99_ms": float(p99),
+        "max_ms": float(latencies_ms.max()) if len(samples) else float("nan"),
+    }
+
+
+def run_load_test(
+    num_users: int,
+    num_workers: int,
+    duration_s: float,
+    think_time_s: float = 0.0,
+    best_practice_options: Optional[Dict[str, Any]] = None,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Run load test, and return results as JSON serializable dict"""
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+    context = multiprocessing.get_context("spawn")
+    info_queue = context.Queue()
+    processes = [
+        context.Process(
+            target=_serve, args=(best_practice_options or {}, info_queue), daemon=True
+        )
+        for _ in range(num_workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        workers = [
+            info_queue.get(timeout=WORKER_START_TIMEOUT_S) for _ in range(num_workers)
+        ]
+        for worker in workers:
+            # Dash sets up the callbacks on the first request
+            connection = http.client.HTTPConnection("127.0.0.1", worker.port)
+            connection.request("GET", "/_dash-dependencies")
+            connection.getresponse().read()
+            connection.close()
+        start_memory = [process_memory_mb(worker.pid) for worker in workers]
+
+        user_samples: List[List[Sample]] = [[] for _ in range(num_users)]
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(
+                target=_run_user,
+                args=(
+                    VirtualUser(workers[index % num_workers], seed + index),
+                    workers[index % num_workers],
+                    index % num_workers,
+                    start + duration_s,
+                    think_time_s,
+                    user_samples[index],
+                ),
+                daemon=True,
+            )
+            for index in range(num_users)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed_s = time.perf_counter() - start
+        end_memory = [process_memory_mb(worker.pid) for worker in workers]
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+
+    samples = [sample for samples in user_samples for sample in samples]
+    return {
+        "users": num_users,
+        "workers": num_workers,
+        "duration_s": elapsed_s,
+        "think_time_s": think_time_s,
+        "best_practice_options": best_practice_options or {},
+        "requests": len(samples),
+        "throughput_rps": len(samples) / elapsed_s,
+        "latency": {
+            "all": latency_summary(samples),
+            **{
+                action: latency_summary(
+                    [sample for sample in samples if sample.action == action]
+                )
+                for action in ACTION_WEIGHTS
+            },
+        },
+        "worker_memory": [
+            {
+                "pid": worker.pid,
+                "requests": sum(sample.worker_index == index for sample in samples),
+                "start_rss_mb": start_memory[index]["rss_mb"],
+                "end_rss_mb": end_memory[index]["rss_mb"],
+                "peak_rss_mb": end_memory[index]["peak_rss_mb"],
+            }
+            for index, worker in enumerate(workers)
+        ],
+    }
+
+
+def format_report(results: Dict[str, Any]) -> str:
+    def _mb(value: Optional[float]) -> str:
+        return f"{value:.1f}" if value is not None else "n/a"
+
+    lines = [
+        f"{results['users']} users, {results['workers']} workers, "
+        f"{results['duration_s']:.1f} s, think time {results['think_time_s']} s",
+        f"Throughput: {results['throughput_rps']:.1f} requests/s "
+        f"({results['requests']} requests, "
+        f"{results['latency']['all']['errors']} errors)",
+        "",
+        f"{'action':<22}{'count':>8}{'errors':>8}{'204':>8}"
+        f"{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}",
+    ]
+    for action, summary in results["latency"].items():
+        lines.append(
+            f"{action:<22}{summary['count']:>8}{summary['errors']:>8}"
+            f"{summary['no_update']:>8}{summary['p50_ms']:>9.1f}"
+            f"{summary['p90_ms']:>9.1f}{summary['p99_ms']:>9.1f}"
+            f"{summary['max_ms']:>9.1f}"
+        )
+    lines += ["", f"{'worker pid':<12}{'requests':>9}{'RSS start/end/peak MB':>24}"]
+    for worker in results["worker_memory"]:
+        memory = "/".join(
+            _mb(worker[key]) for key in ("start_rss_mb", "end_rss_mb", "peak_rss_mb")
+        )
+        lines.append(f"{worker['pid']:<12}{worker['requests']:>9}{memory:>24}")
+    return "\n".join(lines)
+
+
+def _plugin_option(option: str) -> Tuple[str, Any]:
+    name, separator, value = option.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError(f'Option "{option}" must be KEY=VALUE')
+    try:
+        return name, json.loads(value)
+    except json.JSONDecodeError:
+        return name, value
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Concurrent load test of the plugin callbacks"
+    )
+    parser.add_argument("--users", type=int, default=16, help="Concurrent users")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Worker processes serving the app"
+    )
+    parser.add_argument("--duration-s", type=float, default=30.0)
+    parser.add_argument(
+        "--think-time-ms",
+        type=float,
+        default=0.0,
+        help="Mean think time of users between requests, exponentially distributed",
+    )
+    parser.add_argument(
+        "--data-path", type=Path, help="Graph data directory of BestPracticePlugin"
+    )
+    parser.add_argument(
+        "--option",
+        type=_plugin_option,
+        action="append",
+        default=[],
+        help="Keyword argument of BestPracticePlugin as KEY=VALUE, VALUE as JSON",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Write results as JSON to file")
+    args = parser.parse_args(argv)
+
+    best_practice_options = dict(args.option)
+    if args.data_path:
+        best_practice_options["data_path"] = str(args.data_path)
+
+    results = run_load_test(
+        num_users=args.users,
+        num_workers=args.workers,
+        duration_s=args.duration_s,
+        think_time_s=args.think_time_ms / 1000,
+        best_practice_options=best_practice_options,
+        seed=args.seed,
+    )
+    print(format_report(results))
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
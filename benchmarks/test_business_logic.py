@@ -0,0 +1,163 @@
+import numpy as np
+import pytest
+
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._business_logic import (
+    GraphDataModel,
+    GraphSet,
+    InMemoryGraphDataSource,
+    StreamingGraphData,
+    TransformPipeline,
+    compute_ensemble_statistics,
+    create_default_transform_pipelines,
+)
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._decimation import (
+    bucket_aggregate,
+    lttb_decimate,
+    min_max_decimate,
+    slice_x_range,
+)
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._portable_store import (
+    populate_from_graph_data_parquet,
+    write_graph_data_parquet,
+)
+
+from .data_generation import GRAPH_SET_SERIES_SIZE, create_graph_data
+
+MAX_POINTS = 10000
+TRANSFORM_PIPELINES = create_default_transform_pipelines(
+    lambda: np.linspace(0, 1000, GraphDataModel.RESAMPLE_GRID_POINTS)
+)
+
+
+@pytest.mark.parametrize("pipeline_name", TRANSFORM_PIPELINES.pipeline_names())
+def test_transform_pipeline(benchmark, graph_data_factory, num_points, pipeline_name):
+    graph_data = graph_data_factory(num_points)
+    pipeline = TRANSFORM_PIPELINES.pipeline(pipeline_name)
+    result = benchmark(pipeline.apply, graph_data)
+    assert len(result) <= num_points
+
+
+def test_slice_x_range(benchmark, graph_data_factory, num_points):
+    graph_data = graph_data_factory(num_points)
+    result = benchmark(slice_x_range, graph_data, (num_points / 4, num_points / 2))
+    assert len(result) <= num_points
+
+
+def test_min_max_decimate(benchmark, graph_data_factory, num_points):
+    graph_data = graph_data_factory(num_points)
+    result = benchmark(min_max_decimate, graph_data, MAX_POINTS)
+    assert len(result) <= max(MAX_POINTS + 2, num_points)
+
+
+def test_lttb_decimate(benchmark, graph_data_factory, num_points):
+    graph_data = graph_data_factory(num_points)
+    result = benchmark(lttb_decimate, graph_data, MAX_POINTS)
+    assert len(result) == min(MAX_POINTS, num_points)
+
+
+def test_bucket_aggregate(benchmark, graph_data_factory, num_points):
+    graph_data = graph_data_factory(num_points)
+    result = benchmark(bucket_aggregate, graph_data, MAX_POINTS)
+    assert len(result) == min(MAX_POINTS, num_points)
+
+
+def test_create_graph_set(benchmark, num_graphs):
+    graph_data = create_graph_data(100)
+    graph_dict = {f"Graph {index}": graph_data for index in range(num_graphs)}
+    graph_set = benchmark(GraphSet, graph_dict)
+    assert graph_set.num_graphs() == num_graphs
+
+
+def test_graph_set_lookup(benchmark, num_graphs):
+    graph_data = create_graph_data(100)
+    graph_set = GraphSet({f"Graph {index}": graph_data for index in range(num_graphs)})
+    name = f"Graph {num_graphs - 1}"
+    result = benchmark(graph_set.graph_data, name)
+    assert result is graph_data
+
+
+def test_graph_set_search(benchmark, num_graphs):
+    graph_data = create_graph_data(100)
+    graph_set = GraphSet({f"Graph {index}": graph_data for index in range(num_graphs)})
+    names, num_matches = benchmark(graph_set.search_graph_names, "graph 1", limit=100)
+    assert names and num_matches >= len(names)
+
+
+def test_compute_ensemble_statistics(benchmark, num_graphs):
+    graph_set = GraphSet(
+        {
+            f"Graph {index}": create_graph_data(GRAPH_SET_SERIES_SIZE, seed=index)
+            for index in range(num_graphs)
+        }
+    )
+    statistics = benchmark(compute_ensemble_statistics, graph_set)
+    assert statistics.num_realizations == num_graphs
+
+
+def test_streaming_graph_data_append(benchmark, graph_data_factory, num_points):
+    graph_data = graph_data_factory(num_points)
+    streaming_graph_data = StreamingGraphData(capacity=MAX_POINTS)
+    benchmark(streaming_graph_data.append, graph_data)
+    assert len(streaming_graph_data) == min(
+        MAX_POINTS, streaming_graph_data.end_position()
+    )
+
+
+def test_streaming_graph_data_read_latest(benchmark, graph_data_factory, num_points):
+    streaming_graph_data = StreamingGraphData(capacity=MAX_POINTS)
+    streaming_graph_data.append(graph_data_factory(num_points))
+    _, result = benchmark(streaming_graph_data.read_latest, MAX_POINTS)
+    assert len(result) == min(MAX_POINTS, num_points)
+
+
+def _populate_and_read_graph_data(graph_data_model, path):
+    populate_from_graph_data_parquet(graph_data_model, path)
+    for _ in graph_data_model.graph_set().items():
+        pass
+
+
+@pytest.mark.parametrize("derived_series", [False, True])
+def test_populate_from_graph_data_parquet(
+    benchmark, monkeypatch, tmp_path, num_graphs, derived_series
+):
+    graph_data_model = GraphDataModel()
+    graph_data_model.populate_from_data_source(
+        InMemoryGraphDataSource(
+            {
+                f"Graph {index}": create_graph_data(GRAPH_SET_SERIES_SIZE, seed=index)
+                for index in range(num_graphs)
+            }
+        )
+    )
+    path = tmp_path / "graph_data.parquet"
+    write_graph_data_parquet(graph_data_model, path, derived_series)
+    portable_model = GraphDataModel()
+    benchmark(_populate_and_read_graph_data, portable_model, path)
+
+    graph_set = graph_data_model.graph_set()
+    assert portable_model.graph_set().graph_names() == graph_set.graph_names()
+    for graph_name, graph_data in portable_model.graph_set().items():
+        expected = graph_set.graph_data(graph_name)
+        assert graph_data.x_data().dtype == expected.x_data().dtype
+        assert graph_data.y_data().dtype == expected.y_data().dtype
+        np.testing.assert_array_equal(graph_data.x_data(), expected.x_data())
+        np.testing.assert_array_equal(graph_data.y_data(), expected.y_data())
+    if derived_series:
+        # Derived series are served from the stored graph data, not transformed
+        expected = {
+            pipeline_name: graph_data_model.transformed_graph_data(
+                "Graph 0", pipeline_name
+            )
+            for pipeline_name in ["Reversed", "Flipped"]
+        }
+
+        def _not_applied(*_):
+            raise AssertionError("Derived series transformed at runtime")
+
+        monkeypatch.setattr(TransformPipeline, "apply", _not_applied)
+        for pipeline_name, graph_data in expected.items():
+            transformed = portable_model.transformed_graph_data(
+                "Graph 0", pipeline_name
+            )
+            np.testing.assert_array_equal(transformed.x_data(), graph_data.x_data())
+            np.testing.assert_array_equal(transformed.y_data(), graph_data.y_data())
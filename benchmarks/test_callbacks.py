@@ -0,0 +1,64 @@
+import dash
+import pytest
+
+from webviz_plugin_boilerplate.plugins import BestPracticePlugin
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._layout import (
+    ElementIds,
+    LayoutOptions,
+)
+
+from .dash_requests import UPDATE_COMPONENT_URL, best_practice_graph_payload
+from .data_generation import GRAPH_SET_SERIES_SIZE
+
+
+def create_test_client(**plugin_kwargs):
+    app = dash.Dash(__name__)
+    plugin = BestPracticePlugin(**plugin_kwargs)
+    app.layout = plugin.layout
+    return plugin, app.server.test_client()
+
+
+def update_graph(
+    client, plugin, graph_name, visualization="Raw", graph_type="Line plot"
+):
+    response = client.post(
+        UPDATE_COMPONENT_URL,
+        json=best_practice_graph_payload(
+            ElementIds(LayoutOptions(), plugin.uuid()),
+            graph_name,
+            graph_type,
+            visualization,
+            session_id="benchmark-session",
+        ),
+    )
+    assert response.status_code == 200
+    return response
+
+
+@pytest.mark.parametrize("visualization", ["Raw", "Reversed", "Flipped"])
+@pytest.mark.parametrize("graph_type", ["Line plot", "Bar chart"])
+def test_update_graph_series_size(
+    benchmark, npy_graph_directory_factory, num_points, graph_type, visualization
+):
+    plugin, client = create_test_client(
+        data_path=npy_graph_directory_factory(1, num_points), figure_cache_size_mb=0
+    )
+    benchmark(update_graph, client, plugin, "Graph 0", visualization, graph_type)
+
+
+def test_update_graph_graph_set_size(
+    benchmark, npy_graph_directory_factory, num_graphs
+):
+    plugin, client = create_test_client(
+        data_path=npy_graph_directory_factory(num_graphs, GRAPH_SET_SERIES_SIZE),
+        figure_cache_size_mb=0,
+    )
+    benchmark(update_graph, client, plugin, f"Graph {num_graphs - 1}")
+
+
+def test_update_graph_cached(benchmark, npy_graph_directory_factory, num_points):
+    plugin, client = create_test_client(
+        data_path=npy_graph_directory_factory(1, num_points)
+    )
+    update_graph(client, plugin, "Graph 0")
+    benchmark(update_graph, client, plugin, "Graph 0")
@@ -0,0 +1,112 @@
+import base64
+
+import numpy as np
+import pytest
+from plotly.io.json import to_json_plotly
+
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._property_serialization import (
+    ArrayEncoding,
+    GraphFigureBuilder,
+    GraphFigureSettings,
+    GraphTypeOptions,
+    decode_figure,
+    encode_figure,
+)
+
+from .data_generation import create_graph_data
+
+
+def build_figure(graph_data, graph_type, validate=True, max_points=None):
+    figure_builder = GraphFigureBuilder(
+        graph_type, validate=validate, max_points=max_points
+    )
+    figure_builder.add_graph_title("Benchmark graph")
+    figure_builder.add_graph_data(graph_data)
+    return figure_builder.get_serialized_figure()
+
+
+def build_encoded_figure(graph_data, graph_type, array_encoding, validate=False):
+    figure_builder = GraphFigureBuilder.from_settings(
+        graph_type,
+        GraphFigureSettings(validate=validate, array_encoding=array_encoding),
+    )
+    figure_builder.add_graph_title("Benchmark graph")
+    figure_builder.add_graph_data(graph_data)
+    return encode_figure(figure_builder.get_serialized_figure())
+
+
+def _normalize(obj):
+    """Normalize decoded plotly JSON, i.e. decode base64 typed arrays to lists"""
+    if isinstance(obj, dict):
+        if set(obj) == {"dtype", "bdata"}:
+            return np.frombuffer(
+                base64.b64decode(obj["bdata"]), dtype=obj["dtype"]
+            ).tolist()
+        return {key: _normalize(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_normalize(value) for value in obj]
+    return obj
+
+
+@pytest.mark.parametrize("graph_type", list(GraphTypeOptions))
+@pytest.mark.parametrize("validate", [True, False], ids=["validated", "fast_path"])
+def test_build_figure(benchmark, graph_data_factory, num_points, graph_type, validate):
+    graph_data = graph_data_factory(num_points)
+    figure = benchmark(build_figure, graph_data, graph_type, validate)
+    assert len(figure["data"]) == 1
+
+
+@pytest.mark.parametrize("graph_type", list(GraphTypeOptions))
+def test_build_decimated_figure(benchmark, graph_data_factory, num_points, graph_type):
+    graph_data = graph_data_factory(num_points)
+    figure = benchmark(build_figure, graph_data, graph_type, False, 10000)
+    assert len(figure["data"]) == 1
+
+
+@pytest.mark.parametrize("graph_type", list(GraphTypeOptions))
+@pytest.mark.parametrize("validate", [True, False], ids=["validated", "fast_path"])
+def test_build_and_encode_figure(
+    benchmark, graph_data_factory, num_points, graph_type, validate
+):
+    """Build figure and encode it to JSON as done by Dash for the callback response"""
+    graph_data = graph_data_factory(num_points)
+    payload = benchmark(
+        lambda: to_json_plotly(build_figure(graph_data, graph_type, validate))
+    )
+    assert payload
+
+
+@pytest.mark.parametrize("array_encoding", list(ArrayEncoding))
+@pytest.mark.parametrize("validate", [True, False], ids=["validated", "fast_path"])
+def test_array_encoding_equivalent_to_lists(array_encoding, validate):
+    graph_data = create_graph_data(2000)
+    expected = _normalize(
+        decode_figure(
+            build_encoded_figure(
+                graph_data, GraphTypeOptions.LINE_PLOT, ArrayEncoding.LIST, validate
+            )
+        )
+    )
+    encoded = _normalize(
+        decode_figure(
+            build_encoded_figure(
+                graph_data, GraphTypeOptions.LINE_PLOT, array_encoding, validate
+            )
+        )
+    )
+    for expected_trace, trace in zip(expected["data"], encoded["data"]):
+        for key in ("x", "y"):
+            np.testing.assert_allclose(trace[key], expected_trace[key], rtol=1e-6)
+
+
+@pytest.mark.parametrize("array_encoding", list(ArrayEncoding))
+def test_encode_figure_array_encoding(
+    benchmark, graph_data_factory, num_points, array_encoding
+):
+    """Build and encode figure, with payload size recorded in the benchmark results"""
+    graph_data = graph_data_factory(num_points)
+    payload = benchmark(
+        build_encoded_figure, graph_data, GraphTypeOptions.LINE_PLOT, array_encoding
+    )
+    benchmark.extra_info["payload_bytes"] = len(payload)
+    assert payload
@@ -0,0 +1,81 @@
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Set, Tuple
+
+import pytest
+
+######################################################################
+#
+# Cold-start import time of the package and of each plugin, measured
+# with `python -X importtime` in a fresh interpreter.
+#
+# The package import guards the cold-start budget, i.e. the plugins
+# (and dash, plotly etc.) are only imported when accessed.
+#
+######################################################################
+
+# Budget for importing the package and the plugins module without plugins,
+# including the interpreter startup imports (e.g. site). Importing all plugins
+# eagerly takes more than a second, dominated by dash.
+PACKAGE_IMPORT_BUDGET_US = 250000
+
+PLUGIN_MODULES = {
+    "SomeCustomPlugin": "webviz_plugin_boilerplate.plugins._some_custom_plugin",
+    "SomeOtherCustomPlugin": (
+        "webviz_plugin_boilerplate.plugins._some_other_custom_plugin"
+    ),
+    "BestPracticePlugin": "webviz_plugin_boilerplate.plugins.best_practice_plugin",
+}
+
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \| (\S+)$")
+
+
+def import_statement(statement: str) -> Tuple[int, Set[str]]:
+    """
+    Run import statement in a fresh interpreter, returning the total import time in
+    microseconds and the names of the imported modules
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"{statement}; import sys; print('\\n'.join(sys.modules))",
+        ],
+        cwd=Path(__file__).parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Sum of the cumulative time of the top-level imports, i.e. without indent
+    import_time_us = sum(
+        int(match.group(1))
+        for match in map(_IMPORT_TIME_LINE.match, result.stderr.splitlines())
+        if match
+    )
+    return import_time_us, set(result.stdout.split())
+
+
+def test_package_import_time():
+    import_time_us, modules = import_statement(
+        "import webviz_plugin_boilerplate.plugins"
+    )
+    for heavy_module in ["dash", "plotly", "webviz_config", *PLUGIN_MODULES.values()]:
+        assert heavy_module not in modules
+    assert import_time_us < PACKAGE_IMPORT_BUDGET_US
+
+
+@pytest.mark.parametrize("plugin_name", list(PLUGIN_MODULES))
+def test_plugin_import_time(benchmark, plugin_name):
+    import_time_us, modules = benchmark.pedantic(
+        import_statement,
+        args=(f"from webviz_plugin_boilerplate.plugins import {plugin_name}",),
+        rounds=1,
+        iterations=1,
+    )
+    benchmark.extra_info["import_time_us"] = import_time_us
+    for other_plugin_name, module in PLUGIN_MODULES.items():
+        assert (module in modules) == (other_plugin_name == plugin_name)
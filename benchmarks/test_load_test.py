@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from .dash_requests import UPDATE_COMPONENT_URL
+from .load_test import VirtualUser, WorkerInfo, _layout_elements, create_app
+
+######################################################################
+#
+# Interactions of the virtual users of the load test, served by a
+# test client instead of worker processes
+#
+######################################################################
+
+NUM_POINTS = 500
+
+
+@pytest.mark.parametrize("array_encoding", ["list", "binary"])
+def test_zoom_ranges_follow_graph_data(npy_graph_directory_factory, array_encoding):
+    app = create_app(
+        {
+            "data_path": npy_graph_directory_factory(10, NUM_POINTS),
+            "array_encoding": array_encoding,
+        }
+    )
+    client = app.server.test_client()
+    worker = WorkerInfo(os.getpid(), 0, *_layout_elements(app.layout))
+    user = VirtualUser(worker, seed=0)
+
+    zoom_ranges = []
+    for _ in range(100):
+        action, payload = user.next_request()
+        if action == "zoom":
+            relayout_data = payload["inputs"][3]["value"]
+            zoom_ranges.append(
+                (relayout_data["xaxis.range[0]"], relayout_data["xaxis.range[1]"])
+            )
+        response = client.post(UPDATE_COMPONENT_URL, json=payload)
+        if response.status_code == 200:
+            user.record_response(response.get_json())
+
+    # Graph data x values are 0, 1, ..., NUM_POINTS - 1
+    assert user.x_range() == (0, NUM_POINTS - 1)
+    assert zoom_ranges
+    assert all(0 <= start <= end <= NUM_POINTS - 1 for start, end in zoom_ranges)
+    assert max(end for _, end in zoom_ranges) > 1
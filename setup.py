@@ -3,14 +3,22 @@ from setuptools import setup, find_packages
 with open("README.md", "r") as fh:
     LONG_DESCRIPTION = fh.read()
 
-TESTS_REQUIRE = ["selenium~=3.141", "pylint", "mock", "black", "bandit"]
+TESTS_REQUIRE = [
+    "selenium~=3.141",
+    "pylint",
+    "mock",
+    "black",
+    "bandit",
+    "pytest",
+    "pytest-benchmark",
+]
 
 setup(
     name="webviz_plugin_boilerplate",
     description="Webviz plugin boilerplate with example plugins",
     long_description=LONG_DESCRIPTION,
     long_description_content_type="text/markdown",
-    packages=find_packages(exclude=["tests"]),
+    packages=find_packages(exclude=["tests", "benchmarks"]),
     entry_points={
         "webviz_config_plugins": [
             "SomeCustomPlugin = webviz_plugin_boilerplate.plugins:SomeCustomPlugin",
@@ -19,10 +27,15 @@ setup(
         ]
     },
     install_requires=[
+        "numpy>=1.20",
         "webviz-config>=0.1.0",
     ],
     tests_require=TESTS_REQUIRE,
-    extras_require={"tests": TESTS_REQUIRE},
+    extras_require={
+        "tests": TESTS_REQUIRE,
+        "orjson": ["orjson"],
+        "arrow": ["pyarrow>=13"],
+    },
     setup_requires=["setuptools_scm~=3.2"],
     python_requires="~=3.8",
     use_scm_version=True,
@@ -0,0 +1,21 @@
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture(name="npy_graph_directory")
+def fixture_npy_graph_directory(tmp_path) -> Callable[[int, int], Path]:
+    """Writer of a graph data directory readable by NpyGraphDataSource"""
+
+    def _write(num_graphs: int, num_points: int) -> Path:
+        rng = np.random.default_rng(0)
+        array = np.vstack(
+            [np.arange(num_points), rng.standard_normal(num_points).cumsum()]
+        )
+        for index in range(num_graphs):
+            np.save(tmp_path / f"Graph {index}.npy", array)
+        return tmp_path
+
+    return _write
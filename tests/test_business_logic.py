@@ -0,0 +1,250 @@
+import numpy as np
+import pytest
+
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._business_logic import (
+    CumulativeSumStep,
+    DiffStep,
+    FlipStep,
+    GraphData,
+    GraphDataModel,
+    GraphNameIndex,
+    GraphSet,
+    InMemoryGraphDataSource,
+    ResampleStep,
+    ReverseStep,
+    RollingMeanStep,
+    TransformPipeline,
+    compute_ensemble_statistics,
+)
+
+GRAPH_NAMES = ["beta 2", "Alpha 1", "alpha 2", "Gamma", "beta 1", "alphabet"]
+
+
+def test_graph_name_index_search_matches_prefix_case_insensitive():
+    index = GraphNameIndex(GRAPH_NAMES)
+    assert index.search("ALPHA") == (["Alpha 1", "alpha 2", "alphabet"], 3)
+    assert index.search("beta ") == (["beta 1", "beta 2"], 2)
+    assert index.search("delta") == ([], 0)
+
+
+def test_graph_name_index_search_pages_by_offset_and_limit():
+    index = GraphNameIndex(GRAPH_NAMES)
+    assert index.search("alpha", offset=0, limit=2) == (["Alpha 1", "alpha 2"], 3)
+    assert index.search("alpha", offset=2, limit=2) == (["alphabet"], 3)
+    assert index.search("alpha", offset=5, limit=2) == ([], 3)
+
+
+def test_graph_name_index_empty_search_pages_all_names_in_index_order():
+    index = GraphNameIndex(GRAPH_NAMES)
+    assert index.search("", limit=4) == (GRAPH_NAMES[:4], len(GRAPH_NAMES))
+    assert index.search("", offset=4, limit=4) == (GRAPH_NAMES[4:], len(GRAPH_NAMES))
+
+
+X_DATA = np.array([0.0, 1.0, 2.0, 4.0, 5.0, 7.0])
+Y_DATA = np.array([1.0, -2.0, 3.0, 0.5, 4.0, -1.0])
+
+
+def _rolling_mean(y_data: np.ndarray, window: int) -> np.ndarray:
+    return np.convolve(y_data, np.ones(window) / window, mode="valid")
+
+
+@pytest.mark.parametrize(
+    "step, expected_x, expected_y",
+    [
+        (ReverseStep(), X_DATA, Y_DATA[::-1]),
+        (FlipStep(), X_DATA, -Y_DATA),
+        (CumulativeSumStep(), X_DATA, np.cumsum(Y_DATA)),
+        (DiffStep(), X_DATA[1:], np.diff(Y_DATA)),
+        (RollingMeanStep(window=3), X_DATA[2:], _rolling_mean(Y_DATA, 3)),
+        (RollingMeanStep(window=10), X_DATA[5:], [Y_DATA.mean()]),
+        (
+            ResampleStep(x_grid=lambda: np.array([-1.0, 0.5, 3.0, 7.0, 8.0])),
+            [-1.0, 0.5, 3.0, 7.0, 8.0],
+            [np.nan, -0.5, 1.75, -1.0, np.nan],
+        ),
+    ],
+    ids=["reverse", "flip", "cumsum", "diff", "rolling_mean", "window", "resample"],
+)
+def test_transform_step_output(step, expected_x, expected_y):
+    graph_data = GraphData(X_DATA, Y_DATA)
+    transformed = TransformPipeline("Step", [step]).apply(graph_data)
+
+    np.testing.assert_allclose(transformed.x_data(), expected_x)
+    np.testing.assert_allclose(transformed.y_data(), expected_y)
+    np.testing.assert_array_equal(graph_data.y_data(), Y_DATA)
+
+
+def test_resample_step_sorts_x_data():
+    order = np.array([3, 0, 5, 1, 4, 2])
+    step = ResampleStep(x_grid=lambda: X_DATA)
+    transformed = TransformPipeline("Resampled", [step]).apply(
+        GraphData(X_DATA[order], Y_DATA[order])
+    )
+    np.testing.assert_allclose(transformed.y_data(), Y_DATA)
+
+
+def test_pipeline_transforms_owned_buffer_in_place():
+    pipeline = TransformPipeline(
+        "Chained",
+        [ReverseStep(), FlipStep(), CumulativeSumStep(), DiffStep(), FlipStep()],
+    )
+    graph_data = GraphData(X_DATA, Y_DATA)
+    transformed = pipeline.apply(graph_data)
+
+    np.testing.assert_allclose(transformed.x_data(), X_DATA[1:])
+    np.testing.assert_allclose(transformed.y_data(), -np.diff(np.cumsum(-Y_DATA[::-1])))
+    np.testing.assert_array_equal(graph_data.y_data(), Y_DATA)
+    # Steps after the first allocating step reuse its buffer, i.e. the diff is a
+    # view of the cumulative sum
+    assert transformed.y_data().base is not None
+    assert not np.may_share_memory(transformed.y_data(), graph_data.y_data())
+
+
+def _graph_data_model(num_graphs: int, num_points: int) -> GraphDataModel:
+    graph_data_model = GraphDataModel()
+    graph_data_model.populate_from_data_source(
+        InMemoryGraphDataSource(
+            {
+                f"Graph {index}": GraphData(
+                    np.arange(num_points) + index, np.arange(num_points, dtype=float)
+                )
+                for index in range(num_graphs)
+            }
+        )
+    )
+    return graph_data_model
+
+
+def test_transformed_graph_data_memo_is_bounded_by_bytes(monkeypatch):
+    # Flipped x and y data of 100 float64 values, i.e. 1600 bytes per graph
+    monkeypatch.setattr(GraphDataModel, "TRANSFORMED_GRAPH_DATA_MEMORY_BYTES", 3200)
+    graph_data_model = _graph_data_model(3, 100)
+
+    flipped = [
+        graph_data_model.transformed_graph_data(f"Graph {index}", "Flipped")
+        for index in range(3)
+    ]
+    assert graph_data_model.transformed_graph_data("Graph 2", "Flipped") is flipped[2]
+    assert graph_data_model.transformed_graph_data("Graph 1", "Flipped") is flipped[1]
+    assert graph_data_model.transformed_graph_data("Graph 0", "Flipped") is not (
+        flipped[0]
+    )
+
+
+def test_transformed_views_of_graph_data_are_not_memoized():
+    graph_data_model = _graph_data_model(1, 100)
+    reversed_graph_data = graph_data_model.transformed_graph_data("Graph 0", "Reversed")
+    assert (
+        graph_data_model.transformed_graph_data("Graph 0", "Reversed")
+        is not reversed_graph_data
+    )
+    np.testing.assert_array_equal(
+        reversed_graph_data.y_data(), np.arange(100, dtype=float)[::-1]
+    )
+
+
+def test_precomputed_graph_data_is_dropped_for_new_data_version():
+    graph_data_model = _graph_data_model(1, 100)
+    precomputed = GraphData(np.arange(3), np.zeros(3))
+    graph_data_model.set_precomputed_graph_data(
+        lambda graph_name, pipeline_name: (
+            precomputed if pipeline_name == "Flipped" else None
+        )
+    )
+    assert graph_data_model.transformed_graph_data("Graph 0", "Flipped") is precomputed
+    np.testing.assert_array_equal(
+        graph_data_model.transformed_graph_data("Graph 0", "Cumulative sum").y_data(),
+        np.arange(100, dtype=float).cumsum(),
+    )
+
+    graph_data_model.populate_from_data_source(
+        InMemoryGraphDataSource({"Graph 0": GraphData(np.arange(10), np.ones(10))})
+    )
+    flipped = graph_data_model.transformed_graph_data("Graph 0", "Flipped")
+    np.testing.assert_array_equal(flipped.y_data(), -np.ones(10))
+    # pylint: disable=protected-access
+    assert graph_data_model._precomputed_graph_data is None
+    assert all(
+        key[2] == graph_data_model.data_version()
+        for key in graph_data_model._transformed_graph_data
+    )
+
+
+def test_resampled_graph_data_shares_common_x_grid():
+    graph_data_model = _graph_data_model(3, 100)
+    x_grid = graph_data_model.resample_x_grid()
+    assert len(x_grid) == GraphDataModel.RESAMPLE_GRID_POINTS
+    assert (x_grid[0], x_grid[-1]) == (0, 101)
+
+    for index in range(3):
+        resampled = graph_data_model.transformed_graph_data(
+            f"Graph {index}", "Resampled"
+        )
+        assert np.shares_memory(resampled.x_data(), x_grid)
+        assert np.isnan(resampled.y_data()[x_grid < index]).all()
+
+
+def _assert_statistics_equal(statistics, x_grid, stack):
+    np.testing.assert_allclose(statistics.x_data, x_grid)
+    np.testing.assert_allclose(statistics.mean, stack.mean(axis=0))
+    np.testing.assert_allclose(statistics.minimum, stack.min(axis=0))
+    np.testing.assert_allclose(statistics.maximum, stack.max(axis=0))
+    # P10 is the high estimate, and P90 the low estimate
+    np.testing.assert_allclose(statistics.p10, np.percentile(stack, 90, axis=0))
+    np.testing.assert_allclose(statistics.p90, np.percentile(stack, 10, axis=0))
+    assert statistics.num_realizations == len(stack)
+
+
+@pytest.mark.parametrize("num_realizations", [1, 2, 7, 23])
+@pytest.mark.parametrize("memory_budget_bytes", [1, 256 * 1024**2])
+def test_ensemble_statistics_with_shared_x(num_realizations, memory_budget_bytes):
+    rng = np.random.default_rng(num_realizations)
+    x_data = np.arange(50)
+    stack = rng.standard_normal((num_realizations, len(x_data)))
+    graph_set = GraphSet(
+        {f"Graph {row}": GraphData(x_data, y_data) for row, y_data in enumerate(stack)}
+    )
+
+    statistics = compute_ensemble_statistics(
+        graph_set, memory_budget_bytes=memory_budget_bytes
+    )
+    _assert_statistics_equal(statistics, x_data, stack)
+
+
+def test_ensemble_statistics_interpolates_onto_overlapping_x_range():
+    rng = np.random.default_rng(0)
+    graph_dict = {}
+    for row in range(9):
+        x_data = np.sort(rng.uniform(row * 0.1, 10 + row * 0.1, 40))
+        # Unsorted x data of every other graph
+        order = rng.permutation(40) if row % 2 else np.arange(40)
+        graph_dict[f"Graph {row}"] = GraphData(
+            x_data[order], rng.standard_normal(40)[order]
+        )
+
+    statistics = compute_ensemble_statistics(GraphSet(graph_dict), max_grid_points=25)
+
+    x_grid = np.linspace(
+        max(graph.x_data().min() for graph in graph_dict.values()),
+        min(graph.x_data().max() for graph in graph_dict.values()),
+        25,
+    )
+    stack = np.array(
+        [
+            np.interp(
+                x_grid,
+                np.sort(graph.x_data()),
+                graph.y_data()[np.argsort(graph.x_data())],
+            )
+            for graph in graph_dict.values()
+        ]
+    )
+    _assert_statistics_equal(statistics, x_grid, stack)
+
+
+def test_ensemble_statistics_without_overlapping_x_range_raises():
+    graph_set = GraphSet(
+        {"a": GraphData([0, 1], [0, 1]), "b": GraphData([2, 3], [0, 1])}
+    )
+    with pytest.raises(ValueError, match="overlapping"):
+        compute_ensemble_statistics(graph_set)
@@ -0,0 +1,291 @@
+import json
+import threading
+import time
+
+import dash
+
+from webviz_plugin_boilerplate.plugins import BestPracticePlugin
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._layout import (
+    GRAPH_SELECTION_OPTIONS_LIMIT,
+    ElementIds,
+    LayoutOptions,
+)
+
+UPDATE_COMPONENT_URL = "/_dash-update-component"
+
+# Keys of dict IDs matched by `MATCH` in the pattern-matching callbacks
+MATCH_KEYS = ("instance",)
+
+
+def stringify_id(component_id, match_keys=()):
+    """
+    Stringify component ID as done by the Dash renderer, where the values of
+    `match_keys` are replaced by the `MATCH` wildcard
+    """
+    if isinstance(component_id, dict):
+        component_id = {
+            key: ["MATCH"] if key in match_keys else value
+            for key, value in component_id.items()
+        }
+        return json.dumps(component_id, sort_keys=True, separators=(",", ":"))
+    return component_id
+
+
+def update_component_payload(outputs, inputs, state=None, changed=None):
+    """
+    Payload for a callback request, triggered by `changed` (component ID, property)
+    pairs, by default the first input
+    """
+    output_str = "...".join(
+        f"{stringify_id(elm[0], MATCH_KEYS)}.{elm[1]}" for elm in outputs
+    )
+    output_list = [{"id": elm[0], "property": elm[1]} for elm in outputs]
+    changed = changed if changed is not None else [inputs[0][:2]]
+    return {
+        "output": f"..{output_str}.." if len(outputs) > 1 else output_str,
+        "outputs": output_list if len(outputs) > 1 else output_list[0],
+        "inputs": [
+            {"id": elm[0], "property": elm[1], "value": elm[2]} for elm in inputs
+        ],
+        "state": [
+            {"id": elm[0], "property": elm[1], "value": elm[2]} for elm in state or []
+        ],
+        "changedPropIds": [f"{stringify_id(elm[0])}.{elm[1]}" for elm in changed],
+    }
+
+
+def best_practice_graph_payload(
+    get_uuid,
+    graph_name,
+    graph_type,
+    graph_data_visualization,
+    *,
+    relayout_data=None,
+    changed_element="graph_selection_dropdown",
+    session_id=None,
+):
+    graph_id = get_uuid("graph")
+    changed_property = "relayoutData" if changed_element == "graph" else "value"
+    return update_component_payload(
+        outputs=[(graph_id, "figure"), (graph_id, "relayoutData")],
+        inputs=[
+            (get_uuid("graph_selection_dropdown"), "value", graph_name),
+            (get_uuid("graph_type_radio_items"), "value", graph_type),
+            (
+                get_uuid("graph_data_visualization_radio_items"),
+                "value",
+                graph_data_visualization,
+            ),
+            (graph_id, "relayoutData", relayout_data),
+        ],
+        state=[(get_uuid("session_store"), "data", session_id)],
+        changed=[(get_uuid(changed_element), changed_property)],
+    )
+
+
+def create_test_client(**plugin_kwargs):
+    app = dash.Dash(__name__)
+    plugin = BestPracticePlugin(**plugin_kwargs)
+    app.layout = plugin.layout
+    return plugin, app.server.test_client()
+
+
+def _update_graph_selection_options(
+    client, get_uuid, search_value, options, page, more_clicks=None
+):
+    dropdown_id = get_uuid("graph_selection_dropdown")
+    more_button_id = get_uuid("graph_selection_more_button")
+    page_store_id = get_uuid("graph_selection_page_store")
+    response = client.post(
+        UPDATE_COMPONENT_URL,
+        json=update_component_payload(
+            outputs=[
+                (dropdown_id, "options"),
+                (page_store_id, "data"),
+                (get_uuid("graph_selection_matches"), "children"),
+                (more_button_id, "disabled"),
+            ],
+            inputs=[
+                (dropdown_id, "search_value", search_value),
+                (more_button_id, "n_clicks", more_clicks),
+            ],
+            state=[
+                (dropdown_id, "value", "Graph 0"),
+                (dropdown_id, "options", options),
+                (page_store_id, "data", page),
+            ],
+            changed=[
+                (
+                    (more_button_id, "n_clicks")
+                    if more_clicks
+                    else (dropdown_id, "search_value")
+                )
+            ],
+        ),
+    )
+    assert response.status_code == 200
+    outputs = response.get_json()["response"]
+    return (
+        outputs[stringify_id(dropdown_id)]["options"],
+        outputs[stringify_id(page_store_id)]["data"],
+        outputs[stringify_id(get_uuid("graph_selection_matches"))]["children"],
+        outputs[stringify_id(more_button_id)]["disabled"],
+    )
+
+
+def test_graph_selection_options_are_paged(npy_graph_directory):
+    num_graphs = 2 * GRAPH_SELECTION_OPTIONS_LIMIT + 10
+    plugin, client = create_test_client(data_path=npy_graph_directory(num_graphs, 10))
+    get_uuid = ElementIds(LayoutOptions(), plugin.uuid())
+
+    options, page, matches, is_last_page = _update_graph_selection_options(
+        client, get_uuid, "graph 1", None, None
+    )
+    # "Graph 1", "Graph 10"-"Graph 19" and "Graph 100"-"Graph 199"
+    assert len(options) == 1 + GRAPH_SELECTION_OPTIONS_LIMIT
+    assert options[0] == {"label": "Graph 0", "value": "Graph 0"}
+    assert matches == f"{GRAPH_SELECTION_OPTIONS_LIMIT} of 111 matches"
+    assert not is_last_page
+
+    options, page, matches, is_last_page = _update_graph_selection_options(
+        client, get_uuid, None, options, page, more_clicks=1
+    )
+    assert len(options) == 1 + 111
+    assert len({option["value"] for option in options}) == len(options)
+    assert page == {"query": "graph 1", "offset": 111}
+    assert matches == "111 of 111 matches"
+    assert is_last_page
+
+
+def _update_stream_graph(client, get_uuid, stream_position):
+    stream_graph_id = get_uuid("stream_graph")
+    stream_position_store_id = get_uuid("stream_position_store")
+    response = client.post(
+        UPDATE_COMPONENT_URL,
+        json=update_component_payload(
+            outputs=[
+                (stream_graph_id, "figure"),
+                (stream_graph_id, "extendData"),
+                (stream_position_store_id, "data"),
+            ],
+            inputs=[(get_uuid("stream_interval"), "n_intervals", 1)],
+            state=[(stream_position_store_id, "data", stream_position)],
+        ),
+    )
+    assert response.status_code == 200
+    outputs = response.get_json()["response"]
+    return (
+        outputs.get(stringify_id(stream_graph_id), {}).get("figure"),
+        outputs.get(stringify_id(stream_graph_id), {}).get("extendData"),
+        outputs[stringify_id(stream_position_store_id)]["data"],
+    )
+
+
+def test_stream_graph_sends_full_figure_for_position_of_other_feed():
+    # Producer is polled once when the feed is started, and then polled by the test
+    plugin, client = create_test_client(streaming=True, stream_interval_ms=3600_000)
+    get_uuid = ElementIds(LayoutOptions(stream_interval_ms=3600_000), plugin.uuid())
+    # pylint: disable=protected-access
+    stream_feed = plugin._stream_feed
+    assert stream_feed.feed_id() is None
+
+    figure, extension, position = _update_stream_graph(client, get_uuid, None)
+    assert figure is not None and extension is None
+    assert position["feed"] == stream_feed.feed_id()
+    deadline = time.monotonic() + 10
+    while stream_feed.graph_data().end_position() == 0:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    figure, extension, position = _update_stream_graph(client, get_uuid, None)
+
+    stream_feed.poll()
+    figure, extension, next_position = _update_stream_graph(client, get_uuid, position)
+    assert figure is None
+    assert len(extension[0]["x"][0]) == next_position["position"] - position["position"]
+
+    # Position of the feed of another worker process
+    other_position = {"feed": "other", "position": position["position"]}
+    figure, extension, _ = _update_stream_graph(client, get_uuid, other_position)
+    assert figure is not None and extension is None
+
+
+def _update_graph_in_session(client, get_uuid, graph_name, **payload_kwargs):
+    response = client.application.test_client().post(
+        UPDATE_COMPONENT_URL,
+        json=best_practice_graph_payload(
+            get_uuid,
+            graph_name,
+            "Line plot",
+            "Raw",
+            session_id="session",
+            **payload_kwargs,
+        ),
+    )
+    return response.status_code
+
+
+def test_superseded_graph_request_is_not_updated(npy_graph_directory):
+    plugin, client = create_test_client(
+        data_path=npy_graph_directory(2, 10), request_debounce_ms=500
+    )
+    get_uuid = ElementIds(LayoutOptions(), plugin.uuid())
+    status_codes = {}
+
+    def _update_graph(graph_name):
+        status_codes[graph_name] = _update_graph_in_session(
+            client, get_uuid, graph_name
+        )
+
+    superseded = threading.Thread(target=_update_graph, args=("Graph 0",))
+    superseded.start()
+    # Within the debounce window of the first request
+    time.sleep(0.1)
+    _update_graph("Graph 1")
+    superseded.join()
+
+    assert status_codes == {"Graph 0": 204, "Graph 1": 200}
+
+
+def test_relayout_without_x_axis_change_does_not_supersede_graph_request(
+    npy_graph_directory,
+):
+    plugin, client = create_test_client(
+        data_path=npy_graph_directory(2, 10), request_debounce_ms=500
+    )
+    get_uuid = ElementIds(LayoutOptions(), plugin.uuid())
+    status_codes = []
+
+    selection_change = threading.Thread(
+        target=lambda: status_codes.append(
+            _update_graph_in_session(client, get_uuid, "Graph 1")
+        )
+    )
+    selection_change.start()
+    # Y axis zoom within the debounce window of the pending selection change
+    time.sleep(0.1)
+    assert (
+        _update_graph_in_session(
+            client,
+            get_uuid,
+            "Graph 1",
+            relayout_data={"yaxis.range[0]": 0, "yaxis.range[1]": 1},
+            changed_element="graph",
+        )
+        == 204
+    )
+    selection_change.join()
+
+    assert status_codes == [200]
+
+
+def test_warmup_is_scheduled_by_first_graph_request(npy_graph_directory):
+    plugin, client = create_test_client(
+        data_path=npy_graph_directory(4, 10), warmup_graphs=2
+    )
+    get_uuid = ElementIds(LayoutOptions(), plugin.uuid())
+    # pylint: disable=protected-access
+    warmup_scheduler = plugin._warmup_scheduler
+    assert warmup_scheduler.progress().total == 0
+
+    assert _update_graph_in_session(client, get_uuid, "Graph 0") == 200
+    assert warmup_scheduler.progress().total > 0
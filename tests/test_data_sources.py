@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._business_logic import (
+    GraphSet,
+)
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._data_sources import (
+    ArrowGraphDataSource,
+    NpyGraphDataSource,
+    create_graph_data_source,
+)
+
+
+def _xy(seed: int, num_points: int = 100):
+    rng = np.random.default_rng(seed)
+    return np.arange(num_points, dtype=np.float64), rng.standard_normal(num_points)
+
+
+def _write_npy_files(directory, names):
+    for seed, name in enumerate(names):
+        x_data, y_data = _xy(seed)
+        if seed % 2:
+            array = np.empty(len(x_data), dtype=[("x", "f8"), ("y", "f8")])
+            array["x"], array["y"] = x_data, y_data
+        else:
+            array = np.vstack([x_data, y_data])
+        np.save(directory / f"{name}.npy", array)
+
+
+def _write_arrow_files(directory, names):
+    pa = pytest.importorskip("pyarrow")
+    # pylint: disable=import-outside-toplevel
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    for seed, name in enumerate(names):
+        x_data, y_data = _xy(seed)
+        table = pa.table({"x": x_data, "y": y_data, "other": y_data})
+        if seed % 2:
+            feather.write_feather(table, directory / f"{name}.arrow")
+        else:
+            pq.write_table(table, directory / f"{name}.parquet")
+
+
+@pytest.mark.parametrize(
+    "write_files, source_type",
+    [
+        (_write_npy_files, NpyGraphDataSource),
+        (_write_arrow_files, ArrowGraphDataSource),
+    ],
+    ids=["npy", "arrow"],
+)
+def test_directory_source_loads_graph_files(tmp_path, write_files, source_type):
+    names = ["b", "a", "c"]
+    write_files(tmp_path, names)
+    (tmp_path / "notes.txt").write_text("not graph data")
+
+    source = create_graph_data_source(tmp_path)
+    assert isinstance(source, source_type)
+    assert source.graph_names() == ["a", "b", "c"]
+    for seed, name in enumerate(names):
+        graph_data = source.load_graph_data(name)
+        x_data, y_data = _xy(seed)
+        np.testing.assert_array_equal(graph_data.x_data(), x_data)
+        np.testing.assert_array_equal(graph_data.y_data(), y_data)
+
+
+def test_data_version_changes_with_files(tmp_path):
+    _write_npy_files(tmp_path, ["a", "b"])
+    data_version = NpyGraphDataSource(tmp_path).data_version()
+    assert NpyGraphDataSource(tmp_path).data_version() == data_version
+
+    _write_npy_files(tmp_path, ["a", "b", "c"])
+    assert NpyGraphDataSource(tmp_path).data_version() != data_version
+
+
+def test_npy_file_with_invalid_shape_raises(tmp_path):
+    np.save(tmp_path / "a.npy", np.zeros((3, 10)))
+    with pytest.raises(ValueError, match="shape"):
+        NpyGraphDataSource(tmp_path).load_graph_data("a")
+
+
+def test_mixed_file_types_raise(tmp_path):
+    _write_npy_files(tmp_path, ["a"])
+    _write_arrow_files(tmp_path, ["b"])
+    with pytest.raises(ValueError, match="both"):
+        create_graph_data_source(tmp_path)
+
+
+def test_directory_without_graph_files_raises(tmp_path):
+    (tmp_path / "notes.txt").write_text("not graph data")
+    with pytest.raises(ValueError, match="No supported"):
+        create_graph_data_source(tmp_path)
+
+
+class _CountingNpyGraphDataSource(NpyGraphDataSource):
+    """Npy graph data source counting the loaded graphs"""
+
+    def __init__(self, directory) -> None:
+        super().__init__(directory)
+        self.num_loaded = 0
+
+    def load_graph_data(self, graph_name):
+        self.num_loaded += 1
+        return super().load_graph_data(graph_name)
+
+
+def test_graph_set_evicts_loaded_graphs_beyond_memory_budget(tmp_path):
+    _write_npy_files(tmp_path, ["a", "b", "c"])
+    source = _CountingNpyGraphDataSource(tmp_path)
+    # Budget of two graphs, with 100 float64 x and y values each
+    graph_set = GraphSet(source, memory_budget_bytes=2 * 1600)
+    assert graph_set.num_graphs() == 3
+
+    for name in ["a", "b", "c", "a", "c"]:
+        np.testing.assert_array_equal(
+            graph_set.graph_data(name).y_data(), _xy(ord(name) - ord("a"))[1]
+        )
+    # "a" is evicted when loading "c", while "c" is kept when reloading "a"
+    assert source.num_loaded == 4
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._business_logic import (
+    GraphData,
+)
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._decimation import (
+    bucket_aggregate,
+    lttb_decimate,
+    min_max_decimate,
+)
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._figure_cache import (
+    FigureCache,
+    SqliteFigureStore,
+)
+
+
+def _graph_data(num_points: int, seed: int = 0) -> GraphData:
+    rng = np.random.default_rng(seed)
+    return GraphData(np.arange(num_points), rng.standard_normal(num_points).cumsum())
+
+
+@pytest.mark.parametrize("num_points", [1001, 10_000, 123_457])
+@pytest.mark.parametrize("max_points", [4, 101, 1000])
+def test_lttb_keeps_max_points_including_first_and_last(num_points, max_points):
+    graph_data = _graph_data(num_points)
+    decimated = lttb_decimate(graph_data, max_points)
+
+    assert len(decimated) == max_points
+    x_data = decimated.x_data()
+    assert x_data[0] == 0 and x_data[-1] == num_points - 1
+    assert np.all(np.diff(x_data) > 0)
+    np.testing.assert_array_equal(decimated.y_data(), graph_data.y_data()[x_data])
+
+
+@pytest.mark.parametrize("num_points", [1001, 10_000, 123_457])
+@pytest.mark.parametrize("max_points", [4, 101, 1000])
+def test_min_max_keeps_extremes_within_max_points(num_points, max_points):
+    graph_data = _graph_data(num_points)
+    decimated = min_max_decimate(graph_data, max_points)
+
+    assert len(decimated) <= max_points
+    x_data = decimated.x_data()
+    y_data = graph_data.y_data()
+    assert x_data[0] == 0 and x_data[-1] == num_points - 1
+    assert y_data.argmin() in x_data and y_data.argmax() in x_data
+    np.testing.assert_array_equal(decimated.y_data(), y_data[x_data])
+
+
+@pytest.mark.parametrize("max_points", [10, 1000])
+def test_bucket_aggregate_keeps_max_points(max_points):
+    decimated = bucket_aggregate(_graph_data(10_001), max_points)
+    assert len(decimated) == max_points
+
+
+def test_graph_data_within_max_points_is_not_decimated():
+    graph_data = _graph_data(100)
+    for decimate in [lttb_decimate, min_max_decimate, bucket_aggregate]:
+        assert decimate(graph_data, 100) is graph_data
+
+
+def test_figures_not_persisted_are_cached_in_memory_only(tmp_path):
+    store = SqliteFigureStore(tmp_path / "figures.sqlite")
+    cache = FigureCache(max_memory_bytes=1 << 20, disk_store=store)
+    figure = {"data": [{"x": [0, 1], "y": [1, 2]}], "layout": {}}
+
+    cache.get_or_create(("zoomed",), "v1", lambda: figure, persist=False)
+    assert cache.get_or_create(("zoomed",), "v1", lambda: {}, persist=False) == figure
+    assert store.total_bytes() == 0
@@ -0,0 +1,139 @@
+from webviz_plugin_boilerplate._utils import CallbackMetrics
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._business_logic import (
+    GraphDataModel,
+)
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._figure_cache import (
+    FigureCache,
+    SqliteFigureStore,
+)
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._graph_figures import (
+    get_or_create_graph_figure,
+)
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._property_serialization import (
+    GraphFigureSettings,
+    GraphTypeOptions,
+    encode_figure,
+)
+
+
+def _figure(name: str) -> dict:
+    return {"data": [{"x": [0, 1, 2], "y": [1, 2, 3], "name": name}], "layout": {}}
+
+
+FIGURE_BYTES = len(encode_figure(_figure("a")))
+
+
+class _FigureFactory:
+    """Figure factory counting the created figures"""
+
+    def __init__(self) -> None:
+        self.num_created = 0
+
+    def __call__(self, name: str):
+        def _create_figure() -> dict:
+            self.num_created += 1
+            return _figure(name)
+
+        return _create_figure
+
+
+def test_memory_tier_evicts_least_recently_used_within_byte_budget():
+    cache = FigureCache(max_memory_bytes=2 * FIGURE_BYTES)
+    create = _FigureFactory()
+
+    cache.get_or_create(("a",), "v1", create("a"))
+    cache.get_or_create(("b",), "v1", create("b"))
+    cache.get_or_create(("a",), "v1", create("a"))
+    cache.get_or_create(("c",), "v1", create("c"))
+    assert cache.stats().memory_bytes <= 2 * FIGURE_BYTES
+
+    # "b" is least recently used, i.e. evicted
+    cache.get_or_create(("a",), "v1", create("a"))
+    cache.get_or_create(("b",), "v1", create("b"))
+    assert create.num_created == 4
+    assert cache.stats().memory_hits == 2
+
+
+def test_disk_tier_is_shared_between_caches(tmp_path):
+    create = _FigureFactory()
+    path = tmp_path / "figures.sqlite"
+    for _ in range(2):
+        cache = FigureCache(
+            max_memory_bytes=10 * FIGURE_BYTES, disk_store=SqliteFigureStore(path)
+        )
+        assert cache.get_or_create(("a",), "v1", create("a")) == _figure("a")
+
+    assert create.num_created == 1
+    assert cache.stats().disk_hits == 1
+
+
+def test_new_data_version_invalidates_own_namespace_only(tmp_path):
+    create = _FigureFactory()
+    path = tmp_path / "figures.sqlite"
+    store_1 = SqliteFigureStore(path, namespace="instance-1")
+    store_2 = SqliteFigureStore(path, namespace="instance-2")
+    FigureCache(FIGURE_BYTES, store_1).get_or_create(("a",), "v1", create("a"))
+    FigureCache(FIGURE_BYTES, store_2).get_or_create(("a",), "w1", create("a"))
+
+    FigureCache(FIGURE_BYTES, store_1).get_or_create(("a",), "v2", create("a"))
+    assert create.num_created == 3
+    assert store_1.get('["a"]', "v1") is None
+    assert store_1.get('["a"]', "v2") is not None
+    assert store_2.get('["a"]', "w1") is not None
+
+
+def test_disk_tier_evicts_least_recently_accessed_within_byte_budget(tmp_path):
+    store = SqliteFigureStore(tmp_path / "figures.sqlite", max_bytes=250)
+    for key in ["a", "b"]:
+        store.put(key, "v1", b"x" * 100)
+    assert store.get("a", "v1") is not None
+
+    store.put("c", "v1", b"x" * 100)
+    assert store.total_bytes() <= 250
+    assert store.get("b", "v1") is None
+    assert store.get("a", "v1") is not None
+    assert store.get("c", "v1") is not None
+
+    # Payloads exceeding the budget are not stored
+    store.put("d", "v1", b"x" * 300)
+    assert store.get("d", "v1") is None
+
+
+def test_payload_bytes_are_recorded_without_encoding_again(tmp_path):
+    create = _FigureFactory()
+    store = SqliteFigureStore(tmp_path / "figures.sqlite")
+    recorded_bytes = []
+    for _ in range(2):
+        cache = FigureCache(max_memory_bytes=10 * FIGURE_BYTES, disk_store=store)
+        for _ in range(2):
+            cache.get_or_create(
+                ("a",), "v1", create("a"), record_payload_bytes=recorded_bytes.append
+            )
+
+    # Miss and memory hit, then disk hit and memory hit
+    assert recorded_bytes == 4 * [FIGURE_BYTES]
+    assert create.num_created == 1
+
+
+def test_persisted_figures_are_invalidated_by_new_figure_settings(tmp_path):
+    graph_data_model = GraphDataModel()
+    graph_data_model.populate_with_mock_data()
+    store = SqliteFigureStore(tmp_path / "figures.sqlite")
+
+    def _num_points(figure_settings: GraphFigureSettings) -> int:
+        figure = get_or_create_graph_figure(
+            graph_data_model,
+            FigureCache(max_memory_bytes=10 * FIGURE_BYTES, disk_store=store),
+            figure_settings,
+            ["First Graph"],
+            GraphTypeOptions.LINE_PLOT,
+            "Raw",
+            None,
+            CallbackMetrics("test", enabled=False),
+        )
+        return len(figure["data"][0]["x"])
+
+    settings = GraphFigureSettings(validate=False)
+    assert _num_points(settings) == 5
+    assert _num_points(GraphFigureSettings(validate=False, max_points=4)) < 5
+    assert _num_points(settings) == 5
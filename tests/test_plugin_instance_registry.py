@@ -0,0 +1,14 @@
+import pytest
+
+from webviz_plugin_boilerplate._utils import PluginInstanceRegistry
+
+
+def test_instance_id_of_other_instance_is_not_replaced():
+    registry = PluginInstanceRegistry()
+    first_instance = object()
+    registry.register_instance("Plugin-1", first_instance)
+    registry.register_instance("Plugin-1", first_instance)
+
+    with pytest.raises(ValueError):
+        registry.register_instance("Plugin-1", object())
+    assert registry.instance("Plugin-1") is first_instance
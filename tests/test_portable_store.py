@@ -0,0 +1,125 @@
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+from webviz_plugin_boilerplate.plugins.best_practice_plugin import _portable_store
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._business_logic import (
+    GraphData,
+    GraphDataModel,
+    InMemoryGraphDataSource,
+    TransformPipeline,
+)
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._portable_store import (
+    PortableGraphDataSource,
+    graph_data_parquet_file,
+    populate_from_graph_data_parquet,
+    write_graph_data_parquet,
+)
+
+GRAPH_DICT = {
+    "Graph 0": GraphData(np.arange(25), np.arange(25, dtype=float) ** 2),
+    "Empty": GraphData(np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)),
+    "Graph 1": GraphData(
+        np.linspace(0, 1, 10, dtype=np.float32), -np.arange(10, dtype=np.int16)
+    ),
+    "Graph 2": GraphData(
+        np.iinfo(np.int64).max - np.arange(7, 0, -1), np.arange(7, dtype=np.int8)
+    ),
+}
+
+
+def _graph_data_model() -> GraphDataModel:
+    graph_data_model = GraphDataModel()
+    graph_data_model.populate_from_data_source(InMemoryGraphDataSource(GRAPH_DICT))
+    return graph_data_model
+
+
+@pytest.fixture(name="parquet_path")
+def fixture_parquet_path(tmp_path, monkeypatch):
+    # Graphs spanning several row groups
+    monkeypatch.setattr(_portable_store, "ROW_GROUP_ROWS", 10)
+    path = tmp_path / "graph_data.parquet"
+    write_graph_data_parquet(_graph_data_model(), path, derived_series=True)
+    return path
+
+
+def test_graph_data_round_trips_with_dtypes(parquet_path):
+    source = PortableGraphDataSource(parquet_path)
+    assert source.graph_names() == list(GRAPH_DICT)
+    assert source.data_version() == _graph_data_model().data_version()
+    for graph_name, graph_data in GRAPH_DICT.items():
+        loaded = source.load_graph_data(graph_name)
+        for array, expected in [
+            (loaded.x_data(), graph_data.x_data()),
+            (loaded.y_data(), graph_data.y_data()),
+        ]:
+            assert array.dtype == expected.dtype
+            np.testing.assert_array_equal(array, expected)
+
+
+def test_graphs_share_row_groups(parquet_path):
+    graph_data_model = _graph_data_model()
+    num_rows = sum(
+        len(graph_data_model.transformed_graph_data(graph_name, pipeline_name))
+        for graph_name in GRAPH_DICT
+        for pipeline_name in graph_data_model.transform_pipelines().pipeline_names()
+    )
+    file_metadata = pq.ParquetFile(parquet_path).metadata
+    assert file_metadata.num_rows == num_rows
+    assert file_metadata.num_row_groups == -(-num_rows // 10)
+
+    # Graphs spanning several row groups and starting within a row group
+    source = PortableGraphDataSource(parquet_path)
+    for graph_name, pipeline_name in [
+        ("Graph 1", "Cumulative sum"),
+        ("Graph 2", "Reversed"),
+    ]:
+        expected = graph_data_model.transformed_graph_data(graph_name, pipeline_name)
+        loaded = source.load_derived_graph_data(graph_name, pipeline_name)
+        assert loaded.y_data().dtype == expected.y_data().dtype
+        np.testing.assert_array_equal(loaded.y_data(), expected.y_data())
+
+
+def test_graph_data_is_read_lazily_within_memory_budget(parquet_path):
+    graph_data_model = GraphDataModel()
+    # Budget of Graph 0, with int64 x data and float64 y data
+    populate_from_graph_data_parquet(
+        graph_data_model, parquet_path, memory_budget_bytes=25 * 16
+    )
+    graph_set = graph_data_model.graph_set()
+    # pylint: disable=protected-access
+    assert not graph_set._loaded_graphs
+
+    graph_set.graph_data("Graph 0")
+    graph_set.graph_data("Graph 1")
+    assert list(graph_set._loaded_graphs) == ["Graph 1"]
+
+
+def test_derived_series_are_served_without_transforming(parquet_path, monkeypatch):
+    expected = _graph_data_model().transformed_graph_data("Graph 0", "Cumulative sum")
+    graph_data_model = GraphDataModel()
+    populate_from_graph_data_parquet(graph_data_model, parquet_path)
+
+    def _not_applied(*_):
+        raise AssertionError("Derived series transformed at runtime")
+
+    monkeypatch.setattr(TransformPipeline, "apply", _not_applied)
+    transformed = graph_data_model.transformed_graph_data("Graph 0", "Cumulative sum")
+    np.testing.assert_array_equal(transformed.x_data(), expected.x_data())
+    np.testing.assert_array_equal(transformed.y_data(), expected.y_data())
+    # pylint: disable=protected-access
+    assert not graph_data_model.graph_set()._loaded_graphs
+
+
+def test_graph_data_parquet_file_of_mock_data():
+    graph_data_model = GraphDataModel()
+    populate_from_graph_data_parquet(graph_data_model, graph_data_parquet_file())
+    assert graph_data_model.graph_set().graph_names() == (
+        "First Graph",
+        "Second Graph",
+        "Third Graph",
+    )
+    np.testing.assert_array_equal(
+        graph_data_model.graph_set().graph_data("Third Graph").y_data(),
+        [0, 2, 4, 2, 0],
+    )
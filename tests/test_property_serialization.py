@@ -0,0 +1,123 @@
+import base64
+
+import numpy as np
+import plotly.io as pio
+import pytest
+
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._business_logic import (
+    GraphData,
+    GraphSet,
+    compute_ensemble_statistics,
+)
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._property_serialization import (
+    ArrayEncoding,
+    GraphFigureBuilder,
+    GraphFigureSettings,
+    GraphTypeOptions,
+    decode_figure,
+)
+
+
+def _graph_data(num_points: int, seed: int = 0) -> GraphData:
+    rng = np.random.default_rng(seed)
+    return GraphData(np.arange(num_points), rng.standard_normal(num_points).cumsum())
+
+
+def _normalize(obj):
+    """
+    Normalize decoded plotly JSON, i.e. decode base64 typed arrays to lists and NaN
+    to None for comparison
+    """
+    if isinstance(obj, dict):
+        if set(obj) == {"dtype", "bdata"}:
+            return _normalize(
+                np.frombuffer(
+                    base64.b64decode(obj["bdata"]), dtype=obj["dtype"]
+                ).tolist()
+            )
+        return {key: _normalize(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_normalize(value) for value in obj]
+    if isinstance(obj, float) and np.isnan(obj):
+        return None
+    return obj
+
+
+def _normalized_json(figure: dict):
+    return _normalize(decode_figure(pio.to_json(figure).encode()))
+
+
+def _build_figures(graph_type, graph_data_list, **settings):
+    """Validated and fast-path figure of the graph data"""
+    figures = []
+    for validate in [True, False]:
+        figure_builder = GraphFigureBuilder.from_settings(
+            graph_type, GraphFigureSettings(validate=validate, **settings)
+        )
+        figure_builder.add_graph_title("Test graph")
+        figure_builder.add_ui_revision("Test revision")
+        for index, graph_data in enumerate(graph_data_list):
+            figure_builder.add_graph_data(
+                graph_data, name=f"Graph {index}" if len(graph_data_list) > 1 else None
+            )
+        figures.append(_normalized_json(figure_builder.get_serialized_figure()))
+    return figures
+
+
+@pytest.mark.parametrize("graph_type", list(GraphTypeOptions))
+@pytest.mark.parametrize("max_points", [None, 500])
+def test_fast_path_equivalent_to_validated_figure(graph_type, max_points):
+    validated, fast_path = _build_figures(
+        graph_type, [_graph_data(2000)], max_points=max_points
+    )
+    assert fast_path == validated
+
+
+@pytest.mark.parametrize("graph_type", list(GraphTypeOptions))
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {},
+        {"webgl_point_threshold": 100},
+        {"max_separate_traces": 2},
+    ],
+    ids=["separate_traces", "webgl", "batched_traces"],
+)
+def test_fast_path_equivalent_to_validated_overlay(graph_type, settings):
+    graph_data_list = [_graph_data(200, seed) for seed in range(3)]
+    validated, fast_path = _build_figures(graph_type, graph_data_list, **settings)
+    assert fast_path == validated
+
+
+def test_fast_path_equivalent_to_validated_ensemble_statistics():
+    statistics = compute_ensemble_statistics(
+        GraphSet({f"Graph {seed}": _graph_data(200, seed) for seed in range(10)})
+    )
+    figures = []
+    for validate in [True, False]:
+        figure_builder = GraphFigureBuilder.from_settings(
+            GraphTypeOptions.LINE_PLOT, GraphFigureSettings(validate=validate)
+        )
+        figure_builder.add_ensemble_statistics(statistics)
+        figures.append(_normalized_json(figure_builder.get_serialized_figure()))
+    assert figures[1] == figures[0]
+
+
+@pytest.mark.parametrize("validate", [True, False])
+@pytest.mark.parametrize("array_encoding", list(ArrayEncoding))
+def test_array_encoding_applies_with_and_without_validation(validate, array_encoding):
+    figure_builder = GraphFigureBuilder.from_settings(
+        GraphTypeOptions.LINE_PLOT,
+        GraphFigureSettings(validate=validate, array_encoding=array_encoding),
+    )
+    figure_builder.add_graph_data(_graph_data(100))
+    trace = decode_figure(figure_builder.get_encoded_figure())["data"][0]
+
+    if array_encoding is ArrayEncoding.LIST:
+        assert trace["x"] == list(range(100))
+        assert isinstance(trace["y"], list)
+    else:
+        assert set(trace["y"]) == {"dtype", "bdata"}
+        assert trace["y"]["dtype"] == (
+            "f4" if array_encoding is ArrayEncoding.BINARY_FLOAT32 else "f8"
+        )
@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from webviz_plugin_boilerplate._utils import RequestGenerations, StaleRequest
+
+
+def test_later_request_of_session_supersedes_request_in_progress():
+    generations = RequestGenerations()
+    first = generations.start("session")
+    other_session = generations.start("other session")
+    assert not first.is_stale()
+
+    second = generations.start("session")
+    assert first.is_stale()
+    with pytest.raises(StaleRequest):
+        first.check()
+    second.check()
+    other_session.check()
+
+
+def test_requests_without_session_are_never_stale():
+    generations = RequestGenerations()
+    first = generations.start(None)
+    generations.start(None)
+    first.check()
+
+
+def test_debounce_coalesces_burst_into_last_request():
+    generations = RequestGenerations(debounce_s=0.2)
+    results = {}
+
+    def _request(index: int, started: threading.Event) -> None:
+        request = generations.start("session")
+        started.set()
+        try:
+            request.debounce()
+            results[index] = "completed"
+        except StaleRequest:
+            results[index] = "superseded"
+
+    threads = []
+    for index in range(3):
+        started = threading.Event()
+        threads.append(threading.Thread(target=_request, args=(index, started)))
+        threads[-1].start()
+        started.wait()
+    for thread in threads:
+        thread.join()
+
+    assert results == {0: "superseded", 1: "superseded", 2: "completed"}
+
+
+def test_least_recently_started_sessions_are_evicted():
+    generations = RequestGenerations(max_sessions=2)
+    superseded = generations.start("session 0")
+    generations.start("session 1")
+    generations.start("session 0")
+    latest = generations.start("session 1")
+    assert superseded.is_stale()
+
+    generations.start("session 2")
+    # pylint: disable=protected-access
+    assert list(generations._generations) == ["session 1", "session 2"]
+    assert not latest.is_stale()
+    # Requests of evicted sessions are not superseded anymore
+    assert not superseded.is_stale()
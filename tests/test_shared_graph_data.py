@@ -0,0 +1,98 @@
+import os
+import pickle
+import subprocess
+import sys
+
+import numpy as np
+
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._business_logic import (
+    GraphData,
+    InMemoryGraphDataSource,
+)
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._shared_graph_data import (
+    SharedMemoryGraphDataSource,
+    _remove_shared_file,
+)
+
+
+class _CountingGraphDataSource(InMemoryGraphDataSource):
+    """In-memory graph data source counting the loaded graphs"""
+
+    def __init__(self, graph_dict) -> None:
+        super().__init__(graph_dict)
+        self.num_loaded = 0
+
+    def load_graph_data(self, graph_name):
+        self.num_loaded += 1
+        return super().load_graph_data(graph_name)
+
+
+def _source() -> _CountingGraphDataSource:
+    return _CountingGraphDataSource(
+        {
+            "a": GraphData(np.arange(5), np.linspace(0, 1, 5)),
+            "b": GraphData(np.arange(3, dtype=np.int8), np.ones(3, dtype=np.float32)),
+            "empty": GraphData(np.empty(0), np.empty(0)),
+        }
+    )
+
+
+def _lock_path(shared_source: SharedMemoryGraphDataSource):
+    path = shared_source.path()
+    return path.with_name(f"{path.name}.lock")
+
+
+def test_shared_graph_data_round_trip(tmp_path):
+    source = _source()
+    shared_source = SharedMemoryGraphDataSource.create_or_attach(source, tmp_path)
+
+    assert shared_source.data_version() == source.data_version()
+    assert shared_source.graph_names() == ["a", "b", "empty"]
+    for name in source.graph_names():
+        expected = source.load_graph_data(name)
+        for shared, original in [
+            (shared_source.load_graph_data(name).x_data(), expected.x_data()),
+            (shared_source.load_graph_data(name).y_data(), expected.y_data()),
+        ]:
+            assert shared.dtype == original.dtype
+            assert not shared.flags.writeable
+            np.testing.assert_array_equal(shared, original)
+
+    unpickled = pickle.loads(pickle.dumps(shared_source))
+    np.testing.assert_array_equal(
+        unpickled.load_graph_data("a").y_data(), np.linspace(0, 1, 5)
+    )
+
+
+def test_shared_graph_data_is_created_once(tmp_path):
+    source = _source()
+    first = SharedMemoryGraphDataSource.create_or_attach(source, tmp_path)
+    second = SharedMemoryGraphDataSource.create_or_attach(source, tmp_path)
+
+    assert second.path() == first.path()
+    assert source.num_loaded == 3
+    assert _lock_path(first).read_text() == str(os.getpid())
+
+
+def test_owner_removes_shared_file_and_lock_file(tmp_path):
+    shared_source = SharedMemoryGraphDataSource.create_or_attach(_source(), tmp_path)
+
+    _remove_shared_file(shared_source.path(), os.getpid() + 1)
+    assert shared_source.path().exists()
+
+    _remove_shared_file(shared_source.path(), os.getpid())
+    assert not shared_source.path().exists()
+    assert not _lock_path(shared_source).exists()
+
+
+def test_shared_file_left_over_by_dead_owner_is_adopted(tmp_path):
+    source = _source()
+    shared_source = SharedMemoryGraphDataSource.create_or_attach(source, tmp_path)
+    with subprocess.Popen([sys.executable, "-c", "pass"]) as process:
+        process.wait()
+    _lock_path(shared_source).write_text(str(process.pid))
+
+    adopted = SharedMemoryGraphDataSource.create_or_attach(source, tmp_path)
+    assert adopted.path() == shared_source.path()
+    assert source.num_loaded == 3
+    assert _lock_path(adopted).read_text() == str(os.getpid())
@@ -0,0 +1,53 @@
+import numpy as np
+
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._business_logic import (
+    GraphData,
+)
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._decimation import (
+    DecimationMethod,
+)
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._property_serialization import (
+    GraphFigureSettings,
+    serialize_stream_extension,
+)
+from webviz_plugin_boilerplate.plugins.best_practice_plugin._streaming import (
+    GeneratorGraphDataProducer,
+    StreamingFeed,
+)
+
+
+def test_feed_id_is_assigned_when_started():
+    feed = StreamingFeed(GeneratorGraphDataProducer([]), capacity=10)
+    assert feed.feed_id() is None
+
+    feed.ensure_started()
+    feed_id = feed.feed_id()
+    assert feed_id is not None
+    feed.ensure_started()
+    assert feed.feed_id() == feed_id
+    assert StreamingFeed(GeneratorGraphDataProducer([]), capacity=10).feed_id() is None
+
+
+def test_stream_extension_is_decimated_as_stream_window():
+    rng = np.random.default_rng(0)
+    new_points = GraphData(np.arange(500), rng.standard_normal(500))
+    for method in DecimationMethod:
+        settings = GraphFigureSettings(
+            max_points=100, decimation_method=method, stream_window_points=1000
+        )
+        extension, trace_indices, max_trace_points = serialize_stream_extension(
+            new_points, settings
+        )
+        assert trace_indices == [0]
+        assert max_trace_points == 100
+        assert 4 <= len(extension["x"][0]) <= 50
+        assert len(extension["x"][0]) == len(extension["y"][0])
+
+
+def test_stream_extension_without_decimation_keeps_stream_window():
+    new_points = GraphData(np.arange(500), np.ones(500))
+    extension, _, max_trace_points = serialize_stream_extension(
+        new_points, GraphFigureSettings(max_points=None, stream_window_points=1000)
+    )
+    assert len(extension["x"][0]) == 500
+    assert max_trace_points == 1000
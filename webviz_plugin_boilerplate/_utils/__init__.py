@@ -0,0 +1,8 @@
+from ._callback_metrics import (
+    CallbackMetrics,
+    MetricsRegistry,
+    METRICS_REGISTRY,
+    register_metrics_route,
+)
+from ._plugin_instance_registry import INSTANCE_ID_KEY, PluginInstanceRegistry
+from ._request_generations import RequestGeneration, RequestGenerations, StaleRequest
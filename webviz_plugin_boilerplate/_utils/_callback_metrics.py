@@ -0,0 +1,257 @@
+import bisect
+import threading
+import time
+from typing import Dict, List, Sequence, Tuple
+
+import flask
+
+######################################################################
+#
+# Lightweight instrumentation of Dash callbacks
+#
+# Timing spans around the phases of a callback (e.g. de-serialization,
+# business logic and prop serialization), recording wall time, payload
+# bytes and number of graph points into histograms. The histograms
+# are exposed in Prometheus text format on a Flask route.
+#
+# When disabled, spans are a shared no-op object, i.e. near zero
+# overhead in the callbacks.
+#
+# Usable by any plugin:
+#
+#   metrics = CallbackMetrics("MyPlugin.update_graph", enabled=True)
+#   with metrics.span("business_logic") as span:
+#       ...
+#       span.record_points(num_points)
+#
+######################################################################
+
+DURATION_BUCKETS_SECONDS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+PAYLOAD_BUCKETS_BYTES = tuple(1024 * 4**exp for exp in range(10))
+POINT_BUCKETS = tuple(10**exp for exp in range(1, 9))
+
+
+class _Histogram:
+    """Histogram with cumulative buckets, as in Prometheus"""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self._buckets = tuple(buckets)
+        self._counts = [0] * (len(self._buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def samples(self) -> Tuple[List[Tuple[str, int]], float, int]:
+        """Cumulative bucket counts by upper bound, sum and count"""
+        with self._lock:
+            counts = list(self._counts)
+            total_sum = self._sum
+
+        cumulative: List[Tuple[str, int]] = []
+        running = 0
+        for bound, count in zip(list(self._buckets) + ["+Inf"], counts):
+            running += count
+            cumulative.append((str(bound), running))
+        return cumulative, total_sum, running
+
+
+class MetricsRegistry:
+    """Registry of histogram metrics, with labels, exposed in Prometheus format"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Tuple[str, Sequence[float]]] = {}
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], _Histogram] = {}
+
+    def define_histogram(
+        self, name: str, description: str, buckets: Sequence[float]
+    ) -> None:
+        with self._lock:
+            self._metrics.setdefault(name, (description, buckets))
+
+    def histogram(self, name: str, labels: Dict[str, str]) -> _Histogram:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = _Histogram(self._metrics[name][1])
+                self._histograms[key] = histogram
+            return histogram
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            histograms = sorted(self._histograms.items(), key=lambda elm: elm[0])
+
+        lines: List[str] = []
+        for name, (description, _) in sorted(metrics.items()):
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} histogram")
+            for (histogram_name, labels), histogram in histograms:
+                if histogram_name == name:
+                    lines.extend(_render_histogram(name, labels, histogram))
+        return "\n".join(lines) + "\n"
+
+
+def _render_histogram(
+    name: str, labels: Tuple[Tuple[str, str], ...], histogram: _Histogram
+) -> List[str]:
+    label_str = ",".join(
+        f'{key}="{_escape_label_value(value)}"' for key, value in labels
+    )
+    bucket_label_prefix = f"{label_str}," if label_str else ""
+
+    buckets, total_sum, count = histogram.samples()
+    lines = [
+        f'{name}_bucket{{{bucket_label_prefix}le="{bound}"}} {bucket_count}'
+        for bound, bucket_count in buckets
+    ]
+    lines.append(f"{name}_sum{{{label_str}}} {total_sum}")
+    lines.append(f"{name}_count{{{label_str}}} {count}")
+    return lines
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+METRICS_REGISTRY = MetricsRegistry()
+
+DURATION_METRIC = "webviz_callback_phase_duration_seconds"
+PAYLOAD_METRIC = "webviz_callback_payload_bytes"
+POINTS_METRIC = "webviz_callback_graph_points"
+
+METRICS_REGISTRY.define_histogram(
+    DURATION_METRIC, "Wall time of callback phases", DURATION_BUCKETS_SECONDS
+)
+METRICS_REGISTRY.define_histogram(
+    PAYLOAD_METRIC, "Size of serialized callback payloads", PAYLOAD_BUCKETS_BYTES
+)
+METRICS_REGISTRY.define_histogram(
+    POINTS_METRIC, "Number of graph points handled in callbacks", POINT_BUCKETS
+)
+
+
+class _NullSpan:
+    """No-op span used when metrics are disabled"""
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        pass
+
+    def record_points(self, num_points: int) -> None:
+        pass
+
+    def record_payload_bytes(self, num_bytes: int) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span(_NullSpan):
+    def __init__(self, metrics: "CallbackMetrics", phase: str) -> None:
+        self._metrics = metrics
+        self._phase = phase
+        self._start = 0.0
+
+    def __enter__(self) -> "_Span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self._metrics.histogram(DURATION_METRIC, self._phase).observe(
+            time.perf_counter() - self._start
+        )
+
+    def record_points(self, num_points: int) -> None:
+        self._metrics.histogram(POINTS_METRIC, self._phase).observe(num_points)
+
+    def record_payload_bytes(self, num_bytes: int) -> None:
+        self._metrics.histogram(PAYLOAD_METRIC, self._phase).observe(num_bytes)
+
+
+class CallbackMetrics:
+    """
+    Metrics for the phases of a callback
+
+    Spans are context managers timing a phase of the callback, and can record the
+    payload bytes and number of graph points handled in the phase. When disabled, a
+    shared no-op span is returned.
+    """
+
+    def __init__(
+        self,
+        callback_name: str,
+        enabled: bool = True,
+        registry: MetricsRegistry = METRICS_REGISTRY,
+    ) -> None:
+        self._callback_name = callback_name
+        self._enabled = enabled
+        self._registry = registry
+        self._histograms: Dict[Tuple[str, str], _Histogram] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def span(self, phase: str) -> _NullSpan:
+        if not self._enabled:
+            return _NULL_SPAN
+        return _Span(self, phase)
+
+    def histogram(self, metric_name: str, phase: str) -> _Histogram:
+        histogram = self._histograms.get((metric_name, phase))
+        if histogram is None:
+            histogram = self._registry.histogram(
+                metric_name, {"callback": self._callback_name, "phase": phase}
+            )
+            self._histograms[(metric_name, phase)] = histogram
+        return histogram
+
+
+def register_metrics_route(
+    server: flask.Flask,
+    path: str = "/metrics",
+    registry: MetricsRegistry = METRICS_REGISTRY,
+) -> None:
+    """
+    Register Flask route exposing the metrics in Prometheus text format. The route
+    is only registered once per server.
+
+    NOTE: Metrics are collected per process, i.e. each worker process exposes its
+    own metrics.
+    """
+    endpoint = f"webviz_callback_metrics_{path}"
+    if endpoint in server.view_functions:
+        return
+
+    def _metrics() -> flask.Response:
+        return flask.Response(
+            registry.render_prometheus(),
+            mimetype="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+    server.add_url_rule(path, endpoint=endpoint, view_func=_metrics)
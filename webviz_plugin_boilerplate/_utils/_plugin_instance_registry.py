@@ -0,0 +1,84 @@
+import threading
+import weakref
+from typing import Callable, Dict, Generic, Hashable, Set, TypeVar
+
+from dash import callback_context, get_app
+
+######################################################################
+#
+# Registry of plugin instances for pattern-matching callbacks
+#
+# Callbacks with dict IDs and `MATCH` are registered once per Dash
+# app, and serve the layout elements of any number of plugin
+# instances. The instance is identified by the INSTANCE_ID_KEY of
+# the matched element IDs, and its state (e.g. data model) is looked
+# up in the registry. Instance IDs are unique within the process, as
+# the matched callbacks do not tell which app is served, i.e. an ID
+# registered by a plugin instance of another app is an error.
+#
+# Usable by any plugin:
+#
+#   INSTANCES: PluginInstanceRegistry[MyState] = PluginInstanceRegistry()
+#
+#   INSTANCES.register_instance(self.uuid(), MyState(...))
+#   INSTANCES.register_callbacks_once("MyPlugin", _register_callbacks)
+#
+#   # In callback with {"element": ..., INSTANCE_ID_KEY: MATCH} IDs
+#   state = INSTANCES.matched_instance()
+#
+######################################################################
+
+INSTANCE_ID_KEY = "instance"
+
+InstanceState = TypeVar("InstanceState")
+
+
+class PluginInstanceRegistry(Generic[InstanceState]):
+    """Registry of plugin instance states keyed by instance ID"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._instances: Dict[str, InstanceState] = {}
+        self._registered_callbacks: (
+            "weakref.WeakKeyDictionary[object, Set[Hashable]]"
+        ) = weakref.WeakKeyDictionary()
+
+    def register_instance(self, instance_id: str, instance: InstanceState) -> None:
+        with self._lock:
+            registered = self._instances.get(instance_id)
+            if registered is not None and registered is not instance:
+                raise ValueError(
+                    f'Plugin instance "{instance_id}" is already registered, '
+                    "e.g. by a plugin instance of another app in this process!"
+                )
+            self._instances[instance_id] = instance
+
+    def instance(self, instance_id: str) -> InstanceState:
+        with self._lock:
+            instance = self._instances.get(instance_id)
+        if instance is None:
+            raise KeyError(f'Plugin instance "{instance_id}" is not registered!')
+        return instance
+
+    def matched_instance(self) -> InstanceState:
+        """
+        Instance of the elements matched by the running pattern-matching callback,
+        given by the ID of the first callback output
+        """
+        outputs = callback_context.outputs_list
+        output = outputs[0] if isinstance(outputs, list) else outputs
+        return self.instance(output["id"][INSTANCE_ID_KEY])
+
+    def register_callbacks_once(
+        self, key: Hashable, register_callbacks: Callable[[], None]
+    ) -> None:
+        """
+        Register callbacks by `register_callbacks` once per Dash app and key, i.e. the
+        callbacks are shared by the instances of the app
+        """
+        with self._lock:
+            registered = self._registered_callbacks.setdefault(get_app(), set())
+            if key in registered:
+                return
+            registered.add(key)
+            register_callbacks()
@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+######################################################################
+#
+# Cancellation of stale callback requests
+#
+# Each request of a session starts a new generation, superseding the
+# requests of the session still in progress, e.g. when scrubbing
+# through a dropdown. A superseded request aborts at the next check,
+# placed between the phases of the callback, instead of computing a
+# result which is never displayed.
+#
+# Optionally, requests wait for a debounce window before starting,
+# i.e. bursts of requests are coalesced into the last request.
+#
+# Usable by any plugin:
+#
+#   generations = RequestGenerations(debounce_s=0.05)
+#   request = generations.start(session_id)
+#   request.debounce()
+#   ...
+#   request.check()
+#
+# NOTE: Generations are tracked per process, i.e. requests of a session
+# served by another worker process are not superseded.
+#
+######################################################################
+
+
+class StaleRequest(Exception):
+    """Request superseded by a later request of the same session"""
+
+
+class RequestGeneration:
+    """Generation of a request in progress, see `RequestGenerations.start`"""
+
+    def __init__(
+        self,
+        generations: "RequestGenerations",
+        session_id: Optional[Hashable],
+        generation: int,
+    ) -> None:
+        self._generations = generations
+        self._session_id = session_id
+        self._generation = generation
+
+    def is_stale(self) -> bool:
+        return self._generations.is_stale(self._session_id, self._generation)
+
+    def check(self) -> None:
+        """Raise `StaleRequest` when superseded by a later request of the session"""
+        if self.is_stale():
+            raise StaleRequest
+
+    def debounce(self) -> None:
+        """Wait for the debounce window, and check whether superseded meanwhile"""
+        if self._generations.debounce_s > 0:
+            time.sleep(self._generations.debounce_s)
+        self.check()
+
+
+class RequestGenerations:
+    """
+    Generation tracking of requests per session, keeping the latest generation of
+    at most `max_sessions` sessions. Requests without session are never stale.
+    """
+
+    def __init__(self, debounce_s: float = 0.0, max_sessions: int = 10000) -> None:
+        self.debounce_s = debounce_s
+        self._max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._generations: "OrderedDict[Hashable, int]" = OrderedDict()
+
+    def start(self, session_id: Optional[Hashable]) -> RequestGeneration:
+        """Start request of session, superseding the requests in progress"""
+        if session_id is None:
+            return RequestGeneration(self, None, 0)
+        with self._lock:
+            generation = self._generations.pop(session_id, 0) + 1
+            self._generations[session_id] = generation
+            if len(self._generations) > self._max_sessions:
+                self._generations.popitem(last=False)
+        return RequestGeneration(self, session_id, generation)
+
+    def is_stale(self, session_id: Optional[Hashable], generation: int) -> bool:
+        if session_id is None:
+            return False
+        with self._lock:
+            # Sessions evicted by newer sessions keep their requests
+            return self._generations.get(session_id, generation) != generation
@@ -1,3 +1,29 @@
-from ._some_custom_plugin import SomeCustomPlugin
-from ._some_other_custom_plugin import SomeOtherCustomPlugin
-from .best_practice_plugin import BestPracticePlugin
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+# Plugins are imported on first access, e.g. when loaded by the webviz entry points,
+# i.e. only the plugins used by a configuration are imported
+_PLUGIN_MODULES = {
+    "SomeCustomPlugin": "._some_custom_plugin",
+    "SomeOtherCustomPlugin": "._some_other_custom_plugin",
+    "BestPracticePlugin": ".best_practice_plugin",
+}
+
+__all__ = list(_PLUGIN_MODULES)
+
+if TYPE_CHECKING:
+    from ._some_custom_plugin import SomeCustomPlugin
+    from ._some_other_custom_plugin import SomeOtherCustomPlugin
+    from .best_practice_plugin import BestPracticePlugin
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _PLUGIN_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    plugin = getattr(importlib.import_module(_PLUGIN_MODULES[name], __name__), name)
+    globals()[name] = plugin
+    return plugin
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -3,8 +3,20 @@ from webviz_config import WebvizPluginABC
 
 
 class SomeCustomPlugin(WebvizPluginABC):
+    def __init__(self):
+
+        super().__init__()
+
+        self._layout = None
+
     @property
     def layout(self):
-        return html.Div(
-            [html.H1("This is a static title"), "And this is just some ordinary text"]
-        )
+        # Static layout, built on first access
+        if self._layout is None:
+            self._layout = html.Div(
+                [
+                    html.H1("This is a static title"),
+                    "And this is just some ordinary text",
+                ]
+            )
+        return self._layout
@@ -1,32 +1,56 @@
-from uuid import uuid4
-
-from dash import callback
+from dash import MATCH, callback
 from dash.dependencies import Input, Output
 import dash_html_components as html
 from webviz_config import WebvizPluginABC
 
+from .._utils import INSTANCE_ID_KEY, PluginInstanceRegistry
+
+# Callbacks are shared by all instances, i.e. no instance state is registered
+PLUGIN_INSTANCES: PluginInstanceRegistry[None] = PluginInstanceRegistry()
+
+
+def _element_id(element: str, instance_id=MATCH) -> dict:
+    return {
+        "plugin": "SomeOtherCustomPlugin",
+        "element": element,
+        INSTANCE_ID_KEY: instance_id,
+    }
+
 
 class SomeOtherCustomPlugin(WebvizPluginABC):
     def __init__(self):
 
         super().__init__()
 
-        self.button_id = f"submit-button-{uuid4()}"
-        self.div_id = f"output-state-{uuid4()}"
+        self.button_id = _element_id("submit-button", self.uuid())
+        self.div_id = _element_id("output-state", self.uuid())
+        self._layout = None
 
         self.set_callbacks()
 
     @property
     def layout(self):
-        return html.Div(
-            [
-                html.H1("This is a static title"),
-                html.Button(id=self.button_id, n_clicks=0, children="Submit"),
-                html.Div(id=self.div_id),
-            ]
-        )
+        # Static layout, built on first access
+        if self._layout is None:
+            self._layout = html.Div(
+                [
+                    html.H1("This is a static title"),
+                    html.Button(id=self.button_id, n_clicks=0, children="Submit"),
+                    html.Div(id=self.div_id),
+                ]
+            )
+        return self._layout
 
     def set_callbacks(self):
-        @callback(Output(self.div_id, "children"), [Input(self.button_id, "n_clicks")])
-        def _update_output(n_clicks):
-            return f"Button has been pressed {n_clicks} times."
+        PLUGIN_INSTANCES.register_callbacks_once(
+            "SomeOtherCustomPlugin", _some_other_custom_plugin_callbacks
+        )
+
+
+def _some_other_custom_plugin_callbacks():
+    @callback(
+        Output(_element_id("output-state"), "children"),
+        [Input(_element_id("submit-button"), "n_clicks")],
+    )
+    def _update_output(n_clicks):
+        return f"Button has been pressed {n_clicks} times."
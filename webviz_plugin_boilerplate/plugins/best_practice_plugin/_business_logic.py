@@ -1,4 +1,15 @@
-from typing import Dict, ItemsView, List
+import bisect
+import hashlib
+import os
+import tempfile
+import threading
+import weakref
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
 
 
 ######################################################################
@@ -15,51 +26,703 @@ from typing import Dict, ItemsView, List
 ######################################################################
 
 
+ArrayLike = Union[Sequence[int], Sequence[float], np.ndarray]
+
+
 class GraphData:
-    """Definition of graph data"""
+    """
+    Definition of graph data
+
+    The x and y data are stored as one-dimensional, read-only numpy arrays. Input
+    can be any sequence of numbers or a numpy array, and numpy arrays are wrapped
+    without copying.
+
+    `Dtype contract:`
+    The x and y data must be of signed integer or floating point dtype. Plain Python
+    lists of int/float are converted to int64/float64 arrays, while other dtypes
+    (e.g. bool, unsigned, object or string) are rejected.
+    """
+
+    _SUPPORTED_DTYPE_KINDS = ("i", "f")
 
-    def __init__(self, x_data: List[int], y_data: List[int]) -> None:
-        if len(x_data) != len(y_data):
+    def __init__(self, x_data: ArrayLike, y_data: ArrayLike) -> None:
+        x_array = GraphData._as_read_only_array(x_data, "x")
+        y_array = GraphData._as_read_only_array(y_data, "y")
+        if len(x_array) != len(y_array):
             raise ValueError("Length of x and y data must be equal!")
 
-        self._x_data = x_data
-        self._y_data = y_data
+        self._x_data = x_array
+        self._y_data = y_array
+        self._is_x_sorted: Optional[bool] = None
+
+    def __len__(self) -> int:
+        return len(self._x_data)
 
-    def x_data(self) -> List[int]:
+    def x_data(self) -> np.ndarray:
         return self._x_data
 
-    def y_data(self) -> List[int]:
+    def y_data(self) -> np.ndarray:
         return self._y_data
 
+    def is_x_sorted(self) -> bool:
+        """Whether the x data is sorted in non-decreasing order"""
+        if self._is_x_sorted is None:
+            self._is_x_sorted = bool(np.all(self._x_data[1:] >= self._x_data[:-1]))
+        return self._is_x_sorted
+
+    @staticmethod
+    def _as_read_only_array(data: ArrayLike, axis_name: str) -> np.ndarray:
+        # View of the input, to prevent changing the writeable flag of the
+        # provided array
+        array = np.asarray(data).view()
+        if array.ndim != 1:
+            raise ValueError(f"The {axis_name} data must be one-dimensional!")
+        if array.size > 0 and array.dtype.kind not in GraphData._SUPPORTED_DTYPE_KINDS:
+            raise ValueError(
+                f'Dtype "{array.dtype}" of {axis_name} data is not supported, '
+                "expected signed integer or floating point data!"
+            )
+        array.flags.writeable = False
+        return array
+
+
+class GraphDataSource(ABC):
+    """
+    Interface for sources of graph data
+
+    A source provides the names of the graphs at construction, while the graph data
+    is loaded the first time it is requested.
+    """
+
+    @abstractmethod
+    def graph_names(self) -> List[str]:
+        """Names of all graphs in the source"""
+
+    @abstractmethod
+    def load_graph_data(self, graph_name: str) -> GraphData:
+        """Load graph data for graph name present in the source"""
+
+    @abstractmethod
+    def data_version(self) -> str:
+        """Version of the data, equal for equal data across processes and restarts"""
+
+
+class InMemoryGraphDataSource(GraphDataSource):
+    """Graph data source for graph data already held in memory"""
+
+    def __init__(self, graph_dict: Dict[str, GraphData]) -> None:
+        self._graph_dict = graph_dict.copy()
+
+        data_hash = hashlib.blake2b(digest_size=16)
+        for name, graph_data in self._graph_dict.items():
+            data_hash.update(name.encode())
+            for array in (graph_data.x_data(), graph_data.y_data()):
+                data_hash.update(array.dtype.str.encode())
+                data_hash.update(np.ascontiguousarray(array))
+        self._data_version = data_hash.hexdigest()
+
+    def graph_names(self) -> List[str]:
+        return list(self._graph_dict.keys())
+
+    def load_graph_data(self, graph_name: str) -> GraphData:
+        return self._graph_dict[graph_name]
+
+    def data_version(self) -> str:
+        return self._data_version
+
+
+class GraphNameIndex:
+    """
+    Index of unique graph names
+
+    Names are indexed for constant time lookup, and sorted case-insensitive for
+    prefix search.
+    """
+
+    def __init__(self, graph_names: Sequence[str]) -> None:
+        self._graph_names: Tuple[str, ...] = tuple(graph_names)
+        self._positions: Dict[str, int] = {
+            name: position for position, name in enumerate(self._graph_names)
+        }
+        self._sorted_names = sorted(self._graph_names, key=str.casefold)
+        self._sorted_keys = [name.casefold() for name in self._sorted_names]
+
+    def __len__(self) -> int:
+        return len(self._graph_names)
+
+    def __contains__(self, graph_name: object) -> bool:
+        return graph_name in self._positions
+
+    def graph_names(self) -> Tuple[str, ...]:
+        return self._graph_names
+
+    def search(
+        self, query: str, offset: int = 0, limit: int = 100
+    ) -> Tuple[List[str], int]:
+        """
+        Search for graph names starting with the query, case-insensitive
+
+        Returns a page of matching names, in sorted order, together with the total
+        number of matches. An empty query matches all graph names, in index order.
+        """
+        if not query:
+            return list(self._graph_names[offset : offset + limit]), len(self)
+
+        key = query.casefold()
+        first = bisect.bisect_left(self._sorted_keys, key)
+        last = bisect.bisect_left(self._sorted_keys, key + "\U0010ffff", lo=first)
+        start = min(first + offset, last)
+        return self._sorted_names[start : min(start + limit, last)], last - first
+
 
 class GraphSet:
     """
     Definition of graph set - set of graph data with unique names
+
+    Graph data is retrieved from the data source the first time it is requested, and
+    kept in memory until the optional memory budget is exceeded. Then the least
+    recently used graph data is evicted.
     """
 
     def __init__(
         self,
-        graph_dict: Dict[str, GraphData],
+        graph_data: Union[Dict[str, GraphData], GraphDataSource],
+        memory_budget_bytes: Optional[int] = None,
     ) -> None:
-        self._graph_dict = graph_dict.copy()
+        self._source: GraphDataSource = (
+            graph_data
+            if isinstance(graph_data, GraphDataSource)
+            else InMemoryGraphDataSource(graph_data)
+        )
+        self._memory_budget_bytes = memory_budget_bytes
+        self._name_index = GraphNameIndex(self._source.graph_names())
 
-    def items(self) -> ItemsView[str, GraphData]:
-        return self._graph_dict.items()
+        self._lock = threading.Lock()
+        self._loaded_graphs: "OrderedDict[str, GraphData]" = OrderedDict()
+        self._loaded_bytes = 0
 
-    def graph_names(self) -> List[str]:
-        return list(self._graph_dict.keys())
+    def data_source(self) -> GraphDataSource:
+        return self._source
+
+    def items(self) -> Iterator[Tuple[str, GraphData]]:
+        for name in self.graph_names():
+            yield name, self.graph_data(name)
+
+    def graph_names(self) -> Sequence[str]:
+        """Graph names in order of the data source, as an immutable sequence"""
+        return self._name_index.graph_names()
+
+    def num_graphs(self) -> int:
+        return len(self._name_index)
+
+    def has_graph(self, graph_name: str) -> bool:
+        return graph_name in self._name_index
+
+    def search_graph_names(
+        self, query: str, offset: int = 0, limit: int = 100
+    ) -> Tuple[List[str], int]:
+        """Page of graph names starting with query, and total number of matches"""
+        return self._name_index.search(query, offset, limit)
 
     def graph_data(self, graph_name: str) -> GraphData:
-        if graph_name not in self.graph_names():
+        if not self.has_graph(graph_name):
             raise ValueError(
                 f'Graph with name "{graph_name}" not present in graph set!'
             )
-        return self._graph_dict[graph_name]
 
+        with self._lock:
+            graph_data = self._loaded_graphs.get(graph_name)
+            if graph_data is not None:
+                self._loaded_graphs.move_to_end(graph_name)
+                return graph_data
+
+        graph_data = self._source.load_graph_data(graph_name)
+        self._store_loaded_graph(graph_name, graph_data)
+        return graph_data
+
+    def _store_loaded_graph(self, graph_name: str, graph_data: GraphData) -> None:
+        num_bytes = graph_data.x_data().nbytes + graph_data.y_data().nbytes
+        with self._lock:
+            if graph_name in self._loaded_graphs:
+                return
+            self._loaded_graphs[graph_name] = graph_data
+            self._loaded_bytes += num_bytes
+            if self._memory_budget_bytes is None:
+                return
+            while len(self._loaded_graphs) > 1 and (
+                self._loaded_bytes > self._memory_budget_bytes
+            ):
+                _, evicted = self._loaded_graphs.popitem(last=False)
+                self._loaded_bytes -= evicted.x_data().nbytes + evicted.y_data().nbytes
+
+
+# pylint: disable=too-few-public-methods
+class TransformStep(ABC):
+    """
+    Step of a transform pipeline, transforming x and y data arrays
+
+    `Arguments:`
+    * `x_data`, `y_data` - Data from the previous step
+    * `owns_y_data` - Whether the y data is a buffer owned by the pipeline, i.e. it
+    can be transformed in-place. Input y data of the pipeline is never modified.
+
+    Returns the transformed x and y data, and whether the y data is owned.
+    """
+
+    @abstractmethod
+    def apply(
+        self, x_data: np.ndarray, y_data: np.ndarray, owns_y_data: bool
+    ) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """Transform the x and y data"""
+
+
+class ReverseStep(TransformStep):
+    """Reverse the order of the y data, as a strided view"""
+
+    def apply(
+        self, x_data: np.ndarray, y_data: np.ndarray, owns_y_data: bool
+    ) -> Tuple[np.ndarray, np.ndarray, bool]:
+        return x_data, y_data[::-1], owns_y_data
+
+
+class FlipStep(TransformStep):
+    """Negate the y data"""
+
+    def apply(
+        self, x_data: np.ndarray, y_data: np.ndarray, owns_y_data: bool
+    ) -> Tuple[np.ndarray, np.ndarray, bool]:
+        return x_data, np.negative(y_data, out=y_data if owns_y_data else None), True
+
+
+class CumulativeSumStep(TransformStep):
+    """Cumulative sum of the y data"""
+
+    def apply(
+        self, x_data: np.ndarray, y_data: np.ndarray, owns_y_data: bool
+    ) -> Tuple[np.ndarray, np.ndarray, bool]:
+        return x_data, np.cumsum(y_data, out=y_data if owns_y_data else None), True
+
+
+class DiffStep(TransformStep):
+    """Difference between consecutive y values, positioned at the latter x value"""
+
+    def apply(
+        self, x_data: np.ndarray, y_data: np.ndarray, owns_y_data: bool
+    ) -> Tuple[np.ndarray, np.ndarray, bool]:
+        diff = np.subtract(
+            y_data[1:], y_data[:-1], out=y_data[1:] if owns_y_data else None
+        )
+        return x_data[1:], diff, True
+
+
+@dataclass(frozen=True)
+class RollingMeanStep(TransformStep):
+    """Mean of the y values in a trailing window, positioned at the last x value"""
+
+    window: int
+
+    def apply(
+        self, x_data: np.ndarray, y_data: np.ndarray, owns_y_data: bool
+    ) -> Tuple[np.ndarray, np.ndarray, bool]:
+        window = min(self.window, len(y_data))
+        if window < 1:
+            return x_data, y_data, owns_y_data
+
+        # Window sums from differences of the cumulative sum, computed in one buffer
+        cumulative = np.empty(len(y_data) + 1, dtype=np.float64)
+        cumulative[0] = 0.0
+        np.cumsum(y_data, out=cumulative[1:])
+        means = np.subtract(
+            cumulative[window:], cumulative[:-window], out=cumulative[window:]
+        )
+        means /= window
+        return x_data[window - 1 :], means, True
+
+
+@dataclass(frozen=True)
+class ResampleStep(TransformStep):
+    """
+    Linear interpolation of the y data onto an x grid shared by all graphs, e.g. the
+    common x grid of the graph data model. The y data is NaN outside the x range of
+    the graph.
+    """
+
+    x_grid: Callable[[], np.ndarray]
+
+    def apply(
+        self, x_data: np.ndarray, y_data: np.ndarray, owns_y_data: bool
+    ) -> Tuple[np.ndarray, np.ndarray, bool]:
+        x_grid = self.x_grid()
+        if len(x_data) == 0:
+            return x_grid, np.full(len(x_grid), np.nan), True
+
+        if not GraphData(x_data, y_data).is_x_sorted():
+            order = np.argsort(x_data, kind="stable")
+            x_data, y_data = x_data[order], y_data[order]
+        return (
+            x_grid,
+            np.interp(x_grid, x_data, y_data, left=np.nan, right=np.nan),
+            True,
+        )
+
+
+class TransformPipeline:
+    """
+    Named chain of transform steps for graph data
+
+    Steps are applied in order, where the first step creating new y data allocates
+    the buffer, and the following steps transform the buffer in-place when possible.
+    An empty pipeline provides the graph data as is.
+    """
 
+    def __init__(self, name: str, steps: Sequence[TransformStep] = ()) -> None:
+        self._name = name
+        self._steps = tuple(steps)
+
+    def name(self) -> str:
+        return self._name
+
+    def steps(self) -> Tuple[TransformStep, ...]:
+        return self._steps
+
+    def apply(self, graph_data: GraphData) -> GraphData:
+        if not self._steps:
+            return graph_data
+
+        x_data, y_data, owns_y_data = graph_data.x_data(), graph_data.y_data(), False
+        for step in self._steps:
+            x_data, y_data, owns_y_data = step.apply(x_data, y_data, owns_y_data)
+        return GraphData(x_data, y_data)
+
+
+class TransformPipelineRegistry:
+    """Registry of transform pipelines by name, in order of registration"""
+
+    def __init__(self, pipelines: Sequence[TransformPipeline] = ()) -> None:
+        self._pipelines: Dict[str, TransformPipeline] = {}
+        for pipeline in pipelines:
+            self.register(pipeline)
+
+    def register(self, pipeline: TransformPipeline) -> None:
+        if pipeline.name() in self._pipelines:
+            raise ValueError(f'Transform pipeline "{pipeline.name()}" already exists!')
+        self._pipelines[pipeline.name()] = pipeline
+
+    def pipeline_names(self) -> List[str]:
+        return list(self._pipelines.keys())
+
+    def has_pipeline(self, name: str) -> bool:
+        return name in self._pipelines
+
+    def pipeline(self, name: str) -> TransformPipeline:
+        if not self.has_pipeline(name):
+            raise ValueError(f'Transform pipeline "{name}" not present in registry!')
+        return self._pipelines[name]
+
+
+def create_default_transform_pipelines(
+    resample_x_grid: Callable[[], np.ndarray],
+) -> TransformPipelineRegistry:
+    """Default transform pipelines, where graphs are resampled onto the given x grid"""
+    return TransformPipelineRegistry(
+        [
+            TransformPipeline("Raw"),
+            TransformPipeline("Reversed", [ReverseStep()]),
+            TransformPipeline("Flipped", [FlipStep()]),
+            TransformPipeline("Rolling mean", [RollingMeanStep(window=10)]),
+            TransformPipeline("Cumulative sum", [CumulativeSumStep()]),
+            TransformPipeline("Diff", [DiffStep()]),
+            TransformPipeline("Resampled", [ResampleStep(x_grid=resample_x_grid)]),
+        ]
+    )
+
+
+@dataclass(frozen=True)
+class EnsembleStatistics:
+    """
+    Statistics across the graphs of a graph set, i.e. the realizations of an
+    ensemble, per x value of a shared x axis
+
+    Percentiles follow the webviz convention, where P10 is the high estimate (90th
+    percentile) and P90 the low estimate (10th percentile).
+    """
+
+    x_data: np.ndarray
+    mean: np.ndarray
+    minimum: np.ndarray
+    maximum: np.ndarray
+    p10: np.ndarray
+    p90: np.ndarray
+    num_realizations: int
+
+    def __len__(self) -> int:
+        return len(self.x_data)
+
+    def subset(self, index: Union[slice, np.ndarray]) -> "EnsembleStatistics":
+        """Statistics for a subset of the x values, given by slice or index array"""
+        return EnsembleStatistics(
+            x_data=self.x_data[index],
+            mean=self.mean[index],
+            minimum=self.minimum[index],
+            maximum=self.maximum[index],
+            p10=self.p10[index],
+            p90=self.p90[index],
+            num_realizations=self.num_realizations,
+        )
+
+
+# Size of the blocks of realizations by x values in the computation of ensemble
+# statistics, bounding the size of the temporary arrays
+ENSEMBLE_STATISTICS_BLOCK_BYTES = 32 * 1024**2
+
+
+def _shared_x_grid(
+    graph_set: GraphSet, max_grid_points: int
+) -> Tuple[np.ndarray, bool]:
+    """
+    Shared x axis of the graphs in the graph set, and whether it is the sorted x data
+    of every graph. Otherwise it is a uniform grid over the x range covered by all
+    graphs, where the y data is interpolated.
+
+    Only the first graph is compared element-wise, the x data of the other graphs is
+    compared while all graphs are equal so far.
+    """
+    names = graph_set.graph_names()
+    if not names:
+        raise ValueError("Ensemble statistics requires at least one graph!")
+
+    first_x_data = graph_set.graph_data(names[0]).x_data()
+    is_shared = graph_set.graph_data(names[0]).is_x_sorted()
+    x_ranges = np.empty((len(names), 2))
+    max_length = 0
+    for row, (name, graph_data) in enumerate(graph_set.items()):
+        if len(graph_data) == 0:
+            raise ValueError(f'Graph "{name}" has no data for ensemble statistics!')
+        x_data = graph_data.x_data()
+        is_shared = is_shared and (
+            x_data is first_x_data or np.array_equal(x_data, first_x_data)
+        )
+        if graph_data.is_x_sorted():
+            x_ranges[row] = x_data[0], x_data[-1]
+        else:
+            x_ranges[row] = x_data.min(), x_data.max()
+        max_length = max(max_length, len(x_data))
+
+    if is_shared:
+        return first_x_data, True
+    x_min, x_max = x_ranges[:, 0].max(), x_ranges[:, 1].min()
+    if x_min > x_max:
+        raise ValueError("The graphs have no overlapping x range for statistics!")
+    return np.linspace(x_min, x_max, min(max_length, max_grid_points)), False
+
+
+def _realization_stack(
+    graph_set: GraphSet,
+    x_grid: np.ndarray,
+    is_shared_x: bool,
+    memory_budget_bytes: int,
+) -> np.ndarray:
+    """
+    Y data of each graph on the x grid, as rows of a 2D array of realizations by x
+    values. Each graph is sorted and interpolated once. The array is memory mapped
+    to a temporary file when exceeding the memory budget.
+    """
+    shape = (graph_set.num_graphs(), len(x_grid))
+    if shape[0] * shape[1] * 8 > memory_budget_bytes:
+        # pylint: disable=consider-using-with
+        stack: np.ndarray = np.memmap(
+            tempfile.TemporaryFile(), dtype=np.float64, mode="w+", shape=shape
+        )
+    else:
+        stack = np.empty(shape)
+
+    for row, (_, graph_data) in enumerate(graph_set.items()):
+        if is_shared_x:
+            stack[row] = graph_data.y_data()
+            continue
+        x_data, y_data = graph_data.x_data(), graph_data.y_data()
+        if not graph_data.is_x_sorted():
+            order = np.argsort(x_data, kind="stable")
+            x_data, y_data = x_data[order], y_data[order]
+        stack[row] = np.interp(x_grid, x_data, y_data)
+    return stack
+
+
+def compute_ensemble_statistics(
+    graph_set: GraphSet,
+    max_grid_points: int = 100000,
+    memory_budget_bytes: int = 256 * 1024**2,
+) -> EnsembleStatistics:
+    """
+    Compute mean, min/max and P10/P90 across all graphs of the graph set
+
+    The graphs are stacked into a 2D array of realizations by x values, memory mapped
+    when exceeding the memory budget. Statistics are computed in blocks of x values,
+    where a block is partitioned along the realizations once and all statistics are
+    read from the partitioned block.
+    """
+    # pylint: disable=too-many-locals
+    x_grid, is_shared_x = _shared_x_grid(graph_set, max_grid_points)
+    stack = _realization_stack(graph_set, x_grid, is_shared_x, memory_budget_bytes)
+    num_realizations = stack.shape[0]
+
+    # Positions of min, max and the neighbours of the percentiles in sorted order
+    percentile_positions = np.array([0.1, 0.9]) * (num_realizations - 1)
+    lower = np.floor(percentile_positions).astype(np.int64)
+    upper = np.ceil(percentile_positions).astype(np.int64)
+    weights = (percentile_positions - lower)[:, None]
+    kth = np.unique(np.concatenate([[0, num_realizations - 1], lower, upper]))
+
+    statistics = np.empty((5, len(x_grid)))
+    block_size = max(ENSEMBLE_STATISTICS_BLOCK_BYTES // (8 * num_realizations), 1)
+    for start in range(0, len(x_grid), block_size):
+        end = min(start + block_size, len(x_grid))
+        values = np.array(stack[:, start:end])
+        statistics[0, start:end] = values.mean(axis=0)
+        values.partition(kth, axis=0)
+        statistics[1, start:end] = values[0]
+        statistics[2, start:end] = values[-1]
+        percentiles = values[lower] + (values[upper] - values[lower]) * weights
+        statistics[3, start:end] = percentiles[1]
+        statistics[4, start:end] = percentiles[0]
+
+    statistics.flags.writeable = False
+    return EnsembleStatistics(
+        x_data=x_grid,
+        mean=statistics[0],
+        minimum=statistics[1],
+        maximum=statistics[2],
+        p10=statistics[3],
+        p90=statistics[4],
+        num_realizations=num_realizations,
+    )
+
+
+# Streaming graph data of the process, reset in the child process after fork by a
+# single hook
+_STREAMING_GRAPH_DATA: "weakref.WeakSet[StreamingGraphData]" = weakref.WeakSet()
+
+
+def _reset_streaming_graph_data_after_fork() -> None:
+    for streaming_graph_data in list(_STREAMING_GRAPH_DATA):
+        streaming_graph_data._reset_after_fork()  # pylint: disable=protected-access
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_streaming_graph_data_after_fork)
+
+
+class StreamingGraphData:
+    """
+    Append-only graph data of a live series, held in a ring buffer of bounded capacity
+
+    Points are addressed by position, i.e. the number of points appended before the
+    point. When the capacity is exceeded the oldest points are overwritten, thus only
+    the latest `capacity` points are available. The x and y data are stored as float64.
+
+    Appending and reading is thread-safe, where read graph data are read-only copies
+    of the buffer.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError("Capacity of streaming graph data must be positive!")
+        self._buffer = np.empty((2, capacity), dtype=np.float64)
+        self._end_position = 0
+        self._lock = threading.Lock()
+        _STREAMING_GRAPH_DATA.add(self)
+
+    def __len__(self) -> int:
+        return min(self._end_position, self.capacity())
+
+    def capacity(self) -> int:
+        return self._buffer.shape[1]
+
+    def end_position(self) -> int:
+        """Position of the next appended point, i.e. number of points appended"""
+        return self._end_position
+
+    def append(self, graph_data: GraphData) -> None:
+        new_data = np.vstack([graph_data.x_data(), graph_data.y_data()]).astype(
+            np.float64, copy=False
+        )
+        num_points = new_data.shape[1]
+        capacity = self.capacity()
+        with self._lock:
+            # Points overwritten within the same append are skipped
+            position = self._end_position + max(num_points - capacity, 0)
+            new_data = new_data[:, max(num_points - capacity, 0) :]
+            index = position % capacity
+            num_before_wrap = min(new_data.shape[1], capacity - index)
+            self._buffer[:, index : index + num_before_wrap] = new_data[
+                :, :num_before_wrap
+            ]
+            self._buffer[:, : new_data.shape[1] - num_before_wrap] = new_data[
+                :, num_before_wrap:
+            ]
+            self._end_position += num_points
+
+    def read_since(self, position: int) -> Tuple[int, GraphData]:
+        """
+        Points from position to the end, and the position of the first point read.
+        The first position is later than the requested position when points are
+        overwritten.
+        """
+        with self._lock:
+            return self._read(max(position, 0))
+
+    def read_latest(self, max_points: int) -> Tuple[int, GraphData]:
+        """Latest points, at most `max_points`, and the position of the first point"""
+        with self._lock:
+            return self._read(self._end_position - max_points)
+
+    def _read(self, position: int) -> Tuple[int, GraphData]:
+        capacity = self.capacity()
+        start = min(max(position, self._end_position - capacity, 0), self._end_position)
+        indices = np.arange(start, self._end_position) % capacity
+        data = self._buffer[:, indices]
+        return start, GraphData(data[0], data[1])
+
+    def _reset_after_fork(self) -> None:
+        # Lock may be held by a thread of the parent, which is not inherited
+        self._lock = threading.Lock()
+
+
+def _buffer_nbytes(array: np.ndarray) -> int:
+    """
+    Size of the memory kept alive by the array, i.e. the buffer of the array it is a
+    view of. Memory mapped arrays are counted by their own size.
+    """
+    while isinstance(array.base, np.ndarray) and not isinstance(array, np.memmap):
+        array = array.base
+    return array.nbytes
+
+
+# pylint: disable=too-many-instance-attributes
 class GraphDataModel:
+    # Memory budget of the memoized transformed graph data, in bytes
+    TRANSFORMED_GRAPH_DATA_MEMORY_BYTES = 256 * 1024**2
+
+    # Number of points of the common x grid of resampled graph data
+    RESAMPLE_GRID_POINTS = 1000
+
     def __init__(self) -> None:
         self._graph_set: GraphSet
+        self._data_version: str
+        self._transform_pipelines = create_default_transform_pipelines(
+            self.resample_x_grid
+        )
+
+        self._lock = threading.Lock()
+        self._transformed_graph_data: (
+            "OrderedDict[Tuple[str, str, str], Tuple[GraphData, int]]"
+        ) = OrderedDict()
+        self._transformed_graph_data_bytes = 0
+        self._resample_x_grid: Optional[Tuple[str, np.ndarray]] = None
+        self._ensemble_statistics: Optional[Tuple[str, EnsembleStatistics]] = None
+        self._precomputed_graph_data: Optional[
+            Tuple[str, Callable[[str, str], Optional[GraphData]]]
+        ] = None
 
     def populate_with_mock_data(self):
         graph_dict: Dict[str, GraphData] = {
@@ -68,19 +731,152 @@ class GraphDataModel:
             "Third Graph": GraphData(x_data=[0, 1, 2, 3, 4], y_data=[0, 2, 4, 2, 0]),
         }
         self._graph_set = GraphSet(graph_dict)
+        self._set_data_version(self._graph_set.data_source().data_version())
+
+    def populate_from_data_source(
+        self, source: GraphDataSource, memory_budget_bytes: Optional[int] = None
+    ) -> None:
+        """
+        Populate model with graph data loaded on demand from the data source, and
+        keep loaded graph data in memory within the memory budget.
+        """
+        self._graph_set = GraphSet(source, memory_budget_bytes)
+        self._set_data_version(source.data_version())
+
+    def _set_data_version(self, data_version: str) -> None:
+        """
+        Set version of the data in the model, dropping the memoized and precomputed
+        transformed graph data of other versions
+        """
+        with self._lock:
+            self._data_version = data_version
+            if (
+                self._precomputed_graph_data is not None
+                and self._precomputed_graph_data[0] != data_version
+            ):
+                self._precomputed_graph_data = None
+            for key in [
+                key for key in self._transformed_graph_data if key[2] != data_version
+            ]:
+                _, num_bytes = self._transformed_graph_data.pop(key)
+                self._transformed_graph_data_bytes -= num_bytes
 
     def graph_set(self) -> GraphSet:
         return self._graph_set
 
-    @staticmethod
-    def create_reversed_data(graph_data: GraphData) -> GraphData:
-        x_data = graph_data.x_data().copy()
-        y_data = graph_data.y_data().copy()
-        list.reverse(y_data)
-        return GraphData(x_data, y_data)
+    def data_version(self) -> str:
+        """
+        Version of the data in the model
 
-    @staticmethod
-    def create_flipped_data(graph_data: GraphData) -> GraphData:
-        x_data = graph_data.x_data().copy()
-        y_data = [-elm for elm in graph_data.y_data()]
-        return GraphData(x_data, y_data)
+        The version is provided by the data source of the graph set, and is equal for
+        equal data across processes and restarts.
+        """
+        return self._data_version
+
+    def transform_pipelines(self) -> TransformPipelineRegistry:
+        return self._transform_pipelines
+
+    def set_precomputed_graph_data(
+        self, load_graph_data: Callable[[str, str], Optional[GraphData]]
+    ) -> None:
+        """
+        Set loader of graph data transformed ahead of time, e.g. at build time of a
+        portable app, for the current data version
+
+        The loader is called with graph name and pipeline name, and returns None for
+        graph data not precomputed. Loaded graph data is memoized as transformed graph
+        data, i.e. within the same memory budget.
+        """
+        with self._lock:
+            self._precomputed_graph_data = (self._data_version, load_graph_data)
+
+    def transformed_graph_data(self, graph_name: str, pipeline_name: str) -> GraphData:
+        """
+        Graph data transformed by the named pipeline, memoized per graph, pipeline
+        and data version within a memory budget
+
+        Transformed y data which is a view of the graph data (e.g. reversed) is not
+        memoized, as it is recreated in constant time and would keep the graph data
+        alive after eviction from the graph set. Precomputed graph data is served
+        without loading the graph data.
+        """
+        pipeline = self._transform_pipelines.pipeline(pipeline_name)
+        if not pipeline.steps():
+            return self._graph_set.graph_data(graph_name)
+
+        key = (graph_name, pipeline_name, self._data_version)
+        with self._lock:
+            entry = self._transformed_graph_data.get(key)
+            if entry is not None:
+                self._transformed_graph_data.move_to_end(key)
+                return entry[0]
+            precomputed = self._precomputed_graph_data
+
+        transformed = (
+            precomputed[1](graph_name, pipeline_name)
+            if precomputed is not None and precomputed[0] == key[2]
+            else None
+        )
+        if transformed is None:
+            graph_data = self._graph_set.graph_data(graph_name)
+            transformed = pipeline.apply(graph_data)
+            if np.may_share_memory(transformed.y_data(), graph_data.y_data()):
+                return transformed
+
+        num_bytes = _buffer_nbytes(transformed.x_data()) + _buffer_nbytes(
+            transformed.y_data()
+        )
+        if num_bytes > GraphDataModel.TRANSFORMED_GRAPH_DATA_MEMORY_BYTES:
+            return transformed
+        with self._lock:
+            previous = self._transformed_graph_data.pop(key, None)
+            if previous is not None:
+                self._transformed_graph_data_bytes -= previous[1]
+            self._transformed_graph_data[key] = (transformed, num_bytes)
+            self._transformed_graph_data_bytes += num_bytes
+            while (
+                self._transformed_graph_data_bytes
+                > GraphDataModel.TRANSFORMED_GRAPH_DATA_MEMORY_BYTES
+            ):
+                _, (_, evicted_bytes) = self._transformed_graph_data.popitem(last=False)
+                self._transformed_graph_data_bytes -= evicted_bytes
+        return transformed
+
+    def resample_x_grid(self) -> np.ndarray:
+        """
+        Uniform x grid over the x range of all graphs, shared by the resampled graph
+        data, cached per data version
+        """
+        with self._lock:
+            if self._resample_x_grid is not None:
+                data_version, x_grid = self._resample_x_grid
+                if data_version == self._data_version:
+                    return x_grid
+
+        x_min, x_max = np.inf, -np.inf
+        for _, graph_data in self._graph_set.items():
+            if len(graph_data) > 0:
+                x_min = min(x_min, graph_data.x_data().min())
+                x_max = max(x_max, graph_data.x_data().max())
+        x_grid = (
+            np.linspace(x_min, x_max, GraphDataModel.RESAMPLE_GRID_POINTS)
+            if x_min <= x_max
+            else np.empty(0)
+        )
+        x_grid.flags.writeable = False
+        with self._lock:
+            self._resample_x_grid = (self._data_version, x_grid)
+        return x_grid
+
+    def ensemble_statistics(self) -> EnsembleStatistics:
+        """Statistics across all graphs of the graph set, cached per data version"""
+        with self._lock:
+            if self._ensemble_statistics is not None:
+                data_version, statistics = self._ensemble_statistics
+                if data_version == self._data_version:
+                    return statistics
+
+        statistics = compute_ensemble_statistics(self._graph_set)
+        with self._lock:
+            self._ensemble_statistics = (self._data_version, statistics)
+        return statistics
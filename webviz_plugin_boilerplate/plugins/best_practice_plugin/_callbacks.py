@@ -1,17 +1,53 @@
-from typing import Callable
+import json
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-from dash import callback, Input, Output, no_update
+from dash import (
+    callback,
+    callback_context,
+    clientside_callback,
+    Input,
+    Output,
+    State,
+    no_update,
+)
 from dash.exceptions import PreventUpdate
 
-
+from ..._utils import (
+    CallbackMetrics,
+    PluginInstanceRegistry,
+    RequestGenerations,
+    StaleRequest,
+)
 from ._business_logic import GraphDataModel
-from ._layout import LayoutElements
+from ._figure_cache import FigureCache
+from ._graph_figures import (
+    get_or_create_ensemble_figure,
+    get_or_create_graph_data_store,
+    get_or_create_graph_figure,
+)
+from ._layout import (
+    GRAPH_SELECTION_OPTIONS_LIMIT,
+    ElementIds,
+    LayoutElements,
+    LayoutOptions,
+)
 from ._property_serialization import (
-    GraphFigureBuilder,
+    GraphFigureSettings,
     GraphDataVisualizationOptions,
     GraphTypeOptions,
+    GraphViewOptions,
+    deserialize_graph_selection,
+    deserialize_x_range,
+    has_x_axis_change,
+    serialize_graph_selection_matches,
+    serialize_graph_selection_options,
+    serialize_stream_extension,
+    serialize_stream_figure,
 )
-
+from ._streaming import StreamingFeed
+from ._warmup import WarmupScheduler
 
 ###########################################################################
 #
@@ -30,65 +66,463 @@ from ._property_serialization import (
 # create/build serialized data formats for the JSON serializable callback
 # Output.
 #
+# The callbacks are pattern-matching callbacks, registered once per
+# layout variant and shared by all plugin instances of the variant. The
+# state of the plugin instance (e.g. data model) is looked up by the
+# instance ID of the matched layout elements.
+#
 ###########################################################################
 
 
-def plugin_callbacks(get_uuid: Callable, graph_data_model: GraphDataModel):
+@dataclass(frozen=True)
+class PluginInstanceState:
+    """State of a plugin instance, looked up by the callbacks"""
+
+    graph_data_model: GraphDataModel
+    figure_cache: FigureCache
+    figure_settings: GraphFigureSettings
+    callback_metrics: CallbackMetrics
+    warmup_scheduler: WarmupScheduler
+    request_generations: RequestGenerations
+    stream_feed: Optional[StreamingFeed] = None
+
+
+PLUGIN_INSTANCES: PluginInstanceRegistry[PluginInstanceState] = PluginInstanceRegistry()
+
+
+def plugin_callbacks(
+    instance_id: str,
+    instance_state: PluginInstanceState,
+    layout_options: LayoutOptions,
+):
+    """
+    Register the plugin instance, and the callbacks of its layout variant if not
+    already registered in the Dash app
+    """
+    PLUGIN_INSTANCES.register_instance(instance_id, instance_state)
+    PLUGIN_INSTANCES.register_callbacks_once(
+        layout_options.variant(),
+        partial(_layout_variant_callbacks, ElementIds(layout_options), layout_options),
+    )
+
+
+def _layout_variant_callbacks(get_uuid: Callable, layout_options: LayoutOptions):
+    _graph_selection_callbacks(get_uuid)
+    if layout_options.stream_interval_ms is not None:
+        _stream_callbacks(get_uuid)
+    if layout_options.clientside_transforms:
+        _clientside_graph_callbacks(get_uuid)
+    else:
+        _graph_callbacks(get_uuid, layout_options.ensemble_statistics)
+
+
+def _graph_selection_callbacks(get_uuid: Callable):
+    """
+    Callback for the options of the graph selection dropdown, i.e. the graph names
+    matching the search, provided a page at a time as the number of graphs can be
+    large. Requesting more matches appends the next page to the options.
+    """
+    graph_selection_dropdown_id = get_uuid(LayoutElements.GRAPH_SELECTION_DROPDOWN)
+    graph_selection_page_store_id = get_uuid(LayoutElements.GRAPH_SELECTION_PAGE_STORE)
+    graph_selection_more_button_id = get_uuid(
+        LayoutElements.GRAPH_SELECTION_MORE_BUTTON
+    )
+
     @callback(
-        Output(get_uuid(LayoutElements.GRAPH), "figure"),
         [
-            Input(get_uuid(LayoutElements.GRAPH_SELECTION_DROPDOWN), "value"),
-            Input(get_uuid(LayoutElements.GRAPH_TYPE_RADIO_ITEMS), "value"),
-            Input(
-                get_uuid(LayoutElements.GRAPH_DATA_VISUALIZATION_RADIO_ITEMS), "value"
+            Output(graph_selection_dropdown_id, "options"),
+            Output(graph_selection_page_store_id, "data"),
+            Output(get_uuid(LayoutElements.GRAPH_SELECTION_MATCHES), "children"),
+            Output(graph_selection_more_button_id, "disabled"),
+        ],
+        Input(graph_selection_dropdown_id, "search_value"),
+        Input(graph_selection_more_button_id, "n_clicks"),
+        State(graph_selection_dropdown_id, "value"),
+        State(graph_selection_dropdown_id, "options"),
+        State(graph_selection_page_store_id, "data"),
+        prevent_initial_call=True,
+    )
+    def _update_graph_selection_options(
+        search_value: Optional[str],
+        _more_clicks: Optional[int],
+        selected_graph_value: Union[None, str, List[str]],
+        options: Optional[List[Dict[str, str]]],
+        page: Dict[str, Union[str, int]],
+    ) -> Tuple[List[Dict[str, str]], Dict[str, Union[str, int]], str, bool]:
+        graph_data_model = PLUGIN_INSTANCES.matched_instance().graph_data_model
+        is_more_requested = (
+            LayoutElements.GRAPH_SELECTION_MORE_BUTTON,
+            "n_clicks",
+        ) in _triggered_elements()
+        if is_more_requested:
+            query, offset = str(page["query"]), int(page["offset"])
+            shown_graph_names = [option["value"] for option in options or []]
+        elif search_value is None:
+            # Search is reset when the dropdown is closed, e.g. on selection or when
+            # requesting more matches, keeping the matches of the previous search
+            raise PreventUpdate
+        else:
+            query, offset, shown_graph_names = search_value, 0, []
+
+        graph_names, num_matches = graph_data_model.graph_set().search_graph_names(
+            query, offset=offset, limit=GRAPH_SELECTION_OPTIONS_LIMIT
+        )
+        next_offset = offset + len(graph_names)
+        return (
+            serialize_graph_selection_options(
+                list(dict.fromkeys(shown_graph_names + graph_names)),
+                selected_graph_value,
             ),
+            {"query": query, "offset": next_offset},
+            serialize_graph_selection_matches(next_offset, num_matches),
+            next_offset >= num_matches,
+        )
+
+
+def _stream_callbacks(get_uuid: Callable):
+    """
+    Callback for the graph of live data, sending only the points appended since the
+    previous update. The full window of latest points is sent on the first update,
+    and when the points since the previous update are not available, e.g. overwritten
+    in the ring buffer or the request is served by the feed of another worker process.
+    """
+    stream_graph_id = get_uuid(LayoutElements.STREAM_GRAPH)
+    stream_position_store_id = get_uuid(LayoutElements.STREAM_POSITION_STORE)
+
+    @callback(
+        [
+            Output(stream_graph_id, "figure"),
+            Output(stream_graph_id, "extendData"),
+            Output(stream_position_store_id, "data"),
+        ],
+        Input(get_uuid(LayoutElements.STREAM_INTERVAL), "n_intervals"),
+        State(stream_position_store_id, "data"),
+    )
+    def _update_stream_graph(
+        _n_intervals: Optional[int], stream_position: Optional[Dict[str, Any]]
+    ) -> Tuple[dict, list, Dict[str, Any]]:
+        instance = PLUGIN_INSTANCES.matched_instance()
+        stream_feed = instance.stream_feed
+        figure_settings = instance.figure_settings
+        if stream_feed is None:
+            raise PreventUpdate
+
+        stream_feed.ensure_started()
+        feed_id = stream_feed.feed_id()
+        streaming_graph_data = stream_feed.graph_data()
+        window_points = figure_settings.stream_window_points
+
+        # Positions are only valid for the feed of this process
+        position = (
+            stream_position.get("position")
+            if isinstance(stream_position, dict)
+            and stream_position.get("feed") == feed_id
+            else None
+        )
+        if position is not None and position <= streaming_graph_data.end_position():
+            start_position, new_points = streaming_graph_data.read_since(position)
+            if start_position == position and len(new_points) <= window_points:
+                if len(new_points) == 0:
+                    raise PreventUpdate
+                return (
+                    no_update,
+                    serialize_stream_extension(new_points, figure_settings),
+                    {"feed": feed_id, "position": start_position + len(new_points)},
+                )
+
+        start_position, latest_points = streaming_graph_data.read_latest(window_points)
+        return (
+            serialize_stream_figure(latest_points, figure_settings),
+            no_update,
+            {"feed": feed_id, "position": start_position + len(latest_points)},
+        )
+
+
+def _triggered_elements() -> List[Tuple[str, str]]:
+    """Element names and properties triggering the callback, from the element IDs"""
+    triggered_elements = []
+    for elm in callback_context.triggered:
+        element_id, _, prop = elm["prop_id"].rpartition(".")
+        if element_id.startswith("{"):
+            triggered_elements.append((json.loads(element_id)["element"], prop))
+    return triggered_elements
+
+
+def _deserialize_graph_zoom(
+    relayout_data: Optional[dict],
+) -> Tuple[bool, Optional[Tuple[float, float]]]:
+    """
+    De-serialize zoomed x range of graph from relayout data, and whether the graph
+    selection or graph view triggered the callback. Zoom of previously selected graph
+    is not valid for new graph selection.
+
+    Prevents update on relayout without change of x axis, e.g. autosize or y axis zoom.
+    """
+    triggered_elements = _triggered_elements()
+    zoom_reset_elements = [
+        (LayoutElements.GRAPH_SELECTION_DROPDOWN, "value"),
+        (LayoutElements.GRAPH_VIEW_RADIO_ITEMS, "value"),
+    ]
+    is_graph_selection_changed = any(
+        element in triggered_elements for element in zoom_reset_elements
+    )
+    is_relayout_triggered = (LayoutElements.GRAPH, "relayoutData") in triggered_elements
+    if (
+        is_relayout_triggered
+        and len(triggered_elements) == 1
+        and not has_x_axis_change(relayout_data)
+    ):
+        raise PreventUpdate
+
+    if is_graph_selection_changed:
+        return True, None
+    return False, deserialize_x_range(relayout_data)
+
+
+# Random ID of the browser session, assigned on first load of the session store
+CLIENTSIDE_SESSION_ID = """
+function(_modifiedTimestamp, sessionId) {
+    if (sessionId) {
+        return window.dash_clientside.no_update;
+    }
+    return Date.now().toString(36) + Math.random().toString(36).slice(2);
+}
+"""
+
+
+def _graph_callbacks(get_uuid: Callable, ensemble_statistics: bool):
+    graph_selection_dropdown_id = get_uuid(LayoutElements.GRAPH_SELECTION_DROPDOWN)
+    graph_id = get_uuid(LayoutElements.GRAPH)
+    session_store_id = get_uuid(LayoutElements.SESSION_STORE)
+
+    clientside_callback(
+        CLIENTSIDE_SESSION_ID,
+        Output(session_store_id, "data"),
+        Input(session_store_id, "modified_timestamp"),
+        State(session_store_id, "data"),
+    )
+
+    # Graph view is only part of the layout when ensemble statistics is enabled
+    graph_view_inputs = (
+        {
+            "graph_view_value": Input(
+                get_uuid(LayoutElements.GRAPH_VIEW_RADIO_ITEMS), "value"
+            )
+        }
+        if ensemble_statistics
+        else {}
+    )
+
+    @callback(
+        output=[
+            Output(graph_id, "figure"),
+            Output(graph_id, "relayoutData"),
         ],
+        inputs={
+            "selected_graph_value": Input(graph_selection_dropdown_id, "value"),
+            "graph_type_value": Input(
+                get_uuid(LayoutElements.GRAPH_TYPE_RADIO_ITEMS), "value"
+            ),
+            "graph_data_visualization_value": Input(
+                get_uuid(LayoutElements.GRAPH_DATA_VISUALIZATION_RADIO_ITEMS), "value"
+            ),
+            "relayout_data": Input(graph_id, "relayoutData"),
+            **graph_view_inputs,
+        },
+        state={"session_id": State(session_store_id, "data")},
     )
     def _update_graph(
-        selected_graph_value: str,
+        selected_graph_value: Union[str, List[str]],
         graph_type_value: str,
         graph_data_visualization_value: str,
-    ) -> dict:
+        relayout_data: Optional[dict],
+        session_id: Optional[str],
+        graph_view_value: str = GraphViewOptions.SINGLE_GRAPH.value,
+    ) -> Tuple[dict, Optional[dict]]:
+        # pylint: disable=too-many-arguments, too-many-positional-arguments
+        # pylint: disable=too-many-locals
+        instance = PLUGIN_INSTANCES.matched_instance()
+        graph_data_model = instance.graph_data_model
+        callback_metrics = instance.callback_metrics
+        warmup_scheduler = instance.warmup_scheduler
+
         ##################################################################################
         # De-serialize from JSON serializable format to strongly typed and filtered format
         ##################################################################################
-        graph_type = GraphTypeOptions(graph_type_value)
-        graph_data_visualization = GraphDataVisualizationOptions(
-            graph_data_visualization_value
-        )
-        selected_graph = (
-            selected_graph_value
-            if selected_graph_value in graph_data_model.graph_set().graph_names()
-            else None
-        )
+        with callback_metrics.span("deserialization"):
+            is_graph_selection_changed, x_range = _deserialize_graph_zoom(relayout_data)
+            graph_view = GraphViewOptions(graph_view_value)
+            graph_type = GraphTypeOptions(graph_type_value)
+            graph_data_visualization = (
+                graph_data_visualization_value
+                if graph_data_model.transform_pipelines().has_pipeline(
+                    graph_data_visualization_value
+                )
+                else None
+            )
+            selected_graphs = [
+                graph_name
+                for graph_name in deserialize_graph_selection(selected_graph_value)
+                if graph_data_model.graph_set().has_graph(graph_name)
+            ]
 
         ###########################################
         # Prevent update on invalid graph selection
         ###########################################
-        if not selected_graph:
+        if not selected_graphs:
             raise PreventUpdate
+        if not graph_data_visualization:
+            return no_update, no_update
 
-        ###############################################################
-        # Business logic with "strongly typed" and filtered data format
-        ###############################################################
-        graph_data = graph_data_model.graph_set().graph_data(selected_graph)
-        if graph_data_visualization is GraphDataVisualizationOptions.REVERSED:
-            graph_data = graph_data_model.create_reversed_data(graph_data)
-        elif graph_data_visualization is GraphDataVisualizationOptions.FLIPPED:
-            graph_data = graph_data_model.create_flipped_data(graph_data)
-        elif graph_data_visualization is not GraphDataVisualizationOptions.RAW:
-            return no_update
-
-        ###############################################################
-        # Create/build prop serialization by use of business logic data
-        ###############################################################
-        figure_builder = GraphFigureBuilder(graph_type)
-        title = (
-            f"Title: {graph_type.value} for {selected_graph} with"
-            f" {graph_data_visualization.value} data"
-        )
-        figure_builder.add_graph_title(title)
-        figure_builder.add_graph_data(graph_data)
-        figure = figure_builder.get_serialized_figure()
+        # Superseded by a later request of the session, e.g. when scrubbing through
+        # the graph selection, the request is aborted between the phases. Only valid
+        # requests start a generation, i.e. relayout without change of x axis does not
+        # supersede a request in progress.
+        request = instance.request_generations.start(session_id)
+        try:
+            request.debounce()
+        except StaleRequest as exc:
+            raise PreventUpdate from exc
+
+        if graph_view is GraphViewOptions.SINGLE_GRAPH:
+            for graph_name in selected_graphs:
+                warmup_scheduler.record_usage(graph_name)
+        try:
+            request.check()
+            with warmup_scheduler.user_request(), callback_metrics.span(
+                "figure_cache"
+            ) as figure_span:
+                if graph_view is GraphViewOptions.ENSEMBLE_STATISTICS:
+                    figure = get_or_create_ensemble_figure(
+                        graph_data_model,
+                        instance.figure_cache,
+                        instance.figure_settings,
+                        x_range,
+                        callback_metrics,
+                        check_request=request.check,
+                        record_payload_bytes=figure_span.record_payload_bytes,
+                    )
+                else:
+                    figure = get_or_create_graph_figure(
+                        graph_data_model,
+                        instance.figure_cache,
+                        instance.figure_settings,
+                        selected_graphs,
+                        graph_type,
+                        graph_data_visualization,
+                        x_range,
+                        callback_metrics,
+                        check_request=request.check,
+                        record_payload_bytes=figure_span.record_payload_bytes,
+                    )
+        except StaleRequest as exc:
+            raise PreventUpdate from exc
+
+        # Reset relayout data on new graph selection, as zoom is reset
+        return figure, None if is_graph_selection_changed else no_update
+
+
+# Clientside transform of graph data, and building of figure. Corresponds to the
+# business logic and figure building of the server side graph callback.
+CLIENTSIDE_UPDATE_GRAPH = """
+function(graphData, graphType, graphDataVisualization) {
+    if (!graphData) {
+        return window.dash_clientside.no_update;
+    }
 
-        return figure
+    let y = graphData.y;
+    if (graphDataVisualization === %(reversed)s) {
+        y = y.slice().reverse();
+    } else if (graphDataVisualization === %(flipped)s) {
+        y = y.map((value) => -value);
+    } else if (graphDataVisualization !== %(raw)s) {
+        return window.dash_clientside.no_update;
+    }
+
+    let trace = null;
+    if (graphType === %(line_plot)s) {
+        trace = {mode: "lines", x: graphData.x, y: y, type: "scatter"};
+    } else if (graphType === %(bar_chart)s) {
+        trace = {x: graphData.x, y: y, type: "bar"};
+    } else {
+        return window.dash_clientside.no_update;
+    }
+
+    const title = `Title: ${graphType} for ${graphData.graphName} with ` +
+        `${graphDataVisualization} data`;
+    return {
+        data: [trace],
+        layout: Object.assign({title: {text: title}}, graphData.layout),
+    };
+}
+""" % {
+    "raw": json.dumps(GraphDataVisualizationOptions.RAW.value),
+    "reversed": json.dumps(GraphDataVisualizationOptions.REVERSED.value),
+    "flipped": json.dumps(GraphDataVisualizationOptions.FLIPPED.value),
+    "line_plot": json.dumps(GraphTypeOptions.LINE_PLOT.value),
+    "bar_chart": json.dumps(GraphTypeOptions.BAR_CHART.value),
+}
+
+
+def _clientside_graph_callbacks(get_uuid: Callable):
+    """
+    Callbacks for clientside transform of graph data
+
+    The raw graph data is provided to a store in the browser when the graph selection
+    or zoom changes, while the graph data visualization and graph type are applied
+    by a clientside callback, i.e. without server round trip.
+    """
+    graph_id = get_uuid(LayoutElements.GRAPH)
+    graph_data_store_id = get_uuid(LayoutElements.GRAPH_DATA_STORE)
+
+    @callback(
+        [
+            Output(graph_data_store_id, "data"),
+            Output(graph_id, "relayoutData"),
+        ],
+        [
+            Input(get_uuid(LayoutElements.GRAPH_SELECTION_DROPDOWN), "value"),
+            Input(graph_id, "relayoutData"),
+        ],
+    )
+    def _update_graph_data_store(
+        selected_graph_value: str, relayout_data: Optional[dict]
+    ) -> Tuple[dict, Optional[dict]]:
+        instance = PLUGIN_INSTANCES.matched_instance()
+        graph_data_model = instance.graph_data_model
+        callback_metrics = instance.callback_metrics
+        warmup_scheduler = instance.warmup_scheduler
+
+        with callback_metrics.span("deserialization"):
+            is_graph_selection_changed, x_range = _deserialize_graph_zoom(relayout_data)
+            if not graph_data_model.graph_set().has_graph(selected_graph_value):
+                raise PreventUpdate
+
+        warmup_scheduler.record_usage(selected_graph_value)
+        with warmup_scheduler.user_request(), callback_metrics.span(
+            "figure_cache"
+        ) as figure_span:
+            graph_data_store = get_or_create_graph_data_store(
+                graph_data_model,
+                instance.figure_cache,
+                instance.figure_settings,
+                selected_graph_value,
+                x_range,
+                callback_metrics,
+                record_payload_bytes=figure_span.record_payload_bytes,
+            )
+
+        # Reset relayout data on new graph selection, as zoom is reset
+        return graph_data_store, None if is_graph_selection_changed else no_update
+
+    clientside_callback(
+        CLIENTSIDE_UPDATE_GRAPH,
+        Output(graph_id, "figure"),
+        [
+            Input(graph_data_store_id, "data"),
+            Input(get_uuid(LayoutElements.GRAPH_TYPE_RADIO_ITEMS), "value"),
+            Input(
+                get_uuid(LayoutElements.GRAPH_DATA_VISUALIZATION_RADIO_ITEMS), "value"
+            ),
+        ],
+    )
@@ -0,0 +1,144 @@
+import hashlib
+from abc import abstractmethod
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from ._business_logic import GraphData, GraphDataSource
+
+######################################################################
+#
+# File backed graph data sources
+#
+# Rule: No dash* import allowed
+#
+# The sources only index the graph files at construction, i.e. a
+# mapping from graph name to file location. Graph data is memory
+# mapped or read the first time it is requested.
+#
+# Each graph is stored in a separate file named by the graph name,
+# containing the x and y data.
+#
+######################################################################
+
+
+class _DirectoryGraphDataSource(GraphDataSource):
+    """
+    Base of graph data sources with one file per graph in a directory, where the
+    file name without suffix is the graph name.
+    """
+
+    SUFFIXES: Tuple[str, ...] = ()
+
+    def __init__(self, directory: Path) -> None:
+        self._directory = Path(directory)
+        if not self._directory.is_dir():
+            raise ValueError(f'Graph data directory "{self._directory}" not found!')
+
+        self._graph_files: Dict[str, Path] = {
+            path.stem: path
+            for path in sorted(self._directory.iterdir())
+            if path.suffix in self.SUFFIXES
+        }
+
+        data_hash = hashlib.blake2b(digest_size=16)
+        for name, path in self._graph_files.items():
+            stat = path.stat()
+            data_hash.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        self._data_version = data_hash.hexdigest()
+
+    def graph_names(self) -> List[str]:
+        return list(self._graph_files.keys())
+
+    def data_version(self) -> str:
+        return self._data_version
+
+    def load_graph_data(self, graph_name: str) -> GraphData:
+        return self._load_file(self._graph_files[graph_name])
+
+    @abstractmethod
+    def _load_file(self, path: Path) -> GraphData:
+        """Load graph data from file"""
+
+
+class NpyGraphDataSource(_DirectoryGraphDataSource):
+    """
+    Graph data source for a directory of `.npy` files, memory mapped on load
+
+    Each file contains either a structured array with fields `x` and `y`, or an array
+    of shape (2, N) with x data in the first row and y data in the second row.
+    """
+
+    SUFFIXES = (".npy",)
+
+    def _load_file(self, path: Path) -> GraphData:
+        array = np.load(path, mmap_mode="r")
+        if array.dtype.names and {"x", "y"} <= set(array.dtype.names):
+            return GraphData(array["x"], array["y"])
+        if array.ndim == 2 and array.shape[0] == 2:
+            return GraphData(array[0], array[1])
+        raise ValueError(
+            f'File "{path}" must contain a structured array with fields "x" and "y", '
+            "or an array of shape (2, N)!"
+        )
+
+
+class ArrowGraphDataSource(_DirectoryGraphDataSource):
+    """
+    Graph data source for a directory of Parquet (`.parquet`) and Arrow IPC
+    (`.arrow`/`.feather`) files with columns `x` and `y`
+
+    Arrow IPC files are memory mapped, while only the x and y columns are read
+    from Parquet files. Requires `pyarrow` to be installed.
+    """
+
+    SUFFIXES = (".parquet", ".arrow", ".feather")
+
+    def __init__(self, directory: Path) -> None:
+        try:
+            # pylint: disable=import-outside-toplevel, unused-import
+            import pyarrow
+        except ImportError as error:
+            raise ImportError(
+                "pyarrow is required for Parquet/Arrow graph data, install with "
+                "`pip install webviz_plugin_boilerplate[arrow]`"
+            ) from error
+        super().__init__(directory)
+
+    def _load_file(self, path: Path) -> GraphData:
+        # pylint: disable=import-outside-toplevel
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if path.suffix == ".parquet":
+            table = pq.read_table(path, columns=["x", "y"], memory_map=True)
+        else:
+            # Arrays of the table keep the memory map alive
+            table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+
+        return GraphData(
+            table.column("x").combine_chunks().to_numpy(zero_copy_only=False),
+            table.column("y").combine_chunks().to_numpy(zero_copy_only=False),
+        )
+
+
+def create_graph_data_source(path: Path) -> GraphDataSource:
+    """
+    Create graph data source for directory of graph files, where the backend is
+    given by the file types in the directory. Mixing `.npy` and Parquet/Arrow files
+    in the same directory is not supported.
+    """
+    suffixes = {elm.suffix for elm in Path(path).iterdir()}
+    has_npy_files = bool(suffixes & set(NpyGraphDataSource.SUFFIXES))
+    has_arrow_files = bool(suffixes & set(ArrowGraphDataSource.SUFFIXES))
+    if has_npy_files and has_arrow_files:
+        raise ValueError(
+            f'Graph data directory "{path}" contains both .npy and Parquet/Arrow '
+            "files, only one file type is supported!"
+        )
+    if has_npy_files:
+        return NpyGraphDataSource(path)
+    if has_arrow_files:
+        return ArrowGraphDataSource(path)
+    raise ValueError(f'No supported graph data files found in "{path}"!')
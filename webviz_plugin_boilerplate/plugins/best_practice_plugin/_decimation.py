@@ -0,0 +1,257 @@
+from enum import Enum
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ._business_logic import EnsembleStatistics, GraphData
+
+######################################################################
+#
+# Decimation of graph data, for limiting the number of points
+# provided to the view.
+#
+# Rule: No dash* import allowed
+#
+# Shape-preserving downsampling for line plots, bucket aggregation
+# for bar charts and slicing of graph data to a range of x values,
+# e.g. for retrieving a finer resolution when zooming.
+#
+######################################################################
+
+
+class DecimationMethod(str, Enum):
+    """
+    Type definition of decimation methods for line plots
+    """
+
+    MIN_MAX = "min_max"
+    LTTB = "lttb"
+
+
+# Number of points per chunk of buckets in the vectorized LTTB selection, bounding
+# the size of the temporary arrays
+LTTB_CHUNK_POINTS = 1 << 20
+
+
+def _bucket_edges(num_points: int, num_buckets: int) -> np.ndarray:
+    return np.unique(np.linspace(0, num_points, num_buckets + 1).astype(np.int64))
+
+
+def min_max_decimate(graph_data: GraphData, max_points: int) -> GraphData:
+    """
+    Downsample by keeping the points with minimum and maximum y value in each
+    bucket, i.e. preserving the visual envelope of the line. The first and last
+    points are kept, i.e. at most `max_points` points are kept for `max_points` of
+    at least 4.
+    """
+    num_points = len(graph_data)
+    if num_points <= max_points:
+        return graph_data
+
+    y_data = graph_data.y_data()
+    # At most (max_points - 2) // 2 buckets, including the remainder bucket
+    bucket_size = -(-num_points // max((max_points - 2) // 2, 1))
+    num_full_buckets = num_points // bucket_size
+    full_size = num_full_buckets * bucket_size
+
+    buckets = y_data[:full_size].reshape(num_full_buckets, bucket_size)
+    offsets = np.arange(num_full_buckets) * bucket_size
+    indices = [
+        np.array([0, num_points - 1]),
+        offsets + buckets.argmin(axis=1),
+        offsets + buckets.argmax(axis=1),
+    ]
+    if full_size < num_points:
+        remainder = y_data[full_size:]
+        indices.append(
+            np.array([full_size + remainder.argmin(), full_size + remainder.argmax()])
+        )
+
+    kept = np.unique(np.concatenate(indices))
+    return GraphData(graph_data.x_data()[kept], y_data[kept])
+
+
+def _largest_triangles(
+    bucket_x: np.ndarray,
+    bucket_y: np.ndarray,
+    anchor: Tuple[np.ndarray, np.ndarray],
+    next_point: Tuple[np.ndarray, np.ndarray],
+) -> np.ndarray:
+    """
+    Position of the point in each bucket (row) forming the largest triangle with
+    the anchor point and the next point of the bucket
+    """
+    anchor_x, anchor_y = anchor[0][:, None], anchor[1][:, None]
+    next_x, next_y = next_point[0][:, None], next_point[1][:, None]
+    areas = np.abs(
+        (anchor_x - next_x) * (bucket_y - anchor_y)
+        - (anchor_x - bucket_x) * (next_y - anchor_y)
+    )
+    return areas.argmax(axis=1)
+
+
+def lttb_decimate(graph_data: GraphData, max_points: int) -> GraphData:
+    """
+    Downsample with the Largest-Triangle-Three-Buckets algorithm
+
+    The first and last points are kept, and for each bucket in between the point
+    forming the largest triangle with the selected point of the previous bucket and
+    the average point of the next bucket is selected, i.e. `max_points` points are
+    kept.
+
+    The selection is vectorized over the buckets in two passes: the first pass uses
+    the average point of the previous bucket in place of its selected point, and the
+    second pass the point selected in the previous bucket by the first pass.
+    """
+    # pylint: disable=too-many-locals
+    num_points = len(graph_data)
+    if num_points <= max_points or max_points < 3:
+        return graph_data
+
+    x_data = graph_data.x_data().astype(np.float64)
+    y_data = graph_data.y_data().astype(np.float64)
+
+    edges = _bucket_edges(num_points - 2, max_points - 2) + 1
+    starts, ends = edges[:-1], edges[1:]
+    mean_x = np.add.reduceat(x_data[: edges[-1]], starts) / (ends - starts)
+    mean_y = np.add.reduceat(y_data[: edges[-1]], starts) / (ends - starts)
+    # Average point of the previous and next bucket, the first and last point for
+    # the first and last bucket
+    previous_mean = (
+        np.append(x_data[0], mean_x[:-1]),
+        np.append(y_data[0], mean_y[:-1]),
+    )
+    next_mean = (np.append(mean_x[1:], x_data[-1]), np.append(mean_y[1:], y_data[-1]))
+
+    max_bucket_size = int((ends - starts).max())
+    buckets_per_chunk = max(LTTB_CHUNK_POINTS // max_bucket_size, 1)
+    first_pass = np.empty(len(starts), dtype=np.int64)
+    selected = np.empty(len(starts), dtype=np.int64)
+    for first in range(0, len(starts), buckets_per_chunk):
+        chunk = slice(first, first + buckets_per_chunk)
+        # Points of each bucket, padded by repeating the last point of the bucket
+        indices = np.minimum(
+            starts[chunk, None] + np.arange(max_bucket_size), ends[chunk, None] - 1
+        )
+        rows = np.arange(len(indices))
+        bucket_x, bucket_y = x_data[indices], y_data[indices]
+        chunk_next = (next_mean[0][chunk], next_mean[1][chunk])
+
+        first_pass[chunk] = indices[
+            rows,
+            _largest_triangles(
+                bucket_x,
+                bucket_y,
+                (previous_mean[0][chunk], previous_mean[1][chunk]),
+                chunk_next,
+            ),
+        ]
+        previous = np.append(
+            first_pass[first - 1] if first else 0,
+            first_pass[first : first + len(rows) - 1],
+        )
+        selected[chunk] = indices[
+            rows,
+            _largest_triangles(
+                bucket_x, bucket_y, (x_data[previous], y_data[previous]), chunk_next
+            ),
+        ]
+
+    kept = np.concatenate(([0], selected, [num_points - 1]))
+    return GraphData(graph_data.x_data()[kept], graph_data.y_data()[kept])
+
+
+def bucket_aggregate(graph_data: GraphData, max_points: int) -> GraphData:
+    """
+    Aggregate consecutive points into buckets, with the mean y value positioned at
+    the center x value of each bucket.
+    """
+    num_points = len(graph_data)
+    if num_points <= max_points:
+        return graph_data
+
+    edges = _bucket_edges(num_points, max_points)
+    starts, ends = edges[:-1], edges[1:]
+    x_data = graph_data.x_data()
+    y_sums = np.add.reduceat(graph_data.y_data().astype(np.float64), starts)
+
+    x_centers = (x_data[starts] + x_data[ends - 1]) / 2
+    return GraphData(x_centers, y_sums / (ends - starts))
+
+
+def decimate_line(
+    graph_data: GraphData, max_points: int, method: DecimationMethod
+) -> GraphData:
+    """Downsample line plot data by the decimation method"""
+    if method == DecimationMethod.LTTB:
+        return lttb_decimate(graph_data, max_points)
+    return min_max_decimate(graph_data, max_points)
+
+
+def _sorted_x_range_slice(x_data: np.ndarray, x_range: Tuple[float, float]) -> slice:
+    x_min, x_max = sorted(x_range)
+    start = max(np.searchsorted(x_data, x_min, side="left") - 1, 0)
+    end = np.searchsorted(x_data, x_max, side="right") + 1
+    return slice(start, end)
+
+
+def decimate_ensemble_statistics(
+    statistics: EnsembleStatistics, max_points: int
+) -> EnsembleStatistics:
+    """
+    Aggregate consecutive x values into buckets, positioned at the center x value of
+    each bucket. The minimum and maximum are the extremes of each bucket, keeping the
+    envelope, while the mean and percentiles are averaged.
+    """
+    num_points = len(statistics)
+    if num_points <= max_points:
+        return statistics
+
+    edges = _bucket_edges(num_points, max_points)
+    starts, ends = edges[:-1], edges[1:]
+    x_data = statistics.x_data
+
+    def _bucket_mean(values: np.ndarray) -> np.ndarray:
+        return np.add.reduceat(values, starts) / (ends - starts)
+
+    return EnsembleStatistics(
+        x_data=(x_data[starts] + x_data[ends - 1]) / 2,
+        mean=_bucket_mean(statistics.mean),
+        minimum=np.minimum.reduceat(statistics.minimum, starts),
+        maximum=np.maximum.reduceat(statistics.maximum, starts),
+        p10=_bucket_mean(statistics.p10),
+        p90=_bucket_mean(statistics.p90),
+        num_realizations=statistics.num_realizations,
+    )
+
+
+def slice_ensemble_statistics(
+    statistics: EnsembleStatistics, x_range: Optional[Tuple[float, float]]
+) -> EnsembleStatistics:
+    """
+    Slice statistics to the x values within the x range, including the closest x
+    value outside each end of the range. The x values of statistics are sorted.
+    """
+    if x_range is None:
+        return statistics
+    return statistics.subset(_sorted_x_range_slice(statistics.x_data, x_range))
+
+
+def slice_x_range(
+    graph_data: GraphData, x_range: Optional[Tuple[float, float]]
+) -> GraphData:
+    """
+    Slice graph data to points within the x range, including the closest point
+    outside each end of the range. Slices of sorted x data are views.
+    """
+    if x_range is None:
+        return graph_data
+
+    x_min, x_max = sorted(x_range)
+    x_data = graph_data.x_data()
+    if graph_data.is_x_sorted():
+        index = _sorted_x_range_slice(x_data, x_range)
+        return GraphData(x_data[index], graph_data.y_data()[index])
+
+    mask = (x_data >= x_min) & (x_data <= x_max)
+    return GraphData(x_data[mask], graph_data.y_data()[mask])
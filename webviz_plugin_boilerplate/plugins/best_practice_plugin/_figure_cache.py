@@ -0,0 +1,272 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from ._property_serialization import decode_figure, encode_figure
+
+######################################################################
+#
+# Cache for serialized figures
+#
+# Memoization of JSON serializable figures created in callbacks, i.e.
+# figures which only depends on the callback input and the version
+# of the data in the business logic.
+#
+# The cache consists of two tiers:
+# * In-process LRU cache limited by a byte budget
+# * Optional on-disk SQLite store, shared between processes (e.g.
+#   gunicorn workers) and persistent between restarts. Limited by a
+#   byte budget, and scoped per namespace (e.g. plugin instance).
+#
+######################################################################
+
+
+@dataclass
+class FigureCacheStats:
+    """Hit/miss counts and memory usage of the figure cache"""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    memory_entries: int = 0
+    memory_bytes: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+
+class SqliteFigureStore:
+    """
+    On-disk figure store in a SQLite database
+
+    The database is opened in WAL mode, allowing several processes to read and
+    write the same file. Each thread gets its own connection.
+
+    Entries are scoped by `namespace` (e.g. the plugin instance), i.e. stores with
+    different data versions can share the file without invalidating the entries of
+    each other. The total size of the payloads in the file is limited by `max_bytes`,
+    evicting the least recently accessed entries of any namespace.
+    """
+
+    # Version of the table layout, tables of other versions are recreated
+    SCHEMA_VERSION = 2
+
+    def __init__(
+        self, path: Path, namespace: str = "", max_bytes: Optional[int] = None
+    ) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._namespace = namespace
+        self._max_bytes = max_bytes
+        self._local = threading.local()
+
+        with self._connection() as connection:
+            (schema_version,) = connection.execute("PRAGMA user_version").fetchone()
+            if schema_version != SqliteFigureStore.SCHEMA_VERSION:
+                connection.execute("DROP TABLE IF EXISTS figures")
+                connection.execute(
+                    f"PRAGMA user_version = {SqliteFigureStore.SCHEMA_VERSION}"
+                )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS figures ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, data_version TEXT NOT NULL, "
+                "payload BLOB NOT NULL, num_bytes INTEGER NOT NULL, "
+                "accessed_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS figures_accessed_at ON figures (accessed_at)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self._path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str, data_version: str) -> Optional[bytes]:
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT payload FROM figures "
+                "WHERE namespace = ? AND key = ? AND data_version = ?",
+                (self._namespace, key, data_version),
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE figures SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (time.time(), self._namespace, key),
+            )
+        return row[0]
+
+    def put(self, key: str, data_version: str, payload: bytes) -> None:
+        if self._max_bytes is not None and len(payload) > self._max_bytes:
+            return
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO figures "
+                "(namespace, key, data_version, payload, num_bytes, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    self._namespace,
+                    key,
+                    data_version,
+                    payload,
+                    len(payload),
+                    time.time(),
+                ),
+            )
+            if self._max_bytes is not None:
+                self._evict_least_recently_accessed(connection, self._max_bytes)
+
+    def remove_other_versions(self, data_version: str) -> None:
+        with self._connection() as connection:
+            connection.execute(
+                "DELETE FROM figures WHERE namespace = ? AND data_version != ?",
+                (self._namespace, data_version),
+            )
+
+    def total_bytes(self) -> int:
+        """Total size of the payloads in the file, of all namespaces"""
+        (total_bytes,) = (
+            self._connection()
+            .execute("SELECT COALESCE(SUM(num_bytes), 0) FROM figures")
+            .fetchone()
+        )
+        return total_bytes
+
+    @staticmethod
+    def _evict_least_recently_accessed(
+        connection: sqlite3.Connection, max_bytes: int
+    ) -> None:
+        (total_bytes,) = connection.execute(
+            "SELECT COALESCE(SUM(num_bytes), 0) FROM figures"
+        ).fetchone()
+        if total_bytes <= max_bytes:
+            return
+        # Keep the most recently accessed entries within the budget
+        connection.execute(
+            "DELETE FROM figures WHERE rowid IN ("
+            "SELECT rowid FROM (SELECT rowid, SUM(num_bytes) OVER "
+            "(ORDER BY accessed_at DESC, rowid DESC) AS newer_bytes FROM figures) "
+            "WHERE newer_bytes > ?)",
+            (max_bytes,),
+        )
+
+
+class FigureCache:
+    """
+    Two-tier cache for JSON serializable figures
+
+    Figures are looked up by a key of callback input values and the data version of
+    the business logic. The in-process tier is a LRU cache limited by the total size
+    of the encoded figures, while the optional disk tier is shared between processes.
+
+    When a new data version is observed, all entries for other data versions are
+    invalidated in both tiers.
+
+    NOTE: Figures returned from the cache are shared, and must not be modified.
+    """
+
+    def __init__(
+        self, max_memory_bytes: int, disk_store: Optional[SqliteFigureStore] = None
+    ) -> None:
+        self._max_memory_bytes = max_memory_bytes
+        self._disk_store = disk_store
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[dict, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._data_version: Optional[str] = None
+        self._stats = FigureCacheStats()
+
+    def get_or_create(
+        self,
+        key: Tuple[str, ...],
+        data_version: str,
+        create_figure: Callable[[], dict],
+        persist: bool = True,
+        record_payload_bytes: Optional[Callable[[int], None]] = None,
+    ) -> dict:
+        """
+        Get figure for key and data version from cache, or create and store it
+        using the `create_figure` callable on cache miss.
+
+        Figures are only kept in the in-process tier when `persist` is not set, e.g.
+        for figures of zoomed x ranges which are rarely requested again. The optional
+        `record_payload_bytes` is called with the size of the encoded figure, as
+        stored with the cache entry, i.e. without encoding the figure again.
+        """
+        key_str = json.dumps(key)
+        self._ensure_data_version(data_version)
+
+        with self._lock:
+            entry = self._entries.get(key_str)
+            if entry is not None:
+                self._entries.move_to_end(key_str)
+                self._stats.memory_hits += 1
+        if entry is not None:
+            if record_payload_bytes:
+                record_payload_bytes(entry[1])
+            return entry[0]
+
+        disk_store = self._disk_store if persist else None
+        payload = disk_store.get(key_str, data_version) if disk_store else None
+        if payload is not None:
+            figure = decode_figure(payload)
+            with self._lock:
+                self._stats.disk_hits += 1
+        else:
+            figure = create_figure()
+            payload = encode_figure(figure)
+            if disk_store:
+                disk_store.put(key_str, data_version, payload)
+            with self._lock:
+                self._stats.misses += 1
+
+        self._store_in_memory(key_str, figure, len(payload))
+        if record_payload_bytes:
+            record_payload_bytes(len(payload))
+        return figure
+
+    def stats(self) -> FigureCacheStats:
+        with self._lock:
+            return FigureCacheStats(
+                memory_hits=self._stats.memory_hits,
+                disk_hits=self._stats.disk_hits,
+                misses=self._stats.misses,
+                memory_entries=len(self._entries),
+                memory_bytes=self._memory_bytes,
+            )
+
+    def _ensure_data_version(self, data_version: str) -> None:
+        with self._lock:
+            if data_version == self._data_version:
+                return
+            self._entries.clear()
+            self._memory_bytes = 0
+            self._data_version = data_version
+        if self._disk_store:
+            self._disk_store.remove_other_versions(data_version)
+
+    def _store_in_memory(self, key: str, figure: dict, num_bytes: int) -> None:
+        if num_bytes > self._max_memory_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= previous[1]
+            self._entries[key] = (figure, num_bytes)
+            self._memory_bytes += num_bytes
+            while self._memory_bytes > self._max_memory_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._memory_bytes -= evicted_bytes
@@ -0,0 +1,213 @@
+import dataclasses
+import functools
+import hashlib
+import json
+from typing import Callable, Optional, Sequence, Tuple
+
+import plotly
+
+from ..._utils import CallbackMetrics
+from ._business_logic import GraphDataModel
+from ._decimation import slice_ensemble_statistics, slice_x_range
+from ._figure_cache import FigureCache
+from ._property_serialization import (
+    GraphFigureBuilder,
+    GraphFigureSettings,
+    GraphTypeOptions,
+    GraphViewOptions,
+    serialize_graph_data_store,
+)
+
+######################################################################
+#
+# Cached creation of the serialized graph figures and graph data
+# stores, i.e. business logic and property serialization combined.
+#
+# Rule: No dash* import allowed
+#
+# Used by the callbacks on request, and by the warm-up scheduler for
+# filling the figure cache ahead of the requests. Thereby the cache
+# keys and figures are equal for both. Figures of zoomed x ranges
+# are only cached in-process, as the ranges are rarely reused.
+#
+# The optional `check_request` is called between the business logic
+# and the serialization of a created figure, e.g. for aborting stale
+# requests by raising an exception. The optional
+# `record_payload_bytes` is called with the size of the serialized
+# figure as stored in the cache, e.g. for metrics.
+#
+# Cached figures are versioned by the data version, the figure
+# settings and the figure format, i.e. figures persisted on disk by
+# a previous run with other settings or format are not reused.
+#
+######################################################################
+
+# Version of the figure format, to be increased when figures built from equal data
+# and settings change, e.g. by a new layout of the figure
+FIGURE_FORMAT_VERSION = 2
+
+
+@functools.lru_cache(maxsize=None)
+def _settings_hash(figure_settings: GraphFigureSettings) -> str:
+    return hashlib.blake2b(
+        json.dumps(
+            dataclasses.asdict(figure_settings), default=str, sort_keys=True
+        ).encode(),
+        digest_size=8,
+    ).hexdigest()
+
+
+def figure_version(
+    graph_data_model: GraphDataModel, figure_settings: GraphFigureSettings
+) -> str:
+    """
+    Version of the figures of the model built with the figure settings, including
+    the format version and the plotly version
+    """
+    return (
+        f"{graph_data_model.data_version()}-{_settings_hash(figure_settings)}"
+        f"-{FIGURE_FORMAT_VERSION}-{plotly.__version__}"
+    )
+
+
+def get_or_create_graph_figure(
+    graph_data_model: GraphDataModel,
+    figure_cache: FigureCache,
+    figure_settings: GraphFigureSettings,
+    selected_graphs: Sequence[str],
+    graph_type: GraphTypeOptions,
+    graph_data_visualization: str,
+    x_range: Optional[Tuple[float, float]],
+    callback_metrics: CallbackMetrics,
+    check_request: Optional[Callable[[], None]] = None,
+    record_payload_bytes: Optional[Callable[[int], None]] = None,
+) -> dict:
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    def _create_figure() -> dict:
+        ###############################################################
+        # Business logic with "strongly typed" and filtered data format
+        ###############################################################
+        with callback_metrics.span("business_logic") as span:
+            graph_data_list = [
+                slice_x_range(
+                    graph_data_model.transformed_graph_data(
+                        graph_name, graph_data_visualization
+                    ),
+                    x_range,
+                )
+                for graph_name in selected_graphs
+            ]
+            span.record_points(sum(len(graph_data) for graph_data in graph_data_list))
+        if check_request:
+            check_request()
+
+        ###############################################################
+        # Create/build prop serialization by use of business logic data
+        ###############################################################
+        with callback_metrics.span("serialization"):
+            figure_builder = GraphFigureBuilder.from_settings(
+                graph_type, figure_settings
+            )
+            graphs_label = (
+                selected_graphs[0]
+                if len(selected_graphs) == 1
+                else f"{len(selected_graphs)} graphs"
+            )
+            title = (
+                f"Title: {graph_type.value} for {graphs_label} with"
+                f" {graph_data_visualization} data"
+            )
+            figure_builder.add_graph_title(title)
+            figure_builder.add_ui_revision(", ".join(selected_graphs))
+            for graph_name, graph_data in zip(selected_graphs, graph_data_list):
+                figure_builder.add_graph_data(
+                    graph_data, name=graph_name if len(selected_graphs) > 1 else None
+                )
+            return figure_builder.get_serialized_figure()
+
+    ##################################################################
+    # Serialized figure only depends on input and data version, reuse
+    # cached figure when available
+    ##################################################################
+    return figure_cache.get_or_create(
+        key=(
+            graph_type.value,
+            graph_data_visualization,
+            str(x_range),
+            *selected_graphs,
+        ),
+        data_version=figure_version(graph_data_model, figure_settings),
+        create_figure=_create_figure,
+        persist=x_range is None,
+        record_payload_bytes=record_payload_bytes,
+    )
+
+
+def get_or_create_graph_data_store(
+    graph_data_model: GraphDataModel,
+    figure_cache: FigureCache,
+    figure_settings: GraphFigureSettings,
+    selected_graph: str,
+    x_range: Optional[Tuple[float, float]],
+    callback_metrics: CallbackMetrics,
+    record_payload_bytes: Optional[Callable[[int], None]] = None,
+) -> dict:
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    def _create_graph_data_store() -> dict:
+        with callback_metrics.span("business_logic") as span:
+            graph_data = graph_data_model.graph_set().graph_data(selected_graph)
+            graph_data = slice_x_range(graph_data, x_range)
+            span.record_points(len(graph_data))
+
+        with callback_metrics.span("serialization"):
+            return serialize_graph_data_store(
+                selected_graph, graph_data, figure_settings
+            )
+
+    return figure_cache.get_or_create(
+        key=("graph_data_store", selected_graph, str(x_range)),
+        data_version=figure_version(graph_data_model, figure_settings),
+        create_figure=_create_graph_data_store,
+        persist=x_range is None,
+        record_payload_bytes=record_payload_bytes,
+    )
+
+
+def get_or_create_ensemble_figure(
+    graph_data_model: GraphDataModel,
+    figure_cache: FigureCache,
+    figure_settings: GraphFigureSettings,
+    x_range: Optional[Tuple[float, float]],
+    callback_metrics: CallbackMetrics,
+    check_request: Optional[Callable[[], None]] = None,
+    record_payload_bytes: Optional[Callable[[int], None]] = None,
+) -> dict:
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    def _create_figure() -> dict:
+        with callback_metrics.span("business_logic") as span:
+            statistics = slice_ensemble_statistics(
+                graph_data_model.ensemble_statistics(), x_range
+            )
+            span.record_points(len(statistics))
+        if check_request:
+            check_request()
+
+        with callback_metrics.span("serialization"):
+            figure_builder = GraphFigureBuilder.from_settings(
+                GraphTypeOptions.LINE_PLOT, figure_settings
+            )
+            figure_builder.add_graph_title(
+                f"Title: {GraphViewOptions.ENSEMBLE_STATISTICS.value} for"
+                f" {statistics.num_realizations} graphs"
+            )
+            figure_builder.add_ui_revision(GraphViewOptions.ENSEMBLE_STATISTICS.value)
+            figure_builder.add_ensemble_statistics(statistics)
+            return figure_builder.get_serialized_figure()
+
+    return figure_cache.get_or_create(
+        key=(GraphViewOptions.ENSEMBLE_STATISTICS.value, str(x_range)),
+        data_version=figure_version(graph_data_model, figure_settings),
+        create_figure=_create_figure,
+        persist=x_range is None,
+        record_payload_bytes=record_payload_bytes,
+    )
@@ -1,8 +1,17 @@
-from typing import Callable, List
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
 import webviz_core_components as wcc
+from dash import MATCH, dcc, html
 
-from ._property_serialization import GraphDataVisualizationOptions, GraphTypeOptions
+from ..._utils import INSTANCE_ID_KEY
+
+from ._property_serialization import (
+    GraphTypeOptions,
+    GraphViewOptions,
+    serialize_graph_selection_matches,
+    serialize_graph_selection_options,
+)
 
 ######################################################################
 #
@@ -16,6 +25,7 @@ from ._property_serialization import GraphDataVisualizationOptions, GraphTypeOpt
 #
 ######################################################################
 
+
 # pylint: disable = too-few-public-methods
 class LayoutElements:
     """
@@ -30,19 +40,167 @@ class LayoutElements:
     """
 
     GRAPH = "graph"
+    GRAPH_DATA_STORE = "graph_data_store"
+    SESSION_STORE = "session_store"
+
+    STREAM_GRAPH = "stream_graph"
+    STREAM_INTERVAL = "stream_interval"
+    STREAM_POSITION_STORE = "stream_position_store"
 
     GRAPH_SELECTION_DROPDOWN = "graph_selection_dropdown"
+    GRAPH_SELECTION_MATCHES = "graph_selection_matches"
+    GRAPH_SELECTION_MORE_BUTTON = "graph_selection_more_button"
+    GRAPH_SELECTION_PAGE_STORE = "graph_selection_page_store"
+    GRAPH_VIEW_RADIO_ITEMS = "graph_view_radio_items"
     GRAPH_TYPE_RADIO_ITEMS = "graph_type_radio_items"
     GRAPH_DATA_VISUALIZATION_RADIO_ITEMS = "graph_data_visualization_radio_items"
 
 
-def main_layout(get_uuid: Callable, graph_names: List[str]) -> wcc.FlexBox:
+@dataclass(frozen=True)
+class LayoutOptions:
+    """
+    Options for the elements of the layout, where the callbacks are defined for
+    the elements present in the layout
+
+    * `clientside_transforms` - Store of graph data, which is transformed and graphed
+    in the browser
+    * `ensemble_statistics` - Selection of graph view, i.e. selected graph or
+    statistics across all graphs
+    * `multi_select` - Selection of several graphs
+    * `stream_interval_ms` - Graph of live data, updated at interval in milliseconds.
+    None without live data.
+    """
+
+    clientside_transforms: bool = False
+    ensemble_statistics: bool = False
+    multi_select: bool = False
+    stream_interval_ms: Optional[int] = None
+
+    def variant(self) -> str:
+        """
+        Name of the layout variant, i.e. the enabled options, where the callbacks are
+        shared by the plugin instances of equal variant
+        """
+        enabled_options = [
+            name
+            for name, is_enabled in (
+                ("clientside_transforms", self.clientside_transforms),
+                ("ensemble_statistics", self.ensemble_statistics),
+                ("multi_select", self.multi_select),
+                ("streaming", self.stream_interval_ms is not None),
+            )
+            if is_enabled
+        ]
+        return "+".join(enabled_options) or "default"
+
+
+class ElementIds:
+    """
+    Pattern-matching IDs of the layout elements, i.e. dict IDs with the element name,
+    the layout variant and the plugin instance
+
+    The layout is created with the ID of the plugin instance, while the callbacks use
+    `MATCH` for the instance. Thereby callbacks registered once per layout variant
+    serve the layout elements of all plugin instances of the variant.
+    """
+
+    def __init__(self, layout_options: LayoutOptions, instance_id: Any = MATCH) -> None:
+        self._variant = layout_options.variant()
+        self._instance_id = instance_id
+
+    def __call__(self, element: str) -> Dict[str, Any]:
+        return {
+            "plugin": "BestPracticePlugin",
+            "element": element,
+            "variant": self._variant,
+            INSTANCE_ID_KEY: self._instance_id,
+        }
+
+
+# Max number of graph names provided as options to the graph selection dropdown at
+# a time, i.e. the page size of the matches when searching
+GRAPH_SELECTION_OPTIONS_LIMIT = 100
+
+
+def _stream_graph_frames(
+    get_uuid: Callable, stream_interval_ms: Optional[int]
+) -> List[wcc.Frame]:
+    """
+    Graph of live data, where the interval triggers the update with new points, and
+    the store holds the stream position of the points sent to the browser
+    """
+    if stream_interval_ms is None:
+        return []
+    return [
+        wcc.Frame(
+            style={"height": "50vh"},
+            highlight=False,
+            color="white",
+            children=[
+                dcc.Interval(
+                    id=get_uuid(LayoutElements.STREAM_INTERVAL),
+                    interval=stream_interval_ms,
+                ),
+                dcc.Store(id=get_uuid(LayoutElements.STREAM_POSITION_STORE)),
+                wcc.Graph(
+                    style={"height": "45vh"},
+                    id=get_uuid(LayoutElements.STREAM_GRAPH),
+                ),
+            ],
+        )
+    ]
+
+
+def main_layout(
+    get_uuid: Callable,
+    graph_names: Sequence[str],
+    graph_data_visualizations: Sequence[str],
+    options: LayoutOptions = LayoutOptions(),
+    num_graphs: Optional[int] = None,
+) -> wcc.FlexBox:
+    """
+    Main layout of the plugin, where `graph_names` are the initial options of the
+    graph selection dropdown, and `graph_data_visualizations` are the names of the
+    graph data transform pipelines. `num_graphs` is the total number of graphs when
+    `graph_names` is the first page of graph names.
+    """
+    num_graphs = len(graph_names) if num_graphs is None else num_graphs
+    # Graph data store for clientside transforms, otherwise the session ID for
+    # cancellation of stale requests
+    graph_data_store = (
+        [dcc.Store(id=get_uuid(LayoutElements.GRAPH_DATA_STORE))]
+        if options.clientside_transforms
+        else [
+            dcc.Store(id=get_uuid(LayoutElements.SESSION_STORE), storage_type="session")
+        ]
+    )
+    graph_view_selectors = (
+        [
+            wcc.Selectors(
+                label="Graph view",
+                children=[
+                    wcc.RadioItems(
+                        id=get_uuid(LayoutElements.GRAPH_VIEW_RADIO_ITEMS),
+                        options=[
+                            {"label": elm.value, "value": elm.value}
+                            for elm in GraphViewOptions
+                        ],
+                        value=GraphViewOptions.SINGLE_GRAPH.value,
+                    )
+                ],
+            )
+        ]
+        if options.ensemble_statistics
+        else []
+    )
     return wcc.FlexBox(
-        children=[
+        children=graph_data_store
+        + [
             wcc.FlexColumn(
                 children=wcc.Frame(
                     style={"height": "90vh"},
-                    children=[
+                    children=graph_view_selectors
+                    + [
                         wcc.Selectors(
                             label="Graphs",
                             children=[
@@ -51,12 +209,37 @@ def main_layout(get_uuid: Callable, graph_names: List[str]) -> wcc.FlexBox:
                                     id=get_uuid(
                                         LayoutElements.GRAPH_SELECTION_DROPDOWN
                                     ),
-                                    options=[
-                                        {"label": name, "value": name}
-                                        for name in graph_names
-                                    ],
-                                    value=graph_names[0],
-                                )
+                                    options=serialize_graph_selection_options(
+                                        graph_names, None
+                                    ),
+                                    value=(
+                                        [graph_names[0]]
+                                        if options.multi_select
+                                        else graph_names[0]
+                                    ),
+                                    multi=options.multi_select,
+                                ),
+                                # Page of search matches provided as options, where
+                                # more matches are appended on request
+                                dcc.Store(
+                                    id=get_uuid(
+                                        LayoutElements.GRAPH_SELECTION_PAGE_STORE
+                                    ),
+                                    data={"query": "", "offset": len(graph_names)},
+                                ),
+                                html.Div(
+                                    id=get_uuid(LayoutElements.GRAPH_SELECTION_MATCHES),
+                                    children=serialize_graph_selection_matches(
+                                        len(graph_names), num_graphs
+                                    ),
+                                ),
+                                html.Button(
+                                    "More matches",
+                                    id=get_uuid(
+                                        LayoutElements.GRAPH_SELECTION_MORE_BUTTON
+                                    ),
+                                    disabled=len(graph_names) >= num_graphs,
+                                ),
                             ],
                         ),
                         wcc.Selectors(
@@ -86,20 +269,10 @@ def main_layout(get_uuid: Callable, graph_names: List[str]) -> wcc.FlexBox:
                                         LayoutElements.GRAPH_DATA_VISUALIZATION_RADIO_ITEMS
                                     ),
                                     options=[
-                                        {
-                                            "label": "Raw data",
-                                            "value": GraphDataVisualizationOptions.RAW.value,
-                                        },
-                                        {
-                                            "label": "Reversed data",
-                                            "value": GraphDataVisualizationOptions.REVERSED.value,
-                                        },
-                                        {
-                                            "label": "Flipped data",
-                                            "value": GraphDataVisualizationOptions.FLIPPED.value,
-                                        },
+                                        {"label": f"{name} data", "value": name}
+                                        for name in graph_data_visualizations
                                     ],
-                                    value=GraphDataVisualizationOptions.RAW.value,
+                                    value=graph_data_visualizations[0],
                                 ),
                             ],
                         ),
@@ -118,7 +291,8 @@ def main_layout(get_uuid: Callable, graph_names: List[str]) -> wcc.FlexBox:
                             id=get_uuid(LayoutElements.GRAPH),
                         ),
                     )
-                ],
+                ]
+                + _stream_graph_frames(get_uuid, options.stream_interval_ms),
             ),
         ],
     )
@@ -1,14 +1,43 @@
-from typing import Union, Type
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union, Type
 
 from webviz_config import WebvizPluginABC
+from webviz_config.webviz_store import WEBVIZ_STORAGE
 
+from dash import get_app
 from dash.development.base_component import Component
 
+from ..._utils import CallbackMetrics, RequestGenerations, register_metrics_route
 from ._business_logic import GraphDataModel
-from ._callbacks import plugin_callbacks
-from ._layout import main_layout
+from ._data_sources import create_graph_data_source
+from ._callbacks import PluginInstanceState, plugin_callbacks
+from ._decimation import DecimationMethod
+from ._figure_cache import FigureCache, SqliteFigureStore
+from ._graph_figures import get_or_create_graph_data_store, get_or_create_graph_figure
+from ._layout import (
+    GRAPH_SELECTION_OPTIONS_LIMIT,
+    ElementIds,
+    LayoutOptions,
+    main_layout,
+)
+from ._property_serialization import (
+    ArrayEncoding,
+    GraphDataVisualizationOptions,
+    GraphFigureSettings,
+    GraphTypeOptions,
+)
+from ._portable_store import graph_data_parquet_file, populate_from_graph_data_parquet
+from ._shared_graph_data import SharedMemoryGraphDataSource
+from ._streaming import (
+    FileTailGraphDataProducer,
+    StreamingFeed,
+    create_mock_graph_data_producer,
+)
+from ._warmup import WarmupScheduler
 
 
+# pylint: disable=too-many-instance-attributes
 class BestPracticePlugin(WebvizPluginABC):
     """
     This Webviz plugin, to illustrate a best practice on code structure and how to
@@ -30,30 +59,295 @@ class BestPracticePlugin(WebvizPluginABC):
     Output.
 
     `Plugin file structure:`
-    * _layout.py - Dash layout and ID-ownership
-    * _callbacks.py - Dash callbacks for handling user interaction and update of view
+    * _layout.py - Dash layout and ID-ownership, with pattern-matching element IDs
+    * _callbacks.py - Dash callbacks for handling user interaction and update of view,
+    registered once per layout variant and shared by the plugin instances
     * _business_logic.py - Query database/input for relevant data and necessary
     ad-hoc calculations for data, separated from Dash specific code (no dash* import)
     * _prop_serialization.py - De-serializing and serializing callback property formats.
     Convert callback Input/State from JSON serializable property formats to strongly typed
     formats (de-serialize) for business logic. Create/build JSON serializable properties
     for Dash callback Output property by use of data from business logic.
+    * _figure_cache.py - Two-tier cache of serialized figures, keyed on callback input
+    and data version of the business logic.
+    * _data_sources.py - File backed graph data sources (.npy, Parquet and Arrow),
+    loading graph data on demand (no dash* import).
+    * _decimation.py - Downsampling/aggregation of graph data to a point budget, and
+    slicing to x range for finer resolution on zoom (no dash* import).
+    * _graph_figures.py - Cached creation of graph figures from the business logic,
+    shared by callbacks and warm-up (no dash* import).
+    * _warmup.py - Background warm-up of the figure cache for the most used graphs
+    (no dash* import).
+    * _shared_graph_data.py - Graph data shared read-only between worker processes
+    by a memory mapped file in shared memory (no dash* import).
+    * _streaming.py - Producers of live graph data, fed into a ring buffer by a
+    background thread (no dash* import).
+    * _portable_store.py - Graph data stored as Parquet at build time of portable
+    apps, optionally with precomputed derived series, and read lazily per graph at
+    runtime (no dash* import).
+
+    `Arguments:`
+    * `figure_cache_size_mb` - Memory budget of the in-process figure cache, in MB.
+    * `figure_cache_path` - Optional path to SQLite file for on-disk figure cache,
+    shared between worker processes and persisted between restarts. Entries are
+    scoped per plugin instance.
+    * `fast_figure_serialization` - Build figures directly as plotly JSON, without
+    validation through plotly graph objects.
+    * `max_graph_points` - Maximum number of points per graph sent to the browser,
+    graphs with more points are decimated. Set to 0 to disable decimation.
+    * `line_decimation` - Decimation method for line plots, `min_max` or `lttb`.
+    * `data_path` - Optional directory with one file per graph, named by the graph.
+    Either `.npy` files, or Parquet/Arrow files with `x` and `y` columns (requires
+    pyarrow). Mock data is used when not provided. Portable apps are populated from
+    the graph data stored at build time, i.e. the files are not needed at runtime.
+    * `data_memory_budget_mb` - Memory budget for graph data loaded from `data_path`,
+    or from the graph data stored for portable apps, least recently used graph data
+    is evicted when exceeded.
+    * `enable_metrics` - Record wall time, payload bytes and graph points for the
+    phases of the graph callback, exposed in Prometheus format on `/metrics`.
+    * `clientside_transforms` - Transform graph data and change graph type in the
+    browser, i.e. the graph data is only requested from the server when the graph
+    selection or zoom changes.
+    * `shared_graph_data` - Load all graph data once into shared memory (`/dev/shm`
+    when present), attached read-only by all worker processes instead of a copy per
+    worker. Run gunicorn with `--preload` for the parent process to own the data.
+    * `warmup_graphs` - Number of most used graphs for which figures are created in
+    the background from the first request, ahead of the following requests. 0
+    disables the warm-up.
+    * `warmup_workers` - Number of background threads for the warm-up, where user
+    requests take priority over the warm-up.
+    * `ensemble_statistics` - Add graph view of statistics across all graphs, i.e.
+    the realizations of an ensemble, as a fan chart of mean, P10/P90 and min/max.
+    Not supported with `clientside_transforms`.
+    * `multi_select` - Select several graphs, overlaid in the same figure. Not
+    supported with `clientside_transforms`.
+    * `webgl_point_threshold` - Line plots with more points in total are rendered
+    with WebGL. Set to 0 to disable WebGL.
+    * `max_separate_traces` - Overlaid line plots with more graphs are batched into
+    a single trace, i.e. with equal styling and without legend per graph.
+    * `streaming` - Add graph of live data, where only new points are sent to the
+    browser on each update.
+    * `stream_path` - Optional text file with one `x,y` point per line, where appended
+    lines are streamed. A mocked up random walk is streamed when not provided.
+    * `stream_capacity` - Number of latest live points kept in memory.
+    * `stream_window_points` - Number of latest live points shown in the graph.
+    * `stream_interval_ms` - Update interval of the live graph, in milliseconds.
+    * `array_encoding` - Encoding of graph data in figures, `list` for JSON lists,
+    `binary` for base64 typed arrays, or `binary_float32` for typed arrays with float
+    data downcast to float32. Typed arrays require plotly.js 2.28 or later.
+    * `request_debounce_ms` - Graph requests wait for the debounce window before
+    starting, where requests superseded by a later request of the same browser
+    session are skipped. Superseded requests in progress are always aborted between
+    the phases of the callback. 0 disables the debounce.
+    * `precompute_derived_series` - Store the graph data transformed by each
+    visualization at build time of portable apps, i.e. transforms are not computed at
+    runtime. Increases the size of the stored data by one copy per visualization.
+    * `figure_cache_disk_size_mb` - Size budget of the on-disk figure cache file, in
+    MB, shared by all plugin instances using the file. Least recently accessed
+    figures are evicted when exceeded.
     """
 
-    def __init__(self) -> None:
+    # pylint: disable=too-many-arguments, too-many-positional-arguments, too-many-locals
+    def __init__(
+        self,
+        figure_cache_size_mb: int = 64,
+        figure_cache_path: Optional[Path] = None,
+        fast_figure_serialization: bool = False,
+        max_graph_points: int = 10000,
+        line_decimation: str = DecimationMethod.MIN_MAX.value,
+        data_path: Optional[Path] = None,
+        data_memory_budget_mb: int = 1024,
+        enable_metrics: bool = False,
+        clientside_transforms: bool = False,
+        shared_graph_data: bool = False,
+        warmup_graphs: int = 0,
+        warmup_workers: int = 2,
+        ensemble_statistics: bool = False,
+        multi_select: bool = False,
+        webgl_point_threshold: int = 100000,
+        max_separate_traces: int = 10,
+        streaming: bool = False,
+        stream_path: Optional[Path] = None,
+        stream_capacity: int = 100000,
+        stream_window_points: int = 10000,
+        stream_interval_ms: int = 1000,
+        array_encoding: str = ArrayEncoding.LIST.value,
+        request_debounce_ms: int = 0,
+        precompute_derived_series: bool = False,
+        figure_cache_disk_size_mb: int = 1024,
+    ) -> None:
         super().__init__()
 
+        self._layout: Optional[Component] = None
+        self._data_path = data_path
+        self._precompute_derived_series = precompute_derived_series
+        self._data_memory_budget_bytes = data_memory_budget_mb * 1024**2
         self._graph_data_model = GraphDataModel()
-        self._graph_data_model.populate_with_mock_data()
+        if WEBVIZ_STORAGE.use_storage:
+            # Portable app, populated from graph data stored at build time
+            populate_from_graph_data_parquet(
+                self._graph_data_model,
+                graph_data_parquet_file(**self._graph_data_parquet_file_kwargs()),
+                memory_budget_bytes=self._data_memory_budget_bytes,
+            )
+        elif data_path:
+            self._graph_data_model.populate_from_data_source(
+                create_graph_data_source(data_path),
+                memory_budget_bytes=self._data_memory_budget_bytes,
+            )
+        else:
+            self._graph_data_model.populate_with_mock_data()
+        if shared_graph_data:
+            # Shared graph data is memory mapped, i.e. not limited by memory budget
+            self._graph_data_model.populate_from_data_source(
+                SharedMemoryGraphDataSource.create_or_attach(
+                    self._graph_data_model.graph_set().data_source()
+                )
+            )
+
+        disk_store = (
+            SqliteFigureStore(
+                figure_cache_path,
+                namespace=self.uuid(),
+                max_bytes=figure_cache_disk_size_mb * 1024**2,
+            )
+            if figure_cache_path
+            else None
+        )
+        self._figure_cache = FigureCache(
+            max_memory_bytes=figure_cache_size_mb * 1024**2, disk_store=disk_store
+        )
+        self._figure_settings = GraphFigureSettings(
+            validate=not fast_figure_serialization,
+            max_points=max_graph_points if max_graph_points > 0 else None,
+            decimation_method=DecimationMethod(line_decimation),
+            webgl_point_threshold=(
+                webgl_point_threshold if webgl_point_threshold > 0 else None
+            ),
+            max_separate_traces=max_separate_traces,
+            stream_window_points=stream_window_points,
+            array_encoding=ArrayEncoding(array_encoding),
+        )
+
+        if clientside_transforms and (ensemble_statistics or multi_select):
+            raise ValueError(
+                "Ensemble statistics and multi select are not supported with "
+                "clientside transforms!"
+            )
+        self._layout_options = LayoutOptions(
+            clientside_transforms=clientside_transforms,
+            ensemble_statistics=ensemble_statistics,
+            multi_select=multi_select,
+            stream_interval_ms=stream_interval_ms if streaming else None,
+        )
+        self._stream_feed = (
+            StreamingFeed(
+                (
+                    FileTailGraphDataProducer(stream_path)
+                    if stream_path
+                    else create_mock_graph_data_producer()
+                ),
+                capacity=stream_capacity,
+                poll_interval_s=stream_interval_ms / 1000,
+            )
+            if streaming
+            else None
+        )
+        self._callback_metrics = CallbackMetrics(
+            "BestPracticePlugin.update_graph", enabled=enable_metrics
+        )
+        if enable_metrics:
+            register_metrics_route(get_app().server)
+
+        self._warmup_scheduler = WarmupScheduler(
+            graph_names=lambda: self._graph_data_model.graph_set().graph_names(),
+            create_tasks=self._warmup_tasks,
+            max_graphs=warmup_graphs,
+            max_workers=warmup_workers,
+        )
+
+        self._request_generations = RequestGenerations(
+            debounce_s=request_debounce_ms / 1000
+        )
 
         self.set_callbacks()
 
     @property
     def layout(self) -> Union[str, Type[Component]]:
-        return main_layout(
-            get_uuid=self.uuid,
-            graph_names=self._graph_data_model.graph_set().graph_names(),
-        )
+        # Layout is static for the plugin instance, i.e. built on first access
+        if self._layout is None:
+            self._layout = main_layout(
+                get_uuid=ElementIds(self._layout_options, self.uuid()),
+                graph_names=self._graph_data_model.graph_set().graph_names()[
+                    :GRAPH_SELECTION_OPTIONS_LIMIT
+                ],
+                graph_data_visualizations=self._graph_data_visualizations(),
+                options=self._layout_options,
+                num_graphs=self._graph_data_model.graph_set().num_graphs(),
+            )
+        return self._layout
+
+    def _graph_data_parquet_file_kwargs(self) -> Dict:
+        return {
+            "data_path": self._data_path,
+            "derived_series": self._precompute_derived_series,
+            "memory_budget_bytes": self._data_memory_budget_bytes,
+        }
+
+    def add_webvizstore(self) -> List[Tuple[Callable, List[Dict]]]:
+        return [(graph_data_parquet_file, [self._graph_data_parquet_file_kwargs()])]
 
     def set_callbacks(self) -> None:
-        plugin_callbacks(self.uuid, self._graph_data_model)
+        plugin_callbacks(
+            self.uuid(),
+            PluginInstanceState(
+                graph_data_model=self._graph_data_model,
+                figure_cache=self._figure_cache,
+                figure_settings=self._figure_settings,
+                callback_metrics=self._callback_metrics,
+                warmup_scheduler=self._warmup_scheduler,
+                request_generations=self._request_generations,
+                stream_feed=self._stream_feed,
+            ),
+            self._layout_options,
+        )
+
+    def _graph_data_visualizations(self) -> List[str]:
+        """
+        Names of the graph data visualizations, i.e. the transform pipelines, where
+        clientside transforms support the base visualizations only
+        """
+        if self._layout_options.clientside_transforms:
+            return [elm.value for elm in GraphDataVisualizationOptions]
+        return self._graph_data_model.transform_pipelines().pipeline_names()
+
+    def _warmup_tasks(self, graph_name: str) -> List[Callable[[], dict]]:
+        """Tasks creating the cached figures of graph, for the initial zoom"""
+        warmup_metrics = CallbackMetrics("BestPracticePlugin.warmup", enabled=False)
+        if self._layout_options.clientside_transforms:
+            return [
+                partial(
+                    get_or_create_graph_data_store,
+                    self._graph_data_model,
+                    self._figure_cache,
+                    self._figure_settings,
+                    graph_name,
+                    None,
+                    warmup_metrics,
+                )
+            ]
+        return [
+            partial(
+                get_or_create_graph_figure,
+                self._graph_data_model,
+                self._figure_cache,
+                self._figure_settings,
+                [graph_name],
+                graph_type,
+                graph_data_visualization,
+                None,
+                warmup_metrics,
+            )
+            for graph_type in GraphTypeOptions
+            for graph_data_visualization in self._graph_data_visualizations()
+        ]
@@ -0,0 +1,325 @@
+import bisect
+import functools
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from webviz_config.webviz_store import webvizstore
+
+from ._business_logic import GraphData, GraphDataModel, GraphDataSource
+from ._data_sources import create_graph_data_source
+
+######################################################################
+#
+# Portable store of graph data
+#
+# Rule: No dash* import allowed
+#
+# For portable apps (`webviz build --portable`) the graph data of the
+# model is stored at build time by the webviz store, as a Parquet
+# file in long format: one row per point, with the x and y data as
+# columns. Graphs are written one at a time, concatenated into large
+# row groups, and indexed by the number of points and dtypes of each
+# graph and pipeline in the file metadata.
+#
+# The x and y data are stored in an integer (int64) or float
+# (float64) column per axis, by the kind of the dtype, i.e. without
+# loss, and are read back with the dtype of the graph data.
+#
+# At runtime the graph data is read lazily, i.e. only the row groups
+# spanned by a graph are read the first time the graph is requested.
+#
+# Optionally, the derived series of the transform pipelines are
+# precomputed at build time and stored as well, i.e. the portable
+# app neither needs the original data files nor computes transforms.
+#
+# Requires `pyarrow` to be installed.
+#
+######################################################################
+
+# Pipeline name of the rows with the graph data itself, i.e. not derived
+GRAPH_DATA_PIPELINE = ""
+
+# Key of the graph names, pipeline names, index and data version in the file metadata
+METADATA_KEY = b"webviz_graph_data"
+
+# Number of rows per row group, i.e. the granularity of reading graphs lazily
+ROW_GROUP_ROWS = 1 << 16
+
+
+def _storage_column(axis: str, dtype: np.dtype) -> str:
+    """
+    Storage column of the x or y data by the kind of the dtype, i.e. signed integer
+    data is stored as int64 and floating point data as float64
+    """
+    return f"{axis}_int" if dtype.kind == "i" else f"{axis}_float"
+
+
+def _to_storage(array: np.ndarray) -> np.ndarray:
+    return array.astype(np.int64 if array.dtype.kind == "i" else np.float64, copy=False)
+
+
+def write_graph_data_parquet(
+    graph_data_model: GraphDataModel, path: Path, derived_series: bool = False
+) -> None:
+    """
+    Write graph data of the model to a Parquet file in long format, including the
+    graph data transformed by each pipeline of the model when `derived_series` is
+    set. The dtypes of the x and y data are kept.
+    """
+    # pylint: disable=import-outside-toplevel, too-many-locals
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    graph_set = graph_data_model.graph_set()
+    pipelines = graph_data_model.transform_pipelines()
+    derived_pipeline_names = (
+        [
+            name
+            for name in pipelines.pipeline_names()
+            if pipelines.pipeline(name).steps()
+        ]
+        if derived_series
+        else []
+    )
+    pipeline_names = [GRAPH_DATA_PIPELINE, *derived_pipeline_names]
+    columns = {
+        "x_int": pa.int64(),
+        "x_float": pa.float64(),
+        "y_int": pa.int64(),
+        "y_float": pa.float64(),
+    }
+    schema = pa.schema(list(columns.items()))
+
+    # Number of points and code of the x and y dtypes per graph and pipeline, in
+    # order of the rows
+    lengths: List[int] = []
+    dtype_codes: List[int] = []
+    dtype_pairs: Dict[Tuple[str, str], int] = {}
+    pending: List[Any] = []
+    num_pending_rows = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for graph_name in graph_set.graph_names():
+            for pipeline_name in pipeline_names:
+                graph_data = (
+                    graph_data_model.transformed_graph_data(graph_name, pipeline_name)
+                    if pipeline_name != GRAPH_DATA_PIPELINE
+                    else graph_set.graph_data(graph_name)
+                )
+                arrays = {
+                    _storage_column(axis, array.dtype): _to_storage(array)
+                    for axis, array in [
+                        ("x", graph_data.x_data()),
+                        ("y", graph_data.y_data()),
+                    ]
+                }
+                lengths.append(len(graph_data))
+                dtype_codes.append(
+                    dtype_pairs.setdefault(
+                        (graph_data.x_data().dtype.str, graph_data.y_data().dtype.str),
+                        len(dtype_pairs),
+                    )
+                )
+                pending.append(
+                    pa.Table.from_arrays(
+                        [
+                            (
+                                arrays[name]
+                                if name in arrays
+                                else pa.nulls(len(graph_data), column_type)
+                            )
+                            for name, column_type in columns.items()
+                        ],
+                        schema=schema,
+                    )
+                )
+                num_pending_rows += len(graph_data)
+
+                # Write full row groups, keeping the remaining rows pending
+                if num_pending_rows >= ROW_GROUP_ROWS:
+                    table = pa.concat_tables(pending)
+                    num_rows = num_pending_rows // ROW_GROUP_ROWS * ROW_GROUP_ROWS
+                    writer.write_table(
+                        table.slice(0, num_rows), row_group_size=ROW_GROUP_ROWS
+                    )
+                    pending = [table.slice(num_rows)]
+                    num_pending_rows -= num_rows
+
+        if num_pending_rows:
+            writer.write_table(pa.concat_tables(pending))
+        writer.add_key_value_metadata(
+            {
+                METADATA_KEY: json.dumps(
+                    {
+                        "graphs": list(graph_set.graph_names()),
+                        "pipelines": pipeline_names,
+                        "lengths": lengths,
+                        "dtype_codes": dtype_codes,
+                        "dtype_pairs": list(dtype_pairs),
+                        "data_version": graph_data_model.data_version(),
+                    }
+                )
+            }
+        )
+
+
+# pylint: disable=too-many-instance-attributes
+class PortableGraphDataSource(GraphDataSource):
+    """
+    Graph data source for a Parquet file written by `write_graph_data_parquet`
+
+    Only the file metadata is read at construction, i.e. the index of the rows of
+    each graph and pipeline. The row groups spanned by a graph are read the first
+    time the graph data is requested.
+    """
+
+    def __init__(self, path: Path) -> None:
+        # pylint: disable=import-outside-toplevel
+        import pyarrow.parquet as pq
+
+        self._parquet_file = pq.ParquetFile(path, memory_map=True)
+        self._lock = threading.Lock()
+
+        file_metadata = self._parquet_file.metadata
+        metadata = json.loads(file_metadata.metadata[METADATA_KEY])
+        self._graph_names: List[str] = metadata["graphs"]
+        self._pipeline_names: List[str] = metadata["pipelines"]
+        self._data_version: str = metadata["data_version"]
+
+        # First row, number of rows and dtype code of each graph and pipeline, where
+        # the rows are in order of graph and pipeline
+        self._graph_codes = dict(zip(self._graph_names, range(len(self._graph_names))))
+        shape = (len(self._graph_names), len(self._pipeline_names))
+        lengths = np.array(metadata["lengths"], dtype=np.int64)
+        self._rows = np.stack(
+            [
+                np.cumsum(lengths) - lengths,
+                lengths,
+                np.array(metadata["dtype_codes"], dtype=np.int64),
+            ],
+            axis=-1,
+        ).reshape(*shape, 3)
+        self._dtype_pairs = [
+            (np.dtype(x_dtype), np.dtype(y_dtype))
+            for x_dtype, y_dtype in metadata["dtype_pairs"]
+        ]
+
+        self._row_group_offsets = np.r_[
+            0,
+            np.cumsum(
+                [
+                    file_metadata.row_group(index).num_rows
+                    for index in range(file_metadata.num_row_groups)
+                ]
+            ),
+        ].tolist()
+
+    def graph_names(self) -> List[str]:
+        return list(self._graph_names)
+
+    def data_version(self) -> str:
+        return self._data_version
+
+    def derived_pipeline_names(self) -> List[str]:
+        """Names of the pipelines with derived series stored"""
+        return [name for name in self._pipeline_names if name != GRAPH_DATA_PIPELINE]
+
+    def load_graph_data(self, graph_name: str) -> GraphData:
+        return self._read_graph_data(graph_name, GRAPH_DATA_PIPELINE)
+
+    def load_derived_graph_data(
+        self, graph_name: str, pipeline_name: str
+    ) -> Optional[GraphData]:
+        """
+        Graph data transformed by the named pipeline, or None when the derived series
+        of the pipeline or graph are not stored
+        """
+        if (
+            pipeline_name not in self.derived_pipeline_names()
+            or graph_name not in self._graph_codes
+        ):
+            return None
+        return self._read_graph_data(graph_name, pipeline_name)
+
+    def _read_graph_data(self, graph_name: str, pipeline_name: str) -> GraphData:
+        start, length, dtype_code = self._rows[
+            self._graph_codes[graph_name], self._pipeline_names.index(pipeline_name)
+        ].tolist()
+        dtypes = self._dtype_pairs[dtype_code]
+        if length == 0:
+            return GraphData(np.empty(0, dtypes[0]), np.empty(0, dtypes[1]))
+
+        # Row groups spanned by the rows of the graph
+        first = bisect.bisect_right(self._row_group_offsets, start) - 1
+        last = bisect.bisect_left(self._row_group_offsets, start + length)
+        columns = [
+            _storage_column(axis, dtype) for axis, dtype in zip(["x", "y"], dtypes)
+        ]
+        with self._lock:
+            table = self._parquet_file.read_row_groups(
+                list(range(first, last)), columns=columns
+            )
+        table = table.slice(start - self._row_group_offsets[first], length)
+        x_data, y_data = [
+            table.column(column)
+            .combine_chunks()
+            .to_numpy(zero_copy_only=False)
+            .astype(dtype, copy=False)
+            for column, dtype in zip(columns, dtypes)
+        ]
+        return GraphData(x_data, y_data)
+
+
+def populate_from_graph_data_parquet(
+    graph_data_model: GraphDataModel,
+    path: Path,
+    memory_budget_bytes: Optional[int] = None,
+) -> None:
+    """
+    Populate model with graph data read lazily from a Parquet file written by
+    `write_graph_data_parquet`, and keep read graph data in memory within the memory
+    budget. Stored derived series are served as precomputed transformed graph data.
+    """
+    source = PortableGraphDataSource(path)
+    graph_data_model.populate_from_data_source(source, memory_budget_bytes)
+    graph_data_model.set_precomputed_graph_data(source.load_derived_graph_data)
+
+
+@functools.lru_cache(maxsize=1)
+def _build_directory() -> tempfile.TemporaryDirectory:
+    """
+    Directory of the files written at build time, removed at exit after being copied
+    into the webviz store
+    """
+    return tempfile.TemporaryDirectory(prefix="webviz_graph_data_")
+
+
+@webvizstore
+def graph_data_parquet_file(
+    data_path: Optional[Path] = None,
+    derived_series: bool = False,
+    memory_budget_bytes: Optional[int] = None,
+) -> Path:
+    """
+    Parquet file with the graph data of `data_path` (mock data when not provided),
+    stored at build time of portable apps. The graph data is loaded within the memory
+    budget, as the file is written one graph at a time.
+    """
+    graph_data_model = GraphDataModel()
+    if data_path:
+        graph_data_model.populate_from_data_source(
+            create_graph_data_source(data_path), memory_budget_bytes
+        )
+    else:
+        graph_data_model.populate_with_mock_data()
+
+    file_descriptor, path = tempfile.mkstemp(
+        suffix=".parquet", dir=_build_directory().name
+    )
+    os.close(file_descriptor)
+    write_graph_data_parquet(graph_data_model, Path(path), derived_series)
+    return Path(path)
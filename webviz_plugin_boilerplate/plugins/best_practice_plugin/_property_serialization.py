@@ -1,8 +1,27 @@
+import base64
+import json
+from dataclasses import dataclass
 from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import plotly.graph_objs as go
+import plotly.io as pio
+from plotly.basedatatypes import BasePlotlyType
+from plotly.utils import PlotlyJSONEncoder
 
-from ._business_logic import GraphData
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from ._business_logic import EnsembleStatistics, GraphData
+from ._decimation import (
+    DecimationMethod,
+    bucket_aggregate,
+    decimate_ensemble_statistics,
+    decimate_line,
+)
 
 
 ###################################################################
@@ -45,10 +64,10 @@ class GraphTypeOptions(str, Enum):
 
 class GraphDataVisualizationOptions(str, Enum):
     """
-    Type definition of graph data visualization options
+    Type definition of the base graph data visualization options
 
-    For de-serialization of graph data visualization selection in callback
-    Input/State property.
+    The visualizations are named transform pipelines of the business logic, where
+    the base visualizations are supported by clientside transforms as well.
     """
 
     RAW = "Raw"
@@ -56,6 +75,199 @@ class GraphDataVisualizationOptions(str, Enum):
     FLIPPED = "Flipped"
 
 
+class GraphViewOptions(str, Enum):
+    """
+    Type definition of graph view options, i.e. the selected graph or statistics
+    across all graphs of the graph set
+
+    For de-serialization of graph view selection in callback Input/State property.
+    """
+
+    SINGLE_GRAPH = "Single graph"
+    ENSEMBLE_STATISTICS = "Ensemble statistics"
+
+
+class ArrayEncoding(str, Enum):
+    """
+    Encoding of the graph data arrays in serialized figures, either JSON lists of
+    numbers or plotly typed arrays (base64 encoded array data and dtype), where
+    float data is optionally downcast to float32
+
+    Plotly graph objects (plotly 6 and later) serialize arrays as typed arrays, which
+    are decoded for JSON lists, i.e. the encoding applies with and without figure
+    validation.
+    """
+
+    LIST = "list"
+    BINARY = "binary"
+    BINARY_FLOAT32 = "binary_float32"
+
+
+def deserialize_graph_selection(
+    selected_graph_value: Union[None, str, Sequence[str]],
+) -> List[str]:
+    """
+    De-serialize graph selection dropdown value to list of selected graphs, for
+    single and multi selection dropdown
+    """
+    if not selected_graph_value:
+        return []
+    if isinstance(selected_graph_value, str):
+        return [selected_graph_value]
+    return [elm for elm in selected_graph_value if isinstance(elm, str)]
+
+
+def serialize_graph_selection_options(
+    graph_names: Sequence[str], selected_graph: Union[None, str, Sequence[str]]
+) -> List[Dict[str, str]]:
+    """
+    Serialize graph names to dropdown options, where the selected graph(s) are always
+    included to keep the dropdown value valid.
+    """
+    options = [{"label": name, "value": name} for name in graph_names]
+    graph_name_set = set(graph_names)
+    missing_options = [
+        {"label": name, "value": name}
+        for name in deserialize_graph_selection(selected_graph)
+        if name not in graph_name_set
+    ]
+    return missing_options + options
+
+
+def serialize_graph_selection_matches(num_shown: int, num_matches: int) -> str:
+    """Serialize number of graph names shown as options out of the search matches"""
+    return f"{num_shown} of {num_matches} matches"
+
+
+@dataclass(frozen=True)
+class GraphFigureSettings:
+    """Settings for building graph figures, see `GraphFigureBuilder`"""
+
+    validate: bool = True
+    max_points: Optional[int] = None
+    decimation_method: DecimationMethod = DecimationMethod.MIN_MAX
+    webgl_point_threshold: Optional[int] = None
+    max_separate_traces: Optional[int] = None
+    stream_window_points: int = 10000
+    array_encoding: ArrayEncoding = ArrayEncoding.LIST
+
+
+def has_x_axis_change(relayout_data: Optional[dict]) -> bool:
+    """Whether relayout data of a graph contains change of the x axis range"""
+    return bool(relayout_data) and any(
+        key.startswith("xaxis.range") or key == "xaxis.autorange"
+        for key in relayout_data
+    )
+
+
+def deserialize_x_range(
+    relayout_data: Optional[dict],
+) -> Optional[Tuple[float, float]]:
+    """
+    De-serialize x axis range from relayout data of a graph
+
+    Returns None when the relayout data does not contain a x axis range, e.g. on
+    autorange.
+    """
+    if not relayout_data or relayout_data.get("xaxis.autorange"):
+        return None
+
+    x_range = relayout_data.get("xaxis.range")
+    if x_range is None and "xaxis.range[0]" in relayout_data:
+        x_range = [relayout_data["xaxis.range[0]"], relayout_data.get("xaxis.range[1]")]
+    try:
+        return (float(x_range[0]), float(x_range[1]))
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+_FAN_CHART_COLOR = "rgb(31, 119, 180)"
+_FAN_CHART_MIN_MAX_FILL_COLOR = "rgba(31, 119, 180, 0.15)"
+_FAN_CHART_PERCENTILES_FILL_COLOR = "rgba(31, 119, 180, 0.35)"
+
+
+# Min number of points per series when the point budget is shared between series
+MIN_POINTS_PER_SERIES = 100
+
+
+_INT32_INFO = np.iinfo(np.int32)
+
+
+def serialize_typed_array(array: np.ndarray, float32: bool = False) -> Dict[str, str]:
+    """
+    Serialize array as plotly typed array, i.e. base64 encoded little-endian array
+    data and dtype
+
+    Float data is downcast to float32 when `float32` is set. 64-bit integer data is
+    not supported by plotly.js, and is converted to int32 when within range and
+    float64 otherwise.
+    """
+    if array.dtype.kind == "f":
+        dtype = np.dtype("<f4" if float32 else "<f8")
+    elif array.dtype.kind in ("i", "u") and array.dtype.itemsize <= 4:
+        dtype = array.dtype.newbyteorder("<")
+    elif array.dtype.kind in ("i", "u") and (
+        array.size == 0
+        or (array.min() >= _INT32_INFO.min and array.max() <= _INT32_INFO.max)
+    ):
+        dtype = np.dtype("<i4")
+    else:
+        dtype = np.dtype("<f8")
+    data = np.ascontiguousarray(array, dtype=dtype)
+    return {"dtype": dtype.str[1:], "bdata": base64.b64encode(data).decode("ascii")}
+
+
+def _with_typed_arrays(trace: Dict[str, Any], float32: bool) -> Dict[str, Any]:
+    """Trace with x and y data serialized as plotly typed arrays"""
+    trace = trace.copy()
+    for key in ("x", "y"):
+        value = trace.get(key)
+        if value is None:
+            continue
+        if isinstance(value, dict):
+            # Already typed array, e.g. serialized by plotly graph objects
+            if not float32 or value["dtype"] != "f8":
+                continue
+            value = np.frombuffer(base64.b64decode(value["bdata"]), dtype="<f8")
+        trace[key] = serialize_typed_array(np.asarray(value), float32)
+    return trace
+
+
+def _with_list_arrays(trace: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Trace with x and y typed arrays, e.g. serialized by plotly graph objects, decoded
+    to arrays, i.e. serialized as JSON lists
+    """
+    trace = trace.copy()
+    for key in ("x", "y"):
+        value = trace.get(key)
+        if isinstance(value, dict) and "bdata" in value:
+            trace[key] = np.frombuffer(
+                base64.b64decode(value["bdata"]), dtype=np.dtype(f"<{value['dtype']}")
+            )
+    return trace
+
+
+def _named(trace: Dict[str, Any], name: Optional[str]) -> Dict[str, Any]:
+    if name is not None:
+        trace["name"] = name
+    return trace
+
+
+def _nan_separated(series: Sequence[GraphData]) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenate x and y data of series, separated by NaN values"""
+    num_points = sum(len(graph_data) for graph_data in series) + len(series) - 1
+    x_data = np.full(num_points, np.nan)
+    y_data = np.full(num_points, np.nan)
+    start = 0
+    for graph_data in series:
+        end = start + len(graph_data)
+        x_data[start:end] = graph_data.x_data()
+        y_data[start:end] = graph_data.y_data()
+        start = end + 1
+    return x_data, y_data
+
+
 class GraphFigureBuilder:
     """
     Figure builder for creating/building serializable Output property data
@@ -63,27 +275,328 @@ class GraphFigureBuilder:
 
     Contains functions for adding title, graph data and retreving the serialized
     data for callback Output property.
+
+    The figure is built as plotly JSON (dictionaries of layout and trace
+    properties). By default the figure is validated through plotly graph objects,
+    while `validate=False` emits the plotly JSON directly with the graph data arrays,
+    i.e. bypassing the property validation and copying in plotly graph objects. Both
+    modes provide equivalent figures.
+
+    When `max_points` is given, graph data with more points is decimated before it
+    is added to the figure: line plots are downsampled by the given decimation method,
+    and bar charts are aggregated into buckets. The point budget is shared between
+    the series of the figure.
+
+    Line plots with more than `max_separate_traces` series are batched into a single
+    trace, with the series separated by NaN values. Line plots with more than
+    `webgl_point_threshold` points in total are rendered with WebGL (`scattergl`).
+
+    The x and y data of the traces are serialized by the `array_encoding` of the
+    settings, see `ArrayEncoding`, provided by `from_settings`.
     """
 
-    def __init__(self, graph_type: GraphTypeOptions) -> None:
-        self._figure = go.Figure()
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    def __init__(
+        self,
+        graph_type: GraphTypeOptions,
+        validate: bool = True,
+        max_points: Optional[int] = None,
+        decimation_method: DecimationMethod = DecimationMethod.MIN_MAX,
+        webgl_point_threshold: Optional[int] = None,
+        max_separate_traces: Optional[int] = None,
+    ) -> None:
+        self._layout: Dict[str, Any] = {}
+        self._traces: List[Dict[str, Any]] = []
+        self._series: List[Tuple[Optional[str], GraphData]] = []
         self._graph_type = graph_type
+        self._settings = GraphFigureSettings(
+            validate=validate,
+            max_points=max_points,
+            decimation_method=decimation_method,
+            webgl_point_threshold=webgl_point_threshold,
+            max_separate_traces=max_separate_traces,
+        )
+
+    @classmethod
+    def from_settings(
+        cls, graph_type: GraphTypeOptions, settings: GraphFigureSettings
+    ) -> "GraphFigureBuilder":
+        figure_builder = cls(graph_type)
+        figure_builder._settings = settings
+        return figure_builder
 
     def add_graph_title(self, title: str) -> None:
-        self._figure.update_layout(title=title)
+        self._layout["title"] = {"text": title}
+
+    def add_ui_revision(self, ui_revision: str) -> None:
+        """Keep user interaction state (e.g. zoom) while the revision is unchanged"""
+        self._layout["uirevision"] = ui_revision
 
-    def add_graph_data(self, graph_data: GraphData) -> None:
-        trace = None
-        if self._graph_type == GraphTypeOptions.LINE_PLOT:
-            trace = go.Scatter(
-                x=graph_data.x_data(), y=graph_data.y_data(), mode="lines"
+    def add_graph_data(self, graph_data: GraphData, name: Optional[str] = None) -> None:
+        """
+        Add graph data as a series, where traces are created when the figure is
+        serialized, i.e. when the number of series is known.
+        """
+        self._series.append((name, graph_data))
+
+    def _series_traces(self) -> List[Dict[str, Any]]:
+        if not self._series:
+            return []
+
+        # Point budget is shared between the series
+        max_points = self._settings.max_points
+        if max_points:
+            max_points = max(
+                max_points // len(self._series), min(max_points, MIN_POINTS_PER_SERIES)
             )
+        series = [
+            (name, self._decimate(graph_data, max_points))
+            for name, graph_data in self._series
+        ]
+
         if self._graph_type == GraphTypeOptions.BAR_CHART:
-            trace = go.Bar(x=graph_data.x_data(), y=graph_data.y_data())
-        if not trace:
+            return [
+                _named({"x": data.x_data(), "y": data.y_data(), "type": "bar"}, name)
+                for name, data in series
+            ]
+        if self._graph_type != GraphTypeOptions.LINE_PLOT:
             raise ValueError(f'Graph type "{self._graph_type.value}" is not handled!')
-        self._figure.add_trace(trace)
+
+        num_points = sum(len(data) for _, data in series)
+        scatter_type = (
+            "scattergl"
+            if self._settings.webgl_point_threshold is not None
+            and num_points > self._settings.webgl_point_threshold
+            else "scatter"
+        )
+        if self._settings.max_separate_traces is not None and (
+            len(series) > self._settings.max_separate_traces
+        ):
+            # Series with equal styling in a single trace, separated by NaN values
+            x_data, y_data = _nan_separated([data for _, data in series])
+            return [
+                {
+                    "mode": "lines",
+                    "x": x_data,
+                    "y": y_data,
+                    "type": scatter_type,
+                    "name": f"{len(series)} graphs",
+                }
+            ]
+        return [
+            _named(
+                {
+                    "mode": "lines",
+                    "x": data.x_data(),
+                    "y": data.y_data(),
+                    "type": scatter_type,
+                },
+                name,
+            )
+            for name, data in series
+        ]
+
+    def add_ensemble_statistics(self, statistics: EnsembleStatistics) -> None:
+        """
+        Add statistics as a fan chart, i.e. the mean line within a P10-P90 band and
+        a wider min-max band. The graph type is not applicable.
+        """
+        if self._settings.max_points:
+            statistics = decimate_ensemble_statistics(
+                statistics, self._settings.max_points
+            )
+
+        def _line(name: str, y_data: np.ndarray, **properties: Any) -> Dict[str, Any]:
+            return {
+                "mode": "lines",
+                "x": statistics.x_data,
+                "y": y_data,
+                "type": "scatter",
+                "name": name,
+                **properties,
+            }
+
+        band_line = {"width": 0, "color": _FAN_CHART_COLOR}
+        self._traces.extend(
+            [
+                _line("Min", statistics.minimum, line=band_line, showlegend=False),
+                _line(
+                    "Min - Max",
+                    statistics.maximum,
+                    line=band_line,
+                    fill="tonexty",
+                    fillcolor=_FAN_CHART_MIN_MAX_FILL_COLOR,
+                ),
+                _line("P90", statistics.p90, line=band_line, showlegend=False),
+                _line(
+                    "P10 - P90",
+                    statistics.p10,
+                    line=band_line,
+                    fill="tonexty",
+                    fillcolor=_FAN_CHART_PERCENTILES_FILL_COLOR,
+                ),
+                _line("Mean", statistics.mean, line={"color": _FAN_CHART_COLOR}),
+            ]
+        )
+
+    def _decimate(self, graph_data: GraphData, max_points: Optional[int]) -> GraphData:
+        if not max_points or len(graph_data) <= max_points:
+            return graph_data
+        if self._graph_type == GraphTypeOptions.BAR_CHART:
+            return bucket_aggregate(graph_data, max_points)
+        return decimate_line(graph_data, max_points, self._settings.decimation_method)
 
     def get_serialized_figure(self) -> dict:
         """Get figure on a JSON serialized format - i.e. a dictionary"""
-        return self._figure.to_dict()
+        traces = self._traces + self._series_traces()
+        if self._settings.validate:
+            figure = go.Figure(data=traces, layout=self._layout).to_dict()
+        else:
+            layout = self._layout.copy()
+            template = _default_template_json()
+            if template is not None and "template" not in layout:
+                layout["template"] = template
+            figure = {"data": [trace.copy() for trace in traces], "layout": layout}
+
+        if self._settings.array_encoding is ArrayEncoding.LIST:
+            figure["data"] = [_with_list_arrays(trace) for trace in figure["data"]]
+        else:
+            float32 = self._settings.array_encoding is ArrayEncoding.BINARY_FLOAT32
+            figure["data"] = [
+                _with_typed_arrays(trace, float32) for trace in figure["data"]
+            ]
+        return figure
+
+    def get_encoded_figure(self) -> bytes:
+        """Get figure encoded as JSON bytes"""
+        return encode_figure(self.get_serialized_figure())
+
+
+def serialize_graph_data_store(
+    graph_name: str, graph_data: GraphData, settings: GraphFigureSettings
+) -> Dict[str, Any]:
+    """
+    Serialize graph data for storage in the browser, for building the figure in a
+    clientside callback
+
+    The graph data is decimated as for line plots, independent of graph type, as
+    the graph type is selected in the browser. The base layout contains the template
+    and ui revision, as provided by `GraphFigureBuilder` for the figure.
+    """
+    if settings.max_points and len(graph_data) > settings.max_points:
+        graph_data = decimate_line(
+            graph_data, settings.max_points, settings.decimation_method
+        )
+
+    layout: Dict[str, Any] = {"uirevision": graph_name}
+    template = _default_template_json()
+    if template is not None:
+        layout["template"] = template
+    return {
+        "graphName": graph_name,
+        "x": graph_data.x_data().tolist(),
+        "y": graph_data.y_data().tolist(),
+        "layout": layout,
+    }
+
+
+STREAM_GRAPH_NAME = "Live data"
+
+# Min number of points of decimated stream extensions, i.e. keeping the first,
+# last, min and max point of the new points
+MIN_STREAM_EXTENSION_POINTS = 4
+
+
+def serialize_stream_figure(
+    graph_data: GraphData, settings: GraphFigureSettings
+) -> Dict[str, Any]:
+    """
+    Serialize figure of the latest streamed points, i.e. a line plot with a single
+    trace, which is extended by `serialize_stream_extension`
+    """
+    figure_builder = GraphFigureBuilder.from_settings(
+        GraphTypeOptions.LINE_PLOT, settings
+    )
+    figure_builder.add_graph_title(f"Title: {STREAM_GRAPH_NAME}")
+    figure_builder.add_ui_revision(STREAM_GRAPH_NAME)
+    figure_builder.add_graph_data(graph_data)
+    return figure_builder.get_serialized_figure()
+
+
+def serialize_stream_extension(
+    graph_data: GraphData, settings: GraphFigureSettings
+) -> List[Any]:
+    """
+    Serialize new streamed points as `extendData` property of the graph, appended to
+    the trace of the stream figure. The trace keeps the latest `stream_window_points`
+    points.
+
+    When the window of the stream figure is decimated to `max_points`, the new points
+    are decimated by the same ratio, and the trace keeps the latest `max_points`
+    points.
+    """
+    max_trace_points = settings.stream_window_points
+    if settings.max_points and settings.max_points < max_trace_points:
+        max_points = -(-len(graph_data) * settings.max_points // max_trace_points)
+        graph_data = decimate_line(
+            graph_data,
+            max(max_points, MIN_STREAM_EXTENSION_POINTS),
+            settings.decimation_method,
+        )
+        max_trace_points = settings.max_points
+    return [
+        {"x": [graph_data.x_data().tolist()], "y": [graph_data.y_data().tolist()]},
+        [0],
+        max_trace_points,
+    ]
+
+
+_TEMPLATE_JSON_CACHE: Dict[int, Tuple[Any, dict]] = {}
+
+
+def _default_template_json() -> Any:
+    """
+    Plotly JSON of the default template, as added to the figure layout by plotly
+    graph objects. Cached per template object, and shared between figures.
+    """
+    if pio.templates.default is None:
+        return None
+
+    template = pio.templates.default
+    if not isinstance(template, BasePlotlyType):
+        template = pio.templates[template]
+
+    cached = _TEMPLATE_JSON_CACHE.get(id(template))
+    if cached is None or cached[0] is not template:
+        cached = (template, template.to_plotly_json())
+        _TEMPLATE_JSON_CACHE[id(template)] = cached
+    return cached[1]
+
+
+def _orjson_default(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray):
+        # orjson only serializes C-contiguous arrays, e.g. not reversed views
+        return np.ascontiguousarray(obj)
+    return PlotlyJSONEncoder().default(obj)
+
+
+def encode_figure(figure: dict) -> bytes:
+    """
+    Encode JSON serializable figure to bytes
+
+    Uses orjson when installed, with fallback to the plotly JSON encoder.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            figure,
+            default=_orjson_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(figure, cls=PlotlyJSONEncoder).encode()
+
+
+def decode_figure(payload: bytes) -> dict:
+    """Decode figure encoded by `encode_figure`"""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
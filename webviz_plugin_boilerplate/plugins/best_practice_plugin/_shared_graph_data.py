@@ -0,0 +1,244 @@
+import atexit
+import json
+import os
+import struct
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ._business_logic import GraphData, GraphDataSource
+
+######################################################################
+#
+# Graph data shared between processes
+#
+# Rule: No dash* import allowed
+#
+# The graph data of a source is written once to a single file in
+# shared memory (/dev/shm when present), which is memory mapped
+# read-only by every process, e.g. gunicorn workers. The pages of the
+# file are shared between the processes, i.e. the graph data is held
+# in memory once independent of the number of workers.
+#
+# File layout:
+# * Magic, and byte offset and length of the JSON manifest
+# * Array data, where each array is aligned to ALIGNMENT bytes
+# * JSON manifest with data version, and dtype, offset and length of
+#   the x and y data of each graph
+#
+# The manifest is written after the array data, i.e. each graph is
+# written as it is loaded from the source.
+#
+# The creation is serialized by a lock file next to the shared file,
+# holding the process ID of the owner removing both files at exit.
+#
+######################################################################
+
+MAGIC = b"WVZGRPH2"
+ALIGNMENT = 64
+
+_HEADER = struct.Struct("<8sQQ")
+
+
+def default_shared_directory() -> Path:
+    """Directory for shared graph data, the tmpfs in /dev/shm if present"""
+    shm_directory = Path("/dev/shm")
+    if shm_directory.is_dir() and os.access(shm_directory, os.W_OK):
+        return shm_directory
+    return Path(tempfile.gettempdir())
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+@contextmanager
+def _exclusive_lock(lock_path: Path) -> Iterator[BinaryIO]:
+    """
+    Inter-process lock on file, released on exit or if the process dies. Without
+    `fcntl` (i.e. on Windows) no lock is taken, where concurrent processes may create
+    the same file, while the atomic replace keeps the file valid.
+    """
+    with open(lock_path, "a+b") as lock_file:
+        try:
+            # pylint: disable=import-outside-toplevel
+            import fcntl
+        except ImportError:
+            yield lock_file
+            return
+
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield lock_file
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _lock_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.lock")
+
+
+def _owner_pid(lock_file: BinaryIO) -> Optional[int]:
+    lock_file.seek(0)
+    content = lock_file.read().strip()
+    return int(content) if content.isdigit() else None
+
+
+def _is_process_alive(pid: Optional[int]) -> bool:
+    if pid is None:
+        return False
+    if os.name == "nt":
+        # Signals terminate the process on Windows, i.e. assume alive
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _take_ownership(lock_file: BinaryIO, path: Path) -> None:
+    """Record this process as owner of the shared file, removing it at exit"""
+    lock_file.truncate(0)
+    lock_file.write(str(os.getpid()).encode())
+    lock_file.flush()
+    atexit.register(_remove_shared_file, path, os.getpid())
+
+
+def _write_shared_file(source: GraphDataSource, path: Path) -> None:
+    """
+    Write the graph data of the source to file, one graph at a time as it is
+    loaded, i.e. without holding all graph data in memory
+    """
+    manifest: Dict = {"data_version": source.data_version(), "graphs": []}
+
+    # Written to a temporary file, and atomically moved in place when complete
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, "wb") as file:
+            offset = _aligned(_HEADER.size)
+            for name in source.graph_names():
+                graph_data = source.load_graph_data(name)
+                entry: Dict = {"name": name, "length": len(graph_data)}
+                for axis, array in (
+                    ("x", graph_data.x_data()),
+                    ("y", graph_data.y_data()),
+                ):
+                    entry[axis] = {"dtype": array.dtype.str, "offset": offset}
+                    file.seek(offset)
+                    file.write(np.ascontiguousarray(array).data)
+                    offset = _aligned(offset + array.nbytes)
+                manifest["graphs"].append(entry)
+
+            manifest_bytes = json.dumps(manifest).encode()
+            file.seek(offset)
+            file.write(manifest_bytes)
+            file.seek(0)
+            file.write(_HEADER.pack(MAGIC, offset, len(manifest_bytes)))
+        os.replace(temp_path, path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+class SharedMemoryGraphDataSource(GraphDataSource):
+    """
+    Graph data source attached read-only to graph data shared between processes
+
+    The graph data is memory mapped without copying, and the `GraphData` provided by
+    the source are read-only views of the shared memory. Use `create_or_attach` for
+    creating the shared data from a source in the first process, and attaching to it
+    in the other processes.
+
+    The source is safe to use across fork, and is pickled by path, i.e. a spawned
+    process attaches to the same shared data.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = Path(path)
+        buffer = np.memmap(self._path, dtype=np.uint8, mode="r")
+
+        magic, manifest_offset, manifest_length = _HEADER.unpack(
+            bytes(buffer[: _HEADER.size])
+        )
+        if magic != MAGIC:
+            raise ValueError(f'File "{self._path}" is not a shared graph data file!')
+        manifest = json.loads(
+            bytes(buffer[manifest_offset : manifest_offset + manifest_length])
+        )
+
+        def _array(array_entry: Dict, length: int) -> np.ndarray:
+            dtype = np.dtype(array_entry["dtype"])
+            start = array_entry["offset"]
+            return buffer[start : start + length * dtype.itemsize].view(dtype)
+
+        self._data_version: str = manifest["data_version"]
+        self._graph_dict: Dict[str, GraphData] = {
+            entry["name"]: GraphData(
+                _array(entry["x"], entry["length"]),
+                _array(entry["y"], entry["length"]),
+            )
+            for entry in manifest["graphs"]
+        }
+
+    def __reduce__(self) -> Tuple:
+        return (SharedMemoryGraphDataSource, (self._path,))
+
+    @classmethod
+    def create_or_attach(
+        cls, source: GraphDataSource, directory: Optional[Path] = None
+    ) -> "SharedMemoryGraphDataSource":
+        """
+        Attach to the shared graph data of the source, where the first process
+        creates it by loading all graph data of the source
+
+        The shared data is named by the data version of the source, i.e. processes
+        with equal data share the same data. The creating process removes the shared
+        data at exit, while attached processes keep their mapping. Thus, create
+        the source before forking workers (e.g. gunicorn `--preload`) for the data
+        to live as long as the parent process. Shared data left over by a process
+        which did not exit cleanly is reused, and removed at exit of the process
+        attaching to it.
+        """
+        directory = Path(directory) if directory else default_shared_directory()
+        path = directory / f"webviz_graph_data_{source.data_version()}.bin"
+
+        with _exclusive_lock(_lock_path(path)) as lock_file:
+            if not path.exists():
+                _write_shared_file(source, path)
+                _take_ownership(lock_file, path)
+            elif not _is_process_alive(_owner_pid(lock_file)):
+                _take_ownership(lock_file, path)
+            return cls(path)
+
+    def path(self) -> Path:
+        return self._path
+
+    def graph_names(self) -> List[str]:
+        return list(self._graph_dict.keys())
+
+    def load_graph_data(self, graph_name: str) -> GraphData:
+        return self._graph_dict[graph_name]
+
+    def data_version(self) -> str:
+        return self._data_version
+
+
+def _remove_shared_file(path: Path, owner_pid: int) -> None:
+    # Forked children inherit the exit handler, only the owner removes the data
+    if os.getpid() != owner_pid:
+        return
+    lock_path = _lock_path(path)
+    with _exclusive_lock(lock_path) as lock_file:
+        if _owner_pid(lock_file) != owner_pid:
+            return
+        for removed_path in (path, lock_path):
+            try:
+                removed_path.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,200 @@
+import logging
+import os
+import threading
+import time
+import uuid
+import weakref
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ._business_logic import ArrayLike, GraphData, StreamingGraphData
+
+######################################################################
+#
+# Streaming of live graph data
+#
+# Rule: No dash* import allowed
+#
+# Producers provide the new points of a live series, e.g. lines
+# appended to a file or chunks of an in-process generator. A feed
+# polls the producer by a background thread, and appends the new
+# points to the ring buffer of the streaming graph data.
+#
+# Threads are not inherited by forked processes, thus every process
+# (e.g. gunicorn worker) runs its own feed and buffer, identified by
+# a feed ID. The feed thread is started on first use in the process,
+# e.g. not when building the app with `webviz build`.
+#
+######################################################################
+
+LOGGER = logging.getLogger(__name__)
+
+# Feeds of the process, reset in the child process after fork by a single hook
+_FEEDS: "weakref.WeakSet[StreamingFeed]" = weakref.WeakSet()
+
+
+def _reset_feeds_after_fork() -> None:
+    for feed in list(_FEEDS):
+        feed._reset_after_fork()  # pylint: disable=protected-access
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_feeds_after_fork)
+
+
+# pylint: disable=too-few-public-methods
+class GraphDataProducer(ABC):
+    """Interface for producers of live graph data"""
+
+    @abstractmethod
+    def read_new_points(self) -> Optional[GraphData]:
+        """
+        Points produced since the previous read, empty when no new points are
+        available. None when the producer is exhausted.
+        """
+
+
+class GeneratorGraphDataProducer(GraphDataProducer):
+    """
+    Graph data producer for an in-process iterable of chunks, where each chunk is a
+    tuple of x and y data. One chunk is provided per read.
+    """
+
+    def __init__(self, chunks: Iterable[Tuple[ArrayLike, ArrayLike]]) -> None:
+        self._chunks: Iterator[Tuple[ArrayLike, ArrayLike]] = iter(chunks)
+
+    def read_new_points(self) -> Optional[GraphData]:
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return None
+        return GraphData(*chunk)
+
+
+class FileTailGraphDataProducer(GraphDataProducer):
+    """
+    Graph data producer for a text file with one point per line, where the x and y
+    value are separated by comma or whitespace
+
+    Only complete lines appended since the previous read are read, and lines which
+    are not points are skipped (e.g. a header). The file is read from the start
+    again when truncated, e.g. on log rotation.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = Path(path)
+        self._offset = 0
+
+    def read_new_points(self) -> Optional[GraphData]:
+        try:
+            with open(self._path, "rb") as file:
+                if os.fstat(file.fileno()).st_size < self._offset:
+                    self._offset = 0
+                file.seek(self._offset)
+                content = file.read()
+        except FileNotFoundError:
+            return GraphData([], [])
+
+        # Incomplete last line is read when completed
+        content = content[: content.rfind(b"\n") + 1]
+        self._offset += len(content)
+
+        points: List[Tuple[float, float]] = []
+        for line in content.decode(errors="replace").splitlines():
+            values = line.replace(",", " ").split()
+            try:
+                points.append((float(values[0]), float(values[1])))
+            except (IndexError, ValueError):
+                continue
+        if not points:
+            return GraphData([], [])
+        data = np.array(points, dtype=np.float64)
+        return GraphData(data[:, 0], data[:, 1])
+
+
+def create_mock_graph_data_producer(
+    points_per_read: int = 10, seed: Optional[int] = None
+) -> GraphDataProducer:
+    """Producer of an endless random walk, with x increasing by one per point"""
+    random_generator = np.random.default_rng(seed)
+
+    def _random_walk() -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        x_start = 0
+        y_last = 0.0
+        while True:
+            x_data = np.arange(x_start, x_start + points_per_read)
+            y_data = y_last + np.cumsum(random_generator.normal(size=points_per_read))
+            x_start += points_per_read
+            y_last = y_data[-1]
+            yield x_data, y_data
+
+    return GeneratorGraphDataProducer(_random_walk())
+
+
+class StreamingFeed:
+    """
+    Feed of points from a producer into streaming graph data
+
+    `Arguments:`
+    * `producer` - Producer of the live graph data.
+    * `capacity` - Number of points kept in the ring buffer of the streaming data.
+    * `poll_interval_s` - Interval between reads from the producer, in seconds.
+
+    The producer is polled by a background thread, started by `ensure_started` in
+    the process using the feed. Polling stops when the producer is exhausted.
+    """
+
+    def __init__(
+        self, producer: GraphDataProducer, capacity: int, poll_interval_s: float = 1.0
+    ) -> None:
+        self._producer = producer
+        self._graph_data = StreamingGraphData(capacity)
+        self._poll_interval_s = poll_interval_s
+        self._feed_pid: Optional[int] = None
+        self._feed_id: Optional[str] = None
+        self._lock = threading.Lock()
+        _FEEDS.add(self)
+
+    def graph_data(self) -> StreamingGraphData:
+        return self._graph_data
+
+    def feed_id(self) -> Optional[str]:
+        """
+        ID of the feed started in this process, None when not started. Positions in
+        the streaming graph data are only valid for the feed of equal ID.
+        """
+        return self._feed_id
+
+    def ensure_started(self) -> None:
+        """Start polling the producer in this process, if not already started"""
+        with self._lock:
+            if self._feed_pid == os.getpid():
+                return
+            self._feed_pid = os.getpid()
+            self._feed_id = uuid.uuid4().hex
+        threading.Thread(target=self._run_feed, daemon=True).start()
+
+    def poll(self) -> bool:
+        """Append new points of the producer, and whether the producer is active"""
+        new_points = self._producer.read_new_points()
+        if new_points is None:
+            return False
+        if len(new_points) > 0:
+            self._graph_data.append(new_points)
+        return True
+
+    def _reset_after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._feed_id = None
+
+    def _run_feed(self) -> None:
+        while True:
+            try:
+                if not self.poll():
+                    LOGGER.info("Streaming producer exhausted, feed stopped")
+                    return
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.exception("Streaming feed failed to read from producer")
+            time.sleep(self._poll_interval_s)
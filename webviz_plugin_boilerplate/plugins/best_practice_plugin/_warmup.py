@@ -0,0 +1,207 @@
+import logging
+import os
+import queue
+import threading
+import weakref
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional, Sequence
+
+######################################################################
+#
+# Background warm-up of cached figures
+#
+# Rule: No dash* import allowed
+#
+# Figures of the most used graphs are created by a bounded number of
+# background threads ahead of the requests, from the first served
+# request of each process, i.e. not at build time of the app. Warm-up
+# work is paused while user requests are in progress, i.e. user
+# requests take priority.
+#
+# Threads are used, as the warm-up fills the in-process figure cache.
+#
+######################################################################
+
+LOGGER = logging.getLogger(__name__)
+
+# Schedulers of the process, reset in the child process after fork by a single hook
+_SCHEDULERS: "weakref.WeakSet[WarmupScheduler]" = weakref.WeakSet()
+
+
+def _reset_schedulers_after_fork() -> None:
+    for scheduler in list(_SCHEDULERS):
+        scheduler._reset_after_fork()  # pylint: disable=protected-access
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_schedulers_after_fork)
+
+
+@dataclass
+class WarmupProgress:
+    """Progress of the current warm-up, counted in warm-up tasks"""
+
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+
+    @property
+    def is_done(self) -> bool:
+        return self.completed + self.failed >= self.total
+
+
+# pylint: disable=too-many-instance-attributes
+class WarmupScheduler:
+    """
+    Scheduler of background warm-up tasks for the most used graphs
+
+    `Arguments:`
+    * `graph_names` - Provides the names of all graphs, in default warm-up order.
+    * `create_tasks` - Provides the warm-up tasks for a graph, e.g. creating the
+    cached figure for each graph type and graph data visualization.
+    * `max_graphs` - Number of graphs to warm up, 0 disables the warm-up.
+    * `max_workers` - Number of concurrent warm-up threads.
+
+    Graphs are warmed up in order of usage, recorded with `record_usage`, where
+    unused graphs keep the default order. User requests are wrapped in
+    `user_request`, pausing the warm-up until no user request is in progress.
+    """
+
+    def __init__(
+        self,
+        graph_names: Callable[[], Sequence[str]],
+        create_tasks: Callable[[str], Sequence[Callable[[], object]]],
+        max_graphs: int = 0,
+        max_workers: int = 2,
+    ) -> None:
+        self._graph_names = graph_names
+        self._create_tasks = create_tasks
+        self._max_graphs = max_graphs
+        self._max_workers = max(max_workers, 1)
+
+        self._condition = threading.Condition()
+        self._active_requests = 0
+        self._generation = 0
+        self._progress = WarmupProgress()
+        self._pending_tasks: Iterator[Callable[[], object]] = iter(())
+        self._usage_counts: Counter = Counter()
+        self._queue: "queue.Queue[int]" = queue.Queue()
+        self._worker_pid: Optional[int] = None
+        _SCHEDULERS.add(self)
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_graphs > 0
+
+    def schedule(self) -> None:
+        """
+        Schedule warm-up of the most used graphs, e.g. after reload of data.
+        Pending tasks of a previous warm-up are discarded.
+        """
+        if not self.enabled:
+            return
+
+        with self._condition:
+            ranked = sorted(
+                self._graph_names(), key=lambda name: -self._usage_counts[name]
+            )
+            tasks = [
+                task
+                for name in ranked[: self._max_graphs]
+                for task in self._create_tasks(name)
+            ]
+            self._generation += 1
+            self._progress = WarmupProgress(total=len(tasks))
+            self._pending_tasks = iter(tasks)
+            self._ensure_workers()
+
+        for _ in range(min(len(tasks), self._max_workers)):
+            self._queue.put(self._generation)
+
+    def ensure_scheduled(self) -> None:
+        """Schedule warm-up in this process, if not already scheduled"""
+        if not self.enabled:
+            return
+        with self._condition:
+            if self._worker_pid == os.getpid():
+                return
+            self.schedule()
+
+    def progress(self) -> WarmupProgress:
+        with self._condition:
+            return WarmupProgress(
+                total=self._progress.total,
+                completed=self._progress.completed,
+                failed=self._progress.failed,
+            )
+
+    def record_usage(self, graph_name: str) -> None:
+        with self._condition:
+            self._usage_counts[graph_name] += 1
+
+    @contextmanager
+    def user_request(self) -> Iterator[None]:
+        """Context of a user request, pausing warm-up tasks not yet started"""
+        self.ensure_scheduled()
+        with self._condition:
+            self._active_requests += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active_requests -= 1
+                self._condition.notify_all()
+
+    def _reset_after_fork(self) -> None:
+        # Locks may be held by threads of the parent, which are not inherited
+        self._condition = threading.Condition()
+        self._active_requests = 0
+        self._queue = queue.Queue()
+
+    def _ensure_workers(self) -> None:
+        # Threads are not inherited by forked processes, e.g. gunicorn workers of a
+        # preloaded app, thus workers are started per process
+        if self._worker_pid == os.getpid():
+            return
+        self._worker_pid = os.getpid()
+        self._queue = queue.Queue()
+        for _ in range(self._max_workers):
+            threading.Thread(target=self._run_worker, daemon=True).start()
+
+    def _next_task(self, generation: int) -> Optional[Callable[[], object]]:
+        with self._condition:
+            self._condition.wait_for(lambda: self._active_requests == 0)
+            if generation != self._generation:
+                return None
+            return next(self._pending_tasks, None)
+
+    def _run_worker(self) -> None:
+        while True:
+            generation = self._queue.get()
+            task = self._next_task(generation)
+            while task is not None:
+                try:
+                    task()
+                    succeeded = True
+                except Exception:  # pylint: disable=broad-except
+                    LOGGER.exception("Warm-up task failed")
+                    succeeded = False
+                self._report_progress(generation, succeeded)
+                task = self._next_task(generation)
+
+    def _report_progress(self, generation: int, succeeded: bool) -> None:
+        with self._condition:
+            if generation != self._generation:
+                return
+            if succeeded:
+                self._progress.completed += 1
+            else:
+                self._progress.failed += 1
+            if self._progress.is_done:
+                LOGGER.info(
+                    "Warm-up done: %d of %d tasks completed",
+                    self._progress.completed,
+                    self._progress.total,
+                )